@@ -0,0 +1,234 @@
+import json
+import os
+import time
+from array import array
+from user_stats import RunningStats
+
+# Histórico de todas as respostas dos quizzes, só com acréscimos e guardado em colunas: um
+# arquivo binário por campo (array.tofile, ordem de bytes da máquina) e tabelas de nomes para
+# usuários e questões. Uma resposta ocupa 21 bytes em disco.
+#
+#   users.history/
+#       time.bin  user.bin  question.bin  correct.bin  latency.bin
+#       users.txt       um nome de usuário (JSON) por linha; a posição é o id usado em user.bin
+#       questions.txt   [id da questão, lição] por linha; a posição é o id usado em question.bin
+#       aggregates.json estatísticas por questão até a linha "rows" (evita reler o histórico)
+#
+# As estatísticas por questão e por lição, e os acertos de cada usuário em cada lição
+# (lesson_scores, usado no painel por grupo), são atualizados a cada resposta, então as
+# consultas não percorrem o histórico. Só um processo deve gravar no histórico (no laboratório, o
+# quiz_server.py); com o armazenamento "shared" o UserDataManager não grava histórico.
+
+COLUMNS = (("time", "d"), ("user", "I"), ("question", "I"), ("correct", "B"), ("latency", "f"))
+
+
+class QuestionStats:
+    __slots__ = ("attempts", "correct", "latency_total")
+
+    def __init__(self, attempts=0, correct=0, latency_total=0.0):
+        self.attempts = attempts
+        self.correct = correct
+        self.latency_total = latency_total
+
+    def add(self, correct, latency):
+        self.attempts += 1
+        self.correct += 1 if correct else 0
+        self.latency_total += latency
+
+    @property
+    def errors(self):
+        return self.attempts - self.correct
+
+    @property
+    def accuracy(self):
+        return self.correct / self.attempts if self.attempts else 0.0
+
+    @property
+    def mean_latency(self):
+        return self.latency_total / self.attempts if self.attempts else 0.0
+
+    def to_list(self):
+        return [self.attempts, self.correct, self.latency_total]
+
+    def __repr__(self):
+        return f"QuestionStats(attempts={self.attempts}, correct={self.correct}, mean_latency={self.mean_latency:.2f})"
+
+
+class AttemptHistory:
+    # flush_every: respostas guardadas em memória antes de irem para o disco
+    def __init__(self, path, flush_every=64):
+        self.path = path
+        self.flush_every = flush_every
+        os.makedirs(path, exist_ok=True)
+        self.users = []
+        self.questions = []  # (id da questão, lição)
+        self._user_ids = {}
+        self._question_ids = {}
+        self.question_stats = {}
+        self.lesson_stats = {}
+        self.lesson_correct = {}  # lição -> {id do usuário: acertos nela}
+        self.lesson_scores = {}  # lição -> RunningStats dos acertos de cada usuário que a fez
+        self.rows = 0  # Respostas já gravadas em disco
+        self._pending = {name: array(code) for name, code in COLUMNS}
+        self._open()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _read_table(self, name):
+        if not os.path.exists(self._file(name)):
+            return []
+        entries = []
+        valid_size = 0
+        with open(self._file(name), 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Escrita interrompida
+                try:
+                    entries.append(json.loads(line))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                valid_size += len(line)
+        # Descarta a linha incompleta: o próximo nome acrescentado não pode ficar colado nela
+        if valid_size < os.path.getsize(self._file(name)):
+            with open(self._file(name), 'r+b') as f:
+                f.truncate(valid_size)
+        return entries
+
+    def _open(self):
+        self.users = self._read_table("users.txt")
+        self._user_ids = {name: i for i, name in enumerate(self.users)}
+        self.questions = [tuple(entry) for entry in self._read_table("questions.txt")]
+        self._question_ids = {question_id: i for i, (question_id, lesson) in enumerate(self.questions)}
+
+        # Depois de uma queda as colunas podem ter tamanhos diferentes: vale a menor
+        sizes = {}
+        for name, code in COLUMNS:
+            path = self._file(name + ".bin")
+            sizes[name] = os.path.getsize(path) // array(code).itemsize if os.path.exists(path) else 0
+        self.rows = min(sizes.values())
+        for name, code in COLUMNS:
+            if sizes[name] > self.rows:
+                with open(self._file(name + ".bin"), 'r+b') as f:
+                    f.truncate(self.rows * array(code).itemsize)
+
+        start = 0
+        checkpoint = self._read_checkpoint()
+        if checkpoint is not None and checkpoint["rows"] <= self.rows:
+            start = checkpoint["rows"]
+            self.question_stats = {question_id: QuestionStats(*values) for question_id, values in checkpoint["questions"].items()}
+            self.lesson_stats = {lesson: QuestionStats(*values) for lesson, values in checkpoint["lessons"].items()}
+            self.lesson_correct = {lesson: {int(user): count for user, count in counts.items()}
+                                   for lesson, counts in checkpoint["lesson_users"].items()}
+            self.lesson_scores = {lesson: RunningStats(counts.values()) for lesson, counts in self.lesson_correct.items()}
+        # Só as respostas posteriores ao último checkpoint são relidas
+        users, questions, correct, latency = (self._read_column(name, start) for name in ("user", "question", "correct", "latency"))
+        for user, question, answer_correct, answer_latency in zip(users, questions, correct, latency):
+            self._aggregate(user, self.questions[question], answer_correct, answer_latency)
+
+    def _read_checkpoint(self):
+        try:
+            with open(self._file("aggregates.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+    def _read_column(self, name, start=0, stop=None):
+        code = dict(COLUMNS)[name]
+        values = array(code)
+        stop = self.rows if stop is None else stop
+        if stop > start:
+            with open(self._file(name + ".bin"), 'rb') as f:
+                f.seek(start * values.itemsize)
+                values.fromfile(f, stop - start)
+        return values
+
+    def _aggregate(self, user, question, correct, latency):
+        question_id, lesson = question
+        self.question_stats.setdefault(question_id, QuestionStats()).add(correct, latency)
+        self.lesson_stats.setdefault(lesson, QuestionStats()).add(correct, latency)
+        counts = self.lesson_correct.setdefault(lesson, {})
+        scores = self.lesson_scores.setdefault(lesson, RunningStats())
+        old = counts.get(user)
+        if old is None:
+            old = counts[user] = 0
+            scores.add(0)  # Primeira resposta do usuário nesta lição
+        if correct:
+            counts[user] = old + 1
+            scores.replace(old, old + 1)
+
+    def _intern(self, table, ids, filename, key, entry):
+        index = ids.get(key)
+        if index is None:
+            # O nome vai para o disco antes de qualquer linha que use o id dele
+            with open(self._file(filename), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            index = ids[key] = len(table)
+            table.append(entry)
+        return index
+
+    def record(self, username, lesson, question_id, correct, latency, timestamp=None):
+        user = self._intern(self.users, self._user_ids, "users.txt", username, username)
+        question = self._intern(self.questions, self._question_ids, "questions.txt", question_id, (question_id, lesson))
+        pending = self._pending
+        pending["time"].append(time.time() if timestamp is None else timestamp)
+        pending["user"].append(user)
+        pending["question"].append(question)
+        pending["correct"].append(1 if correct else 0)
+        pending["latency"].append(latency)
+        self._aggregate(user, self.questions[question], correct, latency)
+        if len(pending["time"]) >= self.flush_every:
+            self.flush()
+
+    def __len__(self):
+        return self.rows + len(self._pending["time"])
+
+    def flush(self):
+        if not self._pending["time"]:
+            return
+        for name, code in COLUMNS:
+            with open(self._file(name + ".bin"), 'ab') as f:
+                self._pending[name].tofile(f)
+        self.rows += len(self._pending["time"])
+        self._pending = {name: array(code) for name, code in COLUMNS}
+
+    def checkpoint(self):
+        self.flush()
+        data = {
+            "rows": self.rows,
+            "questions": {question_id: stats.to_list() for question_id, stats in self.question_stats.items()},
+            "lessons": {lesson: stats.to_list() for lesson, stats in self.lesson_stats.items()},
+            "lesson_users": self.lesson_correct,
+        }
+        tmp_path = self._file("aggregates.json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self._file("aggregates.json"))
+
+    def close(self):
+        self.checkpoint()
+
+    def stats(self, question_id):
+        return self.question_stats.get(question_id)
+
+    def hardest(self, n=5, min_attempts=1):
+        # Questões com menor taxa de acerto
+        candidates = [(question_id, stats) for question_id, stats in self.question_stats.items() if stats.attempts >= min_attempts]
+        return sorted(candidates, key=lambda item: (item[1].accuracy, -item[1].attempts))[:n]
+
+    def slowest(self, n=5, min_attempts=1):
+        # Questões com maior tempo médio de resposta
+        candidates = [(question_id, stats) for question_id, stats in self.question_stats.items() if stats.attempts >= min_attempts]
+        return sorted(candidates, key=lambda item: -item[1].mean_latency)[:n]
+
+    def column(self, name, start=0):
+        # Coluna inteira (array), ou a partir da linha `start`, para análises sobre o histórico
+        self.flush()
+        return self._read_column(name, start)
+
+    def attempts(self):
+        # Percorre o histórico completo: (tempo, usuário, questão, lição, acertou, latência)
+        columns = [self.column(name) for name, code in COLUMNS]
+        for timestamp, user, question, correct, latency in zip(*columns):
+            question_id, lesson = self.questions[question]
+            yield timestamp, self.users[user], question_id, lesson, bool(correct), latency
@@ -0,0 +1,224 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from passwords import PasswordHasher
+from user_data import UserDataManager
+from user_record import UserRecord
+
+# Benchmarks das operações mais usadas do UserDataManager e do painel do MainApp, com
+# arquivos sintéticos de 1 mil a 1 milhão de usuários. Roda sem tela (o Tk é substituído
+# por objetos falsos) e grava os resultados em JSON para comparar versões.
+#
+#   python benchmark.py --tamanhos 1000 10000 100000 --storage json sqlite --json resultados.json
+#   python benchmark.py --memoria 1000000   (dicts x UserRecord em memória)
+#   python benchmark.py --snapshot --operacoes load_users   (carga pelo snapshot binário)
+
+SENHA = "senha123"
+OPERACOES = ("load_users", "save_users", "add_user", "record_quiz_result", "validate_user", "update_info_cards")
+
+
+def gerar_usuarios(quantidade, hasher, seed=0):
+    rng = random.Random(seed)
+    senha = hasher.hash(SENHA)  # Um hash só: o custo de gerar o arquivo não importa aqui
+    return {
+        f"usuario{i}": {
+            "password": senha,
+            "age": rng.randint(10, 90),
+            "acertos": rng.randint(0, 40),
+            "erros": rng.randint(0, 20),
+            "tempo": round(rng.uniform(0, 3600), 3),
+        }
+        for i in range(quantidade)
+    }
+
+
+def criar_arquivo(pasta, usuarios, storage, hasher):
+    filepath = os.path.join(pasta, "users.json")
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(usuarios, f)
+    if storage == "sqlite":
+        # A primeira abertura importa o JSON para o banco
+        UserDataManager(filepath, storage="sqlite", hasher=hasher).close()
+    return filepath
+
+
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    posicao = (len(valores_ordenados) - 1) * p / 100
+    baixo = int(posicao)
+    alto = min(baixo + 1, len(valores_ordenados) - 1)
+    return valores_ordenados[baixo] + (valores_ordenados[alto] - valores_ordenados[baixo]) * (posicao - baixo)
+
+
+def medir(operacao, repeticoes, preparar=None):
+    # Executa a operação `repeticoes` vezes e depois mais uma sob tracemalloc para o pico de memória
+    latencias = []
+    for i in range(repeticoes):
+        argumento = preparar(i) if preparar else None
+        gc.disable()
+        inicio = time.perf_counter()
+        operacao(argumento)
+        latencias.append(time.perf_counter() - inicio)
+        gc.enable()
+
+    argumento = preparar(repeticoes) if preparar else None
+    tracemalloc.start()
+    operacao(argumento)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencias.sort()
+    total = sum(latencias)
+    return {
+        "ops": repeticoes,
+        "total_s": total,
+        "throughput_ops_s": repeticoes / total if total else None,
+        "latency_ms": {
+            "p50": percentil(latencias, 50) * 1000,
+            "p95": percentil(latencias, 95) * 1000,
+            "p99": percentil(latencias, 99) * 1000,
+            "max": latencias[-1] * 1000 if latencias else 0.0,
+        },
+        "peak_memory_kb": pico / 1024,
+    }
+
+
+class _LabelFalso:
+    def config(self, **kwargs):
+        self.options = kwargs
+
+
+CARDS = ("card_total", "card_acertos", "card_percentual", "card_media", "card_mediana", "card_moda", "card_ranking", "top_label")
+
+
+def criar_app_sem_tela(manager, username):
+    # MainApp sem janela: os cards e rótulos viram objetos falsos com config()
+    from main import MainApp
+
+    app = MainApp(None, manager, username, criar_widgets=False)
+    for nome in CARDS:
+        setattr(app, nome, _LabelFalso())
+    app.intervalo_estatisticas_ms = 0 # Sem tela não há root.after: as estatísticas gerais são sempre recalculadas
+    return app
+
+
+def medir_memoria(quantidade, hasher):
+    # Bytes alocados pelos registros de `quantidade` usuários: dicts (formato antigo) x UserRecord
+    usuarios = gerar_usuarios(quantidade, hasher)
+    resultado = {"users": quantidade}
+    for formato, converter in (("dict", dict), ("UserRecord", UserRecord.from_mapping)):
+        gc.collect()
+        tracemalloc.start()
+        registros = {nome: converter(user) for nome, user in usuarios.items()}
+        resultado[f"{formato}_bytes"] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del registros
+    resultado["bytes_por_usuario"] = {
+        formato: resultado[f"{formato}_bytes"] / quantidade for formato in ("dict", "UserRecord")
+    }
+    resultado["reducao"] = 1 - resultado["UserRecord_bytes"] / resultado["dict_bytes"]
+    print(f"{quantidade:>9} usuários: dict {resultado['dict_bytes'] / 2 ** 20:.1f} MiB, "
+          f"UserRecord {resultado['UserRecord_bytes'] / 2 ** 20:.1f} MiB ({resultado['reducao']:.0%} menos)")
+    return resultado
+
+
+def rodar_tamanho(quantidade, storage, hasher, repeticoes, repeticoes_io, operacoes, snapshot=False):
+    pasta = tempfile.mkdtemp(prefix="bench_users_")
+    resultados = []
+    try:
+        filepath = criar_arquivo(pasta, gerar_usuarios(quantidade, hasher), storage, hasher)
+
+        opcoes = {"snapshot": True} if snapshot and storage != "sqlite" else {}
+
+        def abrir(cache_size=256):
+            return UserDataManager(filepath, storage=storage, hasher=hasher, cache_size=cache_size, **opcoes)
+
+        manager = abrir()
+        if opcoes:
+            manager.save_users()  # Grava o snapshot ao lado do JSON
+        nomes = [f"usuario{i}" for i in range(quantidade)]
+        rng = random.Random(1)
+
+        def registrar(operacao, medicao):
+            medicao.update({"operation": operacao, "storage": storage, "users": quantidade, "snapshot": bool(opcoes)})
+            resultados.append(medicao)
+            print(f"{storage:>12} {quantidade:>9} {operacao:<22} "
+                  f"{medicao['throughput_ops_s'] or 0:>12.1f} op/s  p50 {medicao['latency_ms']['p50']:>9.3f} ms  "
+                  f"p99 {medicao['latency_ms']['p99']:>9.3f} ms  pico {medicao['peak_memory_kb']:>10.1f} KiB")
+
+        if "load_users" in operacoes:
+            registrar("load_users", medir(lambda _: manager.load_users(), repeticoes_io))
+        if "save_users" in operacoes:
+            registrar("save_users", medir(lambda _: manager.save_users(), repeticoes_io))
+        if "add_user" in operacoes:
+            registrar("add_user", medir(lambda nome: manager.add_user(nome, SENHA, 30), repeticoes_io,
+                                        preparar=lambda i: f"novo{i}_{time.perf_counter_ns()}"))
+        if "record_quiz_result" in operacoes:
+            registrar("record_quiz_result", medir(lambda nome: manager.record_quiz_result(nome, 1, 0, 1.5), repeticoes_io,
+                                                  preparar=lambda i: rng.choice(nomes)))
+        if "validate_user" in operacoes:
+            registrar("validate_user", medir(lambda nome: manager.validate_user(nome, SENHA), repeticoes,
+                                             preparar=lambda i: nomes[i % 8]))  # Poucos usuários: cache quente
+            frio = abrir(cache_size=0)
+            registrar("validate_user_sem_cache", medir(lambda nome: frio.validate_user(nome, SENHA), repeticoes,
+                                                       preparar=lambda i: rng.choice(nomes)))
+            frio.close()
+        if "update_info_cards" in operacoes:
+            app = criar_app_sem_tela(manager, nomes[0])
+            registrar("update_info_cards", medir(lambda _: app.update_info_cards(), repeticoes_io))
+        manager.close()
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do UserDataManager e do painel do MainApp.")
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=[1000, 10000, 100000], help="Quantidades de usuários (ex.: 1000 1000000)")
+    parser.add_argument("--storage", nargs="+", choices=["json", "log", "write-behind", "shared", "sqlite"], default=["json"])
+    parser.add_argument("--operacoes", nargs="+", choices=OPERACOES, default=list(OPERACOES))
+    parser.add_argument("--repeticoes", type=int, default=200, help="Repetições das operações em memória")
+    parser.add_argument("--repeticoes-io", type=int, default=10, help="Repetições das operações que gravam ou leem o arquivo todo")
+    parser.add_argument("--hash-iterations", type=int, default=1000, help="Custo PBKDF2 usado nos usuários sintéticos")
+    parser.add_argument("--snapshot", action="store_true", help="Usa o snapshot binário ao lado do JSON (user_snapshot.py)")
+    parser.add_argument("--memoria", nargs="+", type=int, metavar="USUARIOS", help="Só compara a memória dos registros (dict x UserRecord)")
+    parser.add_argument("--json", metavar="ARQUIVO", help="Grava os resultados neste arquivo JSON")
+    args = parser.parse_args(argv)
+
+    hasher = PasswordHasher(iterations=args.hash_iterations)
+    if args.memoria:
+        resultados = [medir_memoria(quantidade, hasher) for quantidade in args.memoria]
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({"memory": resultados}, f, indent=4, ensure_ascii=False)
+        return resultados
+
+    resultados = []
+    for storage in args.storage:
+        for quantidade in args.tamanhos:
+            resultados.extend(rodar_tamanho(quantidade, storage, hasher, args.repeticoes, args.repeticoes_io, args.operacoes,
+                                            args.snapshot))
+
+    if args.json:
+        relatorio = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "hash_iterations": args.hash_iterations,
+            "results": resultados,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, indent=4, ensure_ascii=False)
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
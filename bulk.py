@@ -0,0 +1,164 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from user_data import UserDataManager, check_new_user
+
+# Importação e exportação de turmas inteiras, sem interface gráfica.
+#
+#   python bulk.py importar alunos.csv --users users.json -j 4
+#   python bulk.py exportar desempenho.csv --users users.json
+#
+# Importação: CSV (cabeçalho usuario,senha,idade) ou JSONL ({"usuario": ..., "senha": ..., "idade": ...}
+# por linha; também aceita username/password/age). As linhas são validadas e as senhas passam pelo
+# hash em vários processos, e só então tudo entra no armazenamento de uma vez (uma gravação do
+# users.json, uma transação no SQLite). Linhas inválidas são relatadas e ficam de fora.
+
+CHUNK_SIZE = 500
+EXPORT_FIELDS = ("usuario", "idade", "acertos", "erros", "tempo", "percentual")
+_ALIASES = {"usuario": ("usuario", "username"), "senha": ("senha", "password"), "idade": ("idade", "age")}
+
+
+def _formato(path):
+    return "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson") else "csv"
+
+
+def _campo(row, nome):
+    for alias in _ALIASES[nome]:
+        if alias in row:
+            return row[alias]
+    return None
+
+
+def ler_lista(path):
+    # (número da linha, usuário, senha, idade) lidos aos poucos do arquivo
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if _formato(path) == "jsonl":
+            for numero, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        row = None
+                    if not isinstance(row, dict):  # JSON inválido ou valor que não é um objeto
+                        yield numero, None, None, None
+                        continue
+                    yield numero, _campo(row, "usuario"), _campo(row, "senha"), _campo(row, "idade")
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, _campo(row, "usuario"), _campo(row, "senha"), _campo(row, "idade")
+
+
+def validar_lote(linhas, hasher):
+    # Executa num processo separado: valida as linhas e calcula o hash das senhas válidas
+    validos, erros = [], []
+    for numero, username, password, age in linhas:
+        try:
+            if username is None and password is None and age is None:
+                raise ValueError("Linha inválida.")
+            username = (username or "").strip()
+            if not password:
+                raise ValueError("Senha não pode ser vazia.")
+            try:
+                age = int(age)
+            except (TypeError, ValueError):
+                raise ValueError("Idade deve ser um número inteiro positivo.") from None
+            check_new_user(username, age)
+        except ValueError as e:
+            erros.append((numero, str(e)))
+            continue
+        validos.append((numero, username, hasher.hash(password), age))
+    return validos, erros
+
+
+def _lotes(linhas, tamanho):
+    linhas = iter(linhas)
+    while True:
+        lote = list(islice(linhas, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def importar(manager, linhas, jobs=None, chunk_size=CHUNK_SIZE):
+    # Devolve (quantidade importada, [(linha, erro), ...]); jobs=1 valida no próprio processo
+    manager.wait_loaded()
+    lotes = _lotes(linhas, chunk_size)
+    if jobs == 1:
+        resultados = (validar_lote(lote, manager.hasher) for lote in lotes)
+        return _inserir(manager, resultados)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        resultados = executor.map(validar_lote, lotes, repeat(manager.hasher))
+        return _inserir(manager, resultados)
+
+
+def _inserir(manager, resultados):
+    novos = {}
+    erros = []
+    for validos, erros_lote in resultados:
+        erros.extend(erros_lote)
+        for numero, username, stored, age in validos:
+            # Repetidos entre lotes e contra quem já está cadastrado: aqui, sem paralelismo
+            if username in manager.users or username in novos:
+                erros.append((numero, f"Usuário já existe: {username}"))
+            else:
+                novos[username] = (username, stored, age)
+    erros.sort()
+    return manager.add_users(novos.values(), hashed=True), erros
+
+
+def exportar(manager, destino, formato=None):
+    # Grava o desempenho de cada usuário (sem senha) linha a linha, sem montar tudo na memória
+    formato = formato or _formato(destino)
+    manager.wait_loaded()
+    total = 0
+    with open(destino, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f) if formato == "csv" else None
+        if writer:
+            writer.writerow(EXPORT_FIELDS)
+        for username, user in manager.users.items():
+            acertos, erros = user.get("acertos", 0), user.get("erros", 0)
+            questoes = acertos + erros
+            linha = (username, user.get("age"), acertos, erros, user.get("tempo", 0),
+                     round(acertos / questoes * 100, 2) if questoes else 0.0)
+            if writer:
+                writer.writerow(linha)
+            else:
+                f.write(json.dumps(dict(zip(EXPORT_FIELDS, linha)), ensure_ascii=False) + "\n")
+            total += 1
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa e exporta usuários em lote (CSV ou JSONL).")
+    parser.add_argument("--users", default="users.json", help="Arquivo de usuários")
+    parser.add_argument("--storage", choices=["json", "log", "write-behind", "shared", "sqlite"], default="json")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    parser_importar = subparsers.add_parser("importar", help="Cadastra os usuários de uma lista")
+    parser_importar.add_argument("arquivo", help="Lista de alunos (.csv ou .jsonl)")
+    parser_importar.add_argument("-j", "--jobs", type=int, default=None, help="Processos para validar e calcular os hashes (padrão: um por CPU)")
+    parser_exportar = subparsers.add_parser("exportar", help="Grava o desempenho de todos os usuários")
+    parser_exportar.add_argument("arquivo", help="Arquivo de saída (.csv ou .jsonl)")
+    args = parser.parse_args(argv)
+
+    manager = UserDataManager(args.users, storage=args.storage)
+    try:
+        if args.comando == "importar":
+            importados, erros = importar(manager, ler_lista(args.arquivo), jobs=args.jobs)
+            for numero, erro in erros:
+                print(f"Linha {numero}: {erro}", file=sys.stderr)
+            print(f"{importados} usuários importados, {len(erros)} linhas com erro.")
+            return importados, erros
+        total = exportar(manager, args.arquivo)
+        print(f"{total} usuários exportados para {args.arquivo}.")
+        return total
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import io
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Gráficos de "Estatísticas dos Usuários Cadastrados" desenhados fora da tela (Agg).
+# Não usa pyplot, então pode rodar numa thread separada da interface Tk.
+
+SCREEN_DPI = 60  # Resolução da imagem mostrada na janela (a figura salva usa o dpi da figura)
+
+
+def create_figure():
+    fig = Figure(figsize=(12, 10))
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def chart_data(snapshot):
+    # snapshot: histogramas {valor: quantidade de usuários} de UserStats.snapshot()
+    data = {}
+    for field in ("acertos", "erros", "idades"):
+        histogram = snapshot[field]
+        values = sorted(histogram)
+        data[field] = (values, [histogram[value] for value in values])
+    return data
+
+
+def _sem_dados(ax):
+    ax.text(0.5, 0.5, 'Sem dados', horizontalalignment='center', verticalalignment='center', transform=ax.transAxes)
+
+
+def draw_charts(fig, data):
+    fig.clear()
+    axs = fig.subplots(2, 2)  # Organiza em 2 linhas, 2 colunas
+    fig.suptitle("Estatísticas dos Usuários Cadastrados", fontsize=16)
+
+    # Gráfico 1: Histograma de Acertos (os pesos reproduzem o histograma dos dados brutos)
+    values, counts = data["acertos"]
+    if values:
+        axs[0, 0].hist(values, bins=max(values) + 1, weights=counts, color='skyblue', edgecolor='black')
+        axs[0, 0].set_xticks(range(max(values) + 1)) # Garante ticks inteiros no eixo X
+    else:
+        _sem_dados(axs[0, 0])
+    axs[0, 0].set_title("Distribuição de Acertos")
+    axs[0, 0].set_xlabel("Quantidade de Acertos")
+    axs[0, 0].set_ylabel("Número de Usuários")
+
+    # Gráfico 2: Histograma de Erros
+    values, counts = data["erros"]
+    if values:
+        axs[0, 1].hist(values, bins=max(values) + 1, weights=counts, color='salmon', edgecolor='black')
+        axs[0, 1].set_xticks(range(max(values) + 1)) # Garante ticks inteiros no eixo X
+    else:
+        _sem_dados(axs[0, 1])
+    axs[0, 1].set_title("Distribuição de Erros")
+    axs[0, 1].set_xlabel("Quantidade de Erros")
+    axs[0, 1].set_ylabel("Número de Usuários")
+
+    # Gráfico 3: Histograma de Idades
+    ages, counts = data["idades"]
+    if ages:
+        axs[1, 0].hist(ages, bins=max(1, max(ages) // 5), weights=counts, color='lightgreen', edgecolor='black') # Bins por faixa de 5 anos
+    else:
+        _sem_dados(axs[1, 0])
+    axs[1, 0].set_title("Distribuição de Idades")
+    axs[1, 0].set_xlabel("Idade")
+    axs[1, 0].set_ylabel("Número de Usuários")
+
+    # Gráfico 4: Distribuição de Idades (Barras)
+    if ages:
+        axs[1, 1].bar(ages, counts, color='orange', edgecolor='black')
+        axs[1, 1].set_xticks(ages) # Garante ticks para cada idade presente
+    else:
+        _sem_dados(axs[1, 1])
+    axs[1, 1].set_title("Contagem de Usuários por Idade")
+    axs[1, 1].set_xlabel("Idade")
+    axs[1, 1].set_ylabel("Número de Usuários")
+
+    fig.tight_layout(rect=[0, 0.03, 1, 0.95]) # Ajusta layout para evitar sobreposição
+
+
+def render_png(fig, snapshot, dpi=SCREEN_DPI):
+    # Calcula os dados e desenha a figura; devolve os bytes PNG prontos para a interface
+    draw_charts(fig, chart_data(snapshot))
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi)
+    return buffer.getvalue()
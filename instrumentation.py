@@ -0,0 +1,212 @@
+import argparse
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Medições opcionais dos caminhos mais usados (login, abertura do painel, quizzes, cards,
+# gráficos e leitura/gravação dos usuários). Desligado, que é o padrão, não custa nada: o
+# decorador @medido só anota a função, e ativar() troca as funções anotadas por versões
+# cronometradas enquanto a medição estiver ligada.
+#
+#   python main.py --trace trace.jsonl --perfil perfil.prof
+#   python instrumentation.py trace.jsonl --perfil perfil.prof
+#
+# O trace tem um objeto JSON por linha: {"tipo": "tempo", "nome": ..., "inicio_ms": ...,
+# "ms": ..., "thread": ...}, eventos avulsos ({"tipo": "evento", ...}) e, no fim, os
+# contadores ({"tipo": "contadores", "valores": {...}}).
+
+_medidas = []  # Funções marcadas com @medido
+_ativo = None  # Tracer da medição em andamento
+
+
+def medido(func):
+    # Marca a função (ou método) para ser cronometrada quando a medição for ativada
+    _medidas.append(func)
+    return func
+
+
+def contar(nome, quantidade=1):
+    tracer = _ativo
+    if tracer is not None:
+        tracer.contar(nome, quantidade)
+
+
+def evento(nome, **dados):
+    tracer = _ativo
+    if tracer is not None:
+        tracer.escrever({"tipo": "evento", "nome": nome, **dados})
+
+
+class Tracer:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.inicio = time.perf_counter()
+        self.contadores = {}
+        self._lock = threading.Lock()
+        self._arquivo = open(caminho, 'w', encoding='utf-8')
+        self.escrever({"tipo": "inicio", "pid": os.getpid(), "data": time.strftime("%Y-%m-%dT%H:%M:%S")})
+
+    def escrever(self, registro):
+        linha = json.dumps(registro, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.write(linha)
+
+    def tempo(self, nome, inicio, fim):
+        self.escrever({
+            "tipo": "tempo",
+            "nome": nome,
+            "inicio_ms": round((inicio - self.inicio) * 1000, 3),
+            "ms": round((fim - inicio) * 1000, 3),
+            "thread": threading.current_thread().name,
+        })
+
+    def contar(self, nome, quantidade):
+        with self._lock:
+            self.contadores[nome] = self.contadores.get(nome, 0) + quantidade
+
+    def fechar(self):
+        self.escrever({"tipo": "contadores", "valores": dict(self.contadores)})
+        with self._lock:
+            self._arquivo.close()
+            self._arquivo = None
+
+
+def _dono(func):
+    # Classe (ou módulo) onde a função está definida, a partir do __qualname__
+    if "<locals>" in func.__qualname__:
+        return None
+    dono = sys.modules.get(func.__module__)
+    for parte in func.__qualname__.split(".")[:-1]:
+        dono = getattr(dono, parte, None)
+    return dono
+
+
+def _cronometrar(func, tracer):
+    nome = func.__qualname__
+
+    @functools.wraps(func)
+    def cronometrada(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            tracer.tempo(nome, inicio, time.perf_counter())
+    return cronometrada
+
+
+_trocas = []  # (dono, nome, função original) para desfazer em desativar()
+_perfil = None
+
+
+def ativar(caminho, perfil=None):
+    # Liga a medição gravando o trace em `caminho`; perfil: arquivo .prof do cProfile
+    # (pstats) com o programa inteiro. Deve ser chamado antes de criar as janelas: botões
+    # já ligados a um método continuam chamando a versão sem medição
+    global _ativo, _perfil
+    desativar()
+    _ativo = Tracer(caminho)
+    for func in _medidas:
+        dono = _dono(func)
+        if dono is not None and getattr(dono, "__dict__", {}).get(func.__name__) is func:
+            setattr(dono, func.__name__, _cronometrar(func, _ativo))
+            _trocas.append((dono, func.__name__, func))
+    if perfil:
+        import cProfile
+        _perfil = (cProfile.Profile(), perfil)
+        _perfil[0].enable()
+    atexit.register(desativar)
+    return _ativo
+
+
+def desativar():
+    global _ativo, _perfil
+    if _perfil is not None:
+        profiler, caminho = _perfil
+        profiler.disable()
+        profiler.dump_stats(caminho)
+        _perfil = None
+    while _trocas:
+        dono, nome, func = _trocas.pop()
+        setattr(dono, nome, func)
+    if _ativo is not None:
+        _ativo.fechar()
+        _ativo = None
+        atexit.unregister(desativar)
+
+
+def ativo():
+    return _ativo is not None
+
+
+def _percentil(ordenados, p):
+    posicao = (len(ordenados) - 1) * p / 100
+    baixo = int(posicao)
+    alto = min(baixo + 1, len(ordenados) - 1)
+    return ordenados[baixo] + (ordenados[alto] - ordenados[baixo]) * (posicao - baixo)
+
+
+def resumir(caminho):
+    # Lê um trace e agrega os tempos por nome: chamadas, total, média, p50, p95 e máximo (ms)
+    tempos, contadores, eventos = {}, {}, []
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in f:
+            if not linha.endswith("\n"):
+                break  # Programa encerrado no meio de uma gravação
+            registro = json.loads(linha)
+            if registro["tipo"] == "tempo":
+                tempos.setdefault(registro["nome"], []).append(registro["ms"])
+            elif registro["tipo"] == "contadores":
+                contadores = registro["valores"]
+            elif registro["tipo"] == "evento":
+                eventos.append(registro)
+    resumo = {}
+    for nome, valores in tempos.items():
+        valores.sort()
+        resumo[nome] = {
+            "chamadas": len(valores),
+            "total_ms": sum(valores),
+            "media_ms": sum(valores) / len(valores),
+            "p50_ms": _percentil(valores, 50),
+            "p95_ms": _percentil(valores, 95),
+            "max_ms": valores[-1],
+        }
+    return {"tempos": resumo, "contadores": contadores, "eventos": eventos}
+
+
+def formatar_resumo(resumo):
+    linhas = [f"{'Função':<40}{'Chamadas':>9}{'Total ms':>11}{'Média':>9}{'p50':>9}{'p95':>9}{'Máx':>9}"]
+    for nome, t in sorted(resumo["tempos"].items(), key=lambda item: -item[1]["total_ms"]):
+        linhas.append(f"{nome:<40}{t['chamadas']:>9}{t['total_ms']:>11.1f}{t['media_ms']:>9.2f}"
+                      f"{t['p50_ms']:>9.2f}{t['p95_ms']:>9.2f}{t['max_ms']:>9.2f}")
+    if resumo["contadores"]:
+        linhas.append("")
+        linhas.extend(f"{nome}: {valor}" for nome, valor in sorted(resumo["contadores"].items()))
+    for registro in resumo["eventos"]:
+        dados = ", ".join(f"{chave}={valor}" for chave, valor in registro.items() if chave not in ("tipo", "nome"))
+        linhas.append(f"{registro['nome']}: {dados}")
+    return "\n".join(linhas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume um trace gravado com main.py --trace.")
+    parser.add_argument("trace", help="Arquivo de trace (.jsonl)")
+    parser.add_argument("--perfil", help="Arquivo .prof do cProfile gravado junto (main.py --perfil)")
+    parser.add_argument("--top", type=int, default=20, help="Funções do perfil listadas")
+    args = parser.parse_args(argv)
+
+    resumo = resumir(args.trace)
+    print(formatar_resumo(resumo))
+    if args.perfil:
+        import pstats
+        print()
+        pstats.Stats(args.perfil).sort_stats("cumulative").print_stats(args.top)
+    return resumo
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,59 @@
+import time
+INICIO = time.perf_counter() # Marca o início do programa para medir o tempo de inicialização
 import tkinter as tk
-from tkinter import messagebox, simpledialog, filedialog
+from tkinter import messagebox, filedialog
+import argparse
+import base64
+from concurrent.futures import ThreadPoolExecutor
 import json
-import os
-import statistics
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from collections import Counter
-import time
-
-# --- user_data.py (Exemplo de implementação) ---
-class UserDataManager:
-    def __init__(self, filename="users.json"):
-        self.filename = filename
-        self.users = self.load_users()
-
-    def load_users(self):
-        if os.path.exists(self.filename):
-            with open(self.filename, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
-
-    def save_users(self):
-        with open(self.filename, 'w', encoding='utf-8') as f:
-            json.dump(self.users, f, indent=4)
-
-    def add_user(self, username, password, age, callback=None):
-        if username in self.users:
-            raise ValueError("Nome de usuário já existe.")
-        self.users[username] = {"password": password, "age": age, "acertos": 0, "erros": 0, "tempo": 0}
-        self.save_users()
-        if callback:
-            callback(username, self.users[username])
-
-    def validate_user(self, username, password):
-        user = self.users.get(username)
-        return user and user["password"] == password
-
-# --- Fim de user_data.py ---
+import threading
+import instrumentation
+from instrumentation import medido
+from question_bank import default_bank
+from quiz_session import CANCELADO, CONCLUIDO, INTRODUCAO, PERGUNTA, RESPOSTA, QuizSession
+from segments import format_table
+from user_stats import resumo_desempenho
+from user_data import UserDataManager
+
+QUESTOES_POR_LICAO = 5 # Lições maiores que isso sorteiam um subconjunto a cada vez
+QUESTOES_REVISAO = 8
+TOP_RANKING = 5 # Usuários listados abaixo dos cards
+INTERVALO_ESTATISTICAS_MS = 1000 # No máximo uma atualização das estatísticas gerais por intervalo
+INTERVALO_GRAVACAO_MS = 5000 # Flush periódico das alterações pendentes, separado da tela
+GRUPOS = (("Acertos por faixa de idade", "idade"), ("Acertos por lição", "licao"), ("Acertos por mês de cadastro", "cadastro"))
+
+
+def carregar_graficos():
+    # matplotlib e NumPy só são importados quando os gráficos são usados (ou no pré-aquecimento)
+    import charts
+    import user_columns
+    return charts, user_columns
+
+
+def registrar_inicializacao(segundos, caminho=None):
+    print(f"Tempo de inicialização: {segundos * 1000:.1f} ms")
+    instrumentation.evento("inicializacao", ms=round(segundos * 1000, 1))
+    if caminho:
+        with open(caminho, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"data": time.strftime("%Y-%m-%dT%H:%M:%S"), "inicializacao_ms": round(segundos * 1000, 1)}) + "\n")
 
 
 class LoginWindow:
-    def __init__(self, root):
+    # Ciclo de vida da sessão: a mesma raiz Tk e o mesmo gerenciador (já carregado) servem ao
+    # login e ao painel; "Sair" no painel volta para cá sem recarregar nada
+    def __init__(self, root, user_data_manager=None):
         self.root = root
+        self.user_data_manager = user_data_manager if user_data_manager is not None else UserDataManager(snapshot=True)
+        self.main_app = None
+        self.fundo = self.root.cget("bg")
+
+        self.mostrar()
+
+    def mostrar(self):
         self.root.title("Login e Registro")
         self.root.geometry("400x300")
-        self.user_data_manager = UserDataManager()
-
+        self.root.configure(bg=self.fundo)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.create_widgets()
 
     def create_widgets(self):
@@ -73,19 +81,31 @@ class LoginWindow:
         self.btn_register = tk.Button(self.frame, text="Registrar", command=self.register)
         self.btn_register.grid(row=3, column=1, pady=10)
 
+    @medido
     def login(self):
         username = self.entry_username.get()
         password = self.entry_password.get()
 
         if self.user_data_manager.validate_user(username, password):
             messagebox.showinfo("Sucesso", f"Bem-vindo, {username}!")
-            self.root.destroy()
-            main_root = tk.Tk()
-            app = MainApp(main_root, self.user_data_manager, username) # Pass user_data_manager
-            main_root.mainloop()
+            self.iniciar_sessao(username)
         else:
             messagebox.showerror("Erro", "Usuário ou senha incorretos.")
 
+    @medido
+    def iniciar_sessao(self, username):
+        # Troca o formulário pelo painel na mesma janela, sem outro Tk() nem outro mainloop
+        self.frame.destroy()
+        self.main_app = MainApp(self.root, self.user_data_manager, username, ao_sair=self.sessao_encerrada)
+
+    def sessao_encerrada(self):
+        self.main_app = None
+        self.mostrar()
+
+    def on_closing(self):
+        self.user_data_manager.close() # Só grava se ficou algo pendente
+        self.root.destroy()
+
     def register(self):
         username = self.entry_username.get()
         password = self.entry_password.get()
@@ -113,38 +133,223 @@ class LoginWindow:
             messagebox.showerror("Erro", str(e))
 
 
+class QuizPanel:
+    # Quiz embutido no main_content, no lugar da sequência de caixas de diálogo. Os widgets são
+    # criados uma vez e só reconfigurados a cada mudança de estado da QuizSession.
+    def __init__(self, parent, on_answer, on_finish, on_close):
+        self.on_answer = on_answer # (questão, acertou, segundos) a cada resposta
+        self.on_finish = on_finish # (sessão) quando o quiz termina ou é cancelado
+        self.on_close = on_close # Painel fechado pelo usuário
+        self.session = None
+        self.final_message = None
+
+        self.frame = tk.Frame(parent, bg="white", bd=2, relief="groove")
+        self.title_label = tk.Label(self.frame, font=("Arial", 14, "bold"), bg="white", fg="#2c3e50", wraplength=520, justify="left")
+        self.title_label.pack(anchor="w", padx=15, pady=(10, 0))
+        self.progress_label = tk.Label(self.frame, font=("Arial", 10), bg="white", fg="#7f8c8d")
+        self.progress_label.pack(anchor="w", padx=15)
+        self.text_label = tk.Label(self.frame, font=("Arial", 12), bg="white", fg="#34495e", wraplength=520, justify="left")
+        self.text_label.pack(anchor="w", padx=15, pady=10)
+
+        self.choice = tk.StringVar()
+        self.options_frame = tk.Frame(self.frame, bg="white")
+        self.options_frame.pack(anchor="w", padx=25)
+        self.option_buttons = [] # Reaproveitados entre as questões
+
+        self.feedback_label = tk.Label(self.frame, font=("Arial", 12, "bold"), bg="white", wraplength=520, justify="left")
+        self.feedback_label.pack(anchor="w", padx=15, pady=5)
+
+        buttons = tk.Frame(self.frame, bg="white")
+        buttons.pack(pady=(0, 10))
+        self.action_button = tk.Button(buttons, width=12, command=self.action, bg="#1abc9c", fg="white", font=("Arial", 11, "bold"), bd=0, activebackground="#16a085")
+        self.action_button.pack(side="left", padx=5)
+        self.cancel_button = tk.Button(buttons, text="Cancelar", width=12, command=self.cancel, bg="#c0392b", fg="white", font=("Arial", 11, "bold"), bd=0, activebackground="#a93226")
+        self.cancel_button.pack(side="left", padx=5)
+
+        self.frame.winfo_toplevel().bind("<Return>", lambda event: self.action() if self.active else None, add="+")
+
+    @property
+    def active(self):
+        return self.session is not None and not self.session.finished
+
+    def start(self, session, final_message=None):
+        self.session = session
+        self.final_message = final_message
+        self.frame.pack(pady=20, padx=20, fill="x")
+        self.render()
+
+    def _show_options(self, options):
+        while len(self.option_buttons) < len(options):
+            button = tk.Radiobutton(self.options_frame, variable=self.choice, font=("Arial", 12), bg="white", anchor="w", justify="left", wraplength=480)
+            self.option_buttons.append(button)
+        for button, (key, value) in zip(self.option_buttons, options.items()):
+            button.config(text=f"({key}) {value}", value=key, state="normal")
+            button.pack(anchor="w", fill="x")
+        for button in self.option_buttons[len(options):]:
+            button.pack_forget()
+
+    def _hide_options(self):
+        for button in self.option_buttons:
+            button.pack_forget()
+
+    def render(self):
+        session = self.session
+        state = session.state
+        if state == INTRODUCAO:
+            title, text = session.intro
+            self.title_label.config(text=title)
+            self.progress_label.config(text=f"{len(session.questions)} questões")
+            self.text_label.config(text=text)
+            self.feedback_label.config(text="")
+            self._hide_options()
+            self.action_button.config(text="Começar")
+        elif state == PERGUNTA:
+            question = session.current
+            self.title_label.config(text="Quiz")
+            self.progress_label.config(text=f"Questão {session.index + 1}/{len(session.questions)}")
+            self.text_label.config(text=question.question)
+            self.feedback_label.config(text="")
+            self.choice.set("")
+            self._show_options(question.options)
+            self.action_button.config(text="Responder")
+        elif state == RESPOSTA:
+            for button in self.option_buttons:
+                button.config(state="disabled")
+            if session.last_correct:
+                self.feedback_label.config(text="Correto!", fg="#27ae60")
+            else:
+                self.feedback_label.config(text=f"Incorreto. {session.current.explanation}", fg="#c0392b")
+            last = session.index + 1 >= len(session.questions)
+            self.action_button.config(text="Concluir" if last else "Próxima")
+        else:
+            total = session.score + session.erros
+            self.title_label.config(text="Quiz concluído!" if state == CONCLUIDO else "Quiz cancelado")
+            self.progress_label.config(text="")
+            self.text_label.config(text=f"Acertos: {session.score} de {total} | Tempo: {session.elapsed:.1f} s")
+            self.feedback_label.config(text=(self.final_message or "") if state == CONCLUIDO else "", fg="#2c3e50")
+            self._hide_options()
+            self.action_button.config(text="Fechar")
+        self.cancel_button.config(state="disabled" if session.finished else "normal")
+
+    def action(self):
+        session = self.session
+        if session.state == INTRODUCAO:
+            session.start()
+        elif session.state == PERGUNTA:
+            if not self.choice.get():
+                self.feedback_label.config(text="Escolha uma das opções.", fg="#c0392b")
+                return
+            question = session.current
+            correct, latency = session.answer(self.choice.get())
+            self.on_answer(question, correct, latency)
+        elif session.state == RESPOSTA:
+            session.next()
+        else:
+            self.close()
+            return
+        if session.finished:
+            self.on_finish(session)
+        self.render()
+
+    def cancel(self, confirm=True):
+        if not self.active:
+            return
+        if confirm and not messagebox.askyesno("Cancelar", "Deseja cancelar o quiz? As respostas já dadas ficam gravadas."):
+            return
+        self.session.cancel()
+        self.on_finish(self.session)
+        self.render()
+
+    def close(self):
+        self.frame.pack_forget()
+        self.session = None
+        self.on_close()
+
+
 class MainApp:
-    def __init__(self, root, user_data_manager, current_user):
+    @medido
+    def __init__(self, root, user_data_manager, current_user, preaquecer_graficos=True, ao_sair=None, criar_widgets=True):
+        # criar_widgets=False: só o estado, sem tocar no Tk (benchmark.py e testes definem os cards)
         self.root = root
-        self.user_data_manager = user_data_manager
-        self.users = self.user_data_manager.users # Acesso aos dados de todos os usuários
+        self.ao_sair = ao_sair # Chamado depois de "Sair" (LoginWindow volta ao formulário)
+        self.user_data_manager = user_data_manager # UserDataManager local ou QuizClient de um servidor
         self.current_user = current_user
-
-        self.root.title("Programa de Inclusão Digital e Tecnológica")
-        self.root.geometry("800x600")
-        self.root.configure(bg="#2c3e50")
+        self.user_data_manager.wait_loaded() # O painel usa as estatísticas de todos os usuários
+        self.question_bank = default_bank() # Carregado uma vez e compartilhado
+        self.ordem_revisao = [question.id for question in sorted(self.question_bank.questions.values(), key=lambda question: question.difficulty)]
 
         # Inicializa os totais para o usuário atual
-        user_data = self.users.get(self.current_user, {"acertos": 0, "erros": 0, "tempo": 0})
+        user_data = self.user_data_manager.get_user_data(self.current_user) or {"acertos": 0, "erros": 0, "tempo": 0}
         self.total_acertos = user_data.get("acertos", 0)
         self.total_erros = user_data.get("erros", 0)
         self.total_questoes = self.total_acertos + self.total_erros
         self.total_tempo_gasto = user_data.get("tempo", 0)
 
         self.start_time = None
+        self.chart_executor = None
+        self.chart_figure = None # Reaproveitada a cada abertura da janela de gráficos
+        self.quiz_panel = None # Criado no primeiro quiz e reaproveitado
+
+        self.card_values = {} # Último texto de cada card: só reconfigura o que mudou
+        self.intervalo_estatisticas_ms = INTERVALO_ESTATISTICAS_MS
+        self.ultima_atualizacao_geral = None
+        self.atualizacao_geral_agendada = False
+        self.agendamentos = {} # Chamadas root.after pendentes (por nome, janela ou future), canceladas no fim da sessão
+        self.janelas = [] # Janelas (Toplevel) abertas nesta sessão, fechadas no fim dela
+
+        if not criar_widgets:
+            return
+
+        self.root.title("Programa de Inclusão Digital e Tecnológica")
+        self.root.geometry("800x600")
+        self.root.configure(bg="#2c3e50")
 
         self.create_widgets()
         self.update_info_cards()
+        if not self.user_data_manager.writes_in_background:
+            # Com write-behind (ou servidor) a gravação já acontece fora da thread do Tk
+            self.agendamentos["gravacao"] = self.root.after(INTERVALO_GRAVACAO_MS, self.gravar_periodicamente)
 
         # Salva os dados do usuário ao fechar a janela principal
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+        if preaquecer_graficos:
+            # Importa a parte de gráficos em segundo plano enquanto o usuário navega
+            threading.Thread(target=carregar_graficos, name="preaquecer-graficos", daemon=True).start()
+
+    @medido
+    def encerrar_sessao(self):
+        # Grava o quiz em andamento e o que o armazenamento tiver pendente; nos modos que já
+        # gravam a cada alteração nada é regravado
+        if self.quiz_panel is not None:
+            self.quiz_panel.cancel(confirm=False) # Grava o que já foi respondido
+        if self.chart_executor is not None:
+            self.chart_executor.shutdown(wait=False)
+        for after_id in self.agendamentos.values():
+            self.root.after_cancel(after_id)
+        self.agendamentos.clear()
+        for window in self.janelas:
+            if window.winfo_exists():
+                window.destroy()
+        self.janelas.clear()
+        self.user_data_manager.flush()
+        self.user_data_manager.checkpoint() # Uma vez por sessão, não no flush periódico
+
+    def sair(self):
+        self.encerrar_sessao()
+        self.sidebar.destroy()
+        self.main_content.destroy()
+        if self.ao_sair is not None:
+            self.ao_sair()
+
+    @medido
     def on_closing(self):
-        self.user_data_manager.save_users()
+        self.encerrar_sessao()
+        self.user_data_manager.close()
         self.root.destroy()
 
     def create_widgets(self):
-        sidebar = tk.Frame(self.root, bg="#34495e", width=250)
+        sidebar = self.sidebar = tk.Frame(self.root, bg="#34495e", width=250)
         sidebar.pack(side="left", fill="y")
 
         self.main_content = tk.Frame(self.root, bg="#ecf0f1")
@@ -162,6 +367,10 @@ class MainApp:
         self.card_media = self.create_info_card(self.cards_frame, "Média de Acertos (Geral)", "0.0")
         self.card_mediana = self.create_info_card(self.cards_frame, "Mediana de Acertos (Geral)", "0.0")
         self.card_moda = self.create_info_card(self.cards_frame, "Moda de Acertos (Geral)", "0")
+        self.card_ranking = self.create_info_card(self.cards_frame, "Sua Posição no Ranking", "-")
+
+        self.top_label = tk.Label(self.main_content, text="", font=("Arial", 11), bg="#ecf0f1", fg="#34495e")
+        self.top_label.pack()
 
         self.welcome_label = tk.Label(self.main_content, text="Bem-vindo ao programa! Use o menu à esquerda para navegar pelas lições.", font=("Arial", 14), bg="#ecf0f1", fg="#34495e", wraplength=450, justify="left")
         self.welcome_label.pack(pady=30, padx=20)
@@ -187,6 +396,13 @@ class MainApp:
 
         self.add_graph_button(sidebar) # Adiciona o botão de gráficos
 
+        btn_grupos = tk.Button(sidebar, text="8. Estatísticas por grupo", width=28, command=self.exibir_grupos, bg="#16a085", fg="white", font=("Arial", 12, "bold"), bd=0, relief="flat", activebackground="#138d75")
+        btn_grupos.pack(pady=10, padx=10)
+
+        if self.ao_sair is not None:
+            btn_sair = tk.Button(sidebar, text="Sair", width=28, command=self.sair, bg="#c0392b", fg="white", font=("Arial", 12, "bold"), bd=0, relief="flat", activebackground="#a93226")
+            btn_sair.pack(side="bottom", pady=10, padx=10)
+
     def create_info_card(self, parent, title, value):
         card = tk.Frame(parent, bg="white", bd=2, relief="groove", width=200, height=100)
         card.pack(side="left", padx=5, pady=5, expand=True, fill="both") # Ajuste padx/pady para mais cards
@@ -199,230 +415,262 @@ class MainApp:
 
         return label_value
 
+    def set_card(self, label, text):
+        if self.card_values.get(label) != text:
+            label.config(text=text)
+            self.card_values[label] = text
+
+    @medido
     def update_info_cards(self):
+        # Os cards do usuário atual mudam na hora; as estatísticas gerais seguem o intervalo.
+        # A gravação não acontece aqui (ver gravar_periodicamente)
+        self.update_user_cards()
+        self.agendar_estatisticas_gerais()
+
+    def update_user_cards(self):
         # Dados do usuário atual
-        user_data = self.users.get(self.current_user, {"acertos": 0, "erros": 0, "tempo": 0})
+        user_data = self.user_data_manager.get_user_data(self.current_user) or {"acertos": 0, "erros": 0, "tempo": 0}
         self.total_acertos = user_data.get("acertos", 0)
         self.total_erros = user_data.get("erros", 0)
         self.total_questoes = self.total_acertos + self.total_erros
+        self.total_tempo_gasto = user_data.get("tempo", 0)
 
-        self.card_total.config(text=str(self.total_questoes))
-        self.card_acertos.config(text=str(self.total_acertos))
+        self.set_card(self.card_total, str(self.total_questoes))
+        self.set_card(self.card_acertos, str(self.total_acertos))
         percentual = (self.total_acertos / self.total_questoes * 100) if self.total_questoes > 0 else 0
-        self.card_percentual.config(text=f"{percentual:.2f}")
-
-        # Estatísticas gerais de todos os usuários
-        acertos_list = [user.get("acertos", 0) for user in self.users.values()]
-        if acertos_list:
-            media = statistics.mean(acertos_list)
-            mediana = statistics.median(acertos_list)
-            try:
-                moda = statistics.mode(acertos_list)
-            except statistics.StatisticsError:
-                moda = "N/A" # Não há moda única
+        self.set_card(self.card_percentual, f"{percentual:.2f}")
+
+    def agendar_estatisticas_gerais(self):
+        if self.atualizacao_geral_agendada:
+            return # Já há uma atualização marcada; ela verá os dados mais recentes
+        intervalo = self.intervalo_estatisticas_ms / 1000
+        agora = time.monotonic()
+        if self.ultima_atualizacao_geral is None or agora - self.ultima_atualizacao_geral >= intervalo:
+            self.update_global_cards()
         else:
-            media = mediana = moda = 0
-
-        self.card_media.config(text=f"{media:.2f}")
-        self.card_mediana.config(text=f"{mediana:.2f}")
-        self.card_moda.config(text=str(moda))
-        self.user_data_manager.save_users() # Salva os dados atualizados
-
-    def ask_quiz(self, questions):
-        score = 0
-        start_time = time.time()
-        for question_idx, (question, options, correct, explanation) in enumerate(questions):
-            options_text = "\n".join([f"({key}) {value}" for key, value in options.items()])
-            while True:
-                answer = simpledialog.askstring("Quiz", f"Questão {question_idx+1}/{len(questions)}:\n\n{question}\n\n{options_text}\n\nEscolha a resposta correta:").strip().lower()
-                if answer is None:
-                    if messagebox.askyesno("Cancelar", "Deseja cancelar o quiz? Seu progresso nesta sessão será perdido."):
-                        return score
-                    else:
-                        continue
-                if answer in options:
-                    break
-                else:
-                    messagebox.showerror("Erro", "Resposta inválida. Por favor, escolha uma das opções listadas (a, b, c...).")
-
-            if answer == correct:
-                messagebox.showinfo("Correto", "Correto!")
-                score += 1
-                self.users[self.current_user]["acertos"] += 1
-            else:
-                messagebox.showinfo("Incorreto", f"Incorreto. {explanation}")
-                self.users[self.current_user]["erros"] += 1
-        end_time = time.time()
-        elapsed = end_time - start_time
-        self.users[self.current_user]["tempo"] += elapsed
+            self.atualizacao_geral_agendada = True
+            espera = intervalo - (agora - self.ultima_atualizacao_geral)
+            self.agendamentos["estatisticas"] = self.root.after(int(espera * 1000) + 1, self.atualizacao_geral_agendada_vencida)
+
+    def atualizacao_geral_agendada_vencida(self):
+        self.agendamentos.pop("estatisticas", None)
+        self.atualizacao_geral_agendada = False
+        self.update_global_cards()
+
+    @medido
+    def update_global_cards(self):
+        self.ultima_atualizacao_geral = time.monotonic()
+        # Estatísticas gerais de todos os usuários, mantidas incrementalmente pelo gerenciador
+        acertos_stats = self.user_data_manager.stats.acertos
+        media = acertos_stats.mean()
+        mediana = acertos_stats.median()
+        moda = acertos_stats.mode()
+
+        self.set_card(self.card_media, f"{media:.2f}")
+        self.set_card(self.card_mediana, f"{mediana:.2f}")
+        self.set_card(self.card_moda, str(moda))
+
+        # Ranking pelo índice do gerenciador: posição em O(log n), sem ordenar os usuários
+        posicao, total_usuarios = self.user_data_manager.rank(self.current_user)
+        self.set_card(self.card_ranking, f"{posicao}º de {total_usuarios}" if posicao else "-")
+        lideres = self.user_data_manager.top(TOP_RANKING)
+        self.set_card(self.top_label, f"Top {TOP_RANKING}: " + ", ".join(f"{nome} ({acertos})" for nome, acertos in lideres) if lideres else "")
+
+    def gravar_periodicamente(self):
+        # Grava o que o armazenamento ainda tiver pendente (compartilhado em lote, histórico de
+        # respostas); nos modos que gravam a cada alteração o flush quase não faz nada
+        self.user_data_manager.flush()
+        self.agendamentos["gravacao"] = self.root.after(INTERVALO_GRAVACAO_MS, self.gravar_periodicamente)
+
+    def nova_janela(self, titulo):
+        # Toplevel que pertence à sessão: some junto com o painel ao sair
+        self.janelas = [window for window in self.janelas if window.winfo_exists()]
+        window = tk.Toplevel(self.root)
+        window.title(titulo)
+        self.janelas.append(window)
+        return window
+
+    @medido
+    def ask_quiz(self, questions, intro=None, mensagem_final=None):
+        # Abre o quiz no painel embutido e retorna na hora; o resto acontece nos eventos do Tk.
+        # questions: questões do banco (question_bank.Question); intro: (título, texto)
+        if self.quiz_panel is not None and self.quiz_panel.active:
+            if not messagebox.askyesno("Quiz em andamento", "Há um quiz em andamento. Deseja cancelá-lo e começar outro?"):
+                return
+            self.quiz_panel.cancel(confirm=False)
+        if self.quiz_panel is None:
+            self.quiz_panel = QuizPanel(self.main_content, self.resposta_registrada, self.quiz_concluido, self.fechar_quiz)
+        self.welcome_label.pack_forget()
+        self.quiz_panel.start(QuizSession(questions, intro), mensagem_final)
+
+    def resposta_registrada(self, question, correct, latency):
+        self.user_data_manager.record_answer(self.current_user, question.lesson, question.id, correct, latency)
+
+    @medido
+    def quiz_concluido(self, session):
+        # Um único registro por quiz: o gerenciador atualiza os contadores e as estatísticas gerais
+        if session.state == CANCELADO:
+            if session.score or session.erros:
+                self.user_data_manager.record_quiz_result(self.current_user, session.score, session.erros, 0)
+        else:
+            self.user_data_manager.record_quiz_result(self.current_user, session.score, session.erros, session.elapsed)
         self.update_info_cards() # Atualiza os cards após cada quiz
-        return score
+
+    def fechar_quiz(self):
+        self.welcome_label.pack(pady=30, padx=20)
+
+    def mostrar_licao(self, lesson_id):
+        lesson = self.question_bank.lesson(lesson_id)
+        if len(lesson.questions) <= QUESTOES_POR_LICAO:
+            questions = lesson.questions
+        else:
+            questions = self.question_bank.draw(QUESTOES_POR_LICAO, lesson=lesson_id)
+        self.ask_quiz(questions, intro=(lesson.title, lesson.info))
 
     def introducao_computador(self):
-        info = (
-            "Introdução ao Computador:\n"
-            "Um computador é uma máquina que processa informações e executa programas.\n"
-            "Ele é composto por hardware (partes físicas) e software (programas).\n"
-            "Aprender a usar o computador é o primeiro passo para a inclusão digital."
-        )
-        messagebox.showinfo("Introdução ao Computador", info)
-        questions = [
-            ("O que é hardware?", {'a': 'Programas', 'b': 'Partes físicas', 'c': 'Dados'}, 'b', "Hardware são as partes físicas do computador."),
-            ("Qual componente é considerado software?", {'a': 'Sistema operacional', 'b': 'Teclado', 'c': 'Monitor'}, 'a', "Software são os programas, como o sistema operacional."),
-        ]
-        self.ask_quiz(questions)
+        self.mostrar_licao("introducao_computador")
 
     def seguranca_internet(self):
-        info = (
-            "Segurança na Internet:\n"
-            "1. Nunca compartilhe suas senhas.\n"
-            "2. Use senhas fortes e diferentes para cada conta.\n"
-            "3. Cuidado com e-mails e links suspeitos.\n"
-            "4. Mantenha seu antivírus atualizado.\n"
-            "5. Evite usar redes Wi-Fi públicas para transações importantes."
-        )
-        messagebox.showinfo("Segurança na Internet", info)
-        questions = [
-            ("Qual é uma boa prática para manter sua conta segura?", {'a': 'Compartilhar senhas', 'b': 'Usar senhas fortes', 'c': 'Ignorar atualizações'}, 'b', "Usar senhas fortes ajuda a proteger suas contas."),
-            ("Por que evitar redes Wi-Fi públicas para transações importantes?", {'a': 'São lentas', 'b': 'Podem ser inseguras', 'c': 'São caras'}, 'b', "Redes públicas podem ser inseguras e expor seus dados."),
-        ]
-        self.ask_quiz(questions)
+        self.mostrar_licao("seguranca_internet")
 
     def uso_basico_software(self):
-        info = (
-            "Uso Básico de Software:\n"
-            "Aprenda a usar programas comuns como editores de texto, navegadores e aplicativos de mensagens.\n"
-            "Pratique abrir, salvar e editar documentos.\n"
-            "Explore tutoriais online para aprender mais sobre os programas que você usa."
-        )
-        messagebox.showinfo("Uso Básico de Software", info)
-        questions = [
-            ("Qual ação você deve fazer para salvar um documento?", {'a': 'Abrir', 'b': 'Salvar', 'c': 'Fechar'}, 'b', "Salvar é a ação para guardar seu documento."),
-            ("Qual programa é usado para navegar na internet?", {'a': 'Editor de texto', 'b': 'Navegador', 'c': 'Planilha'}, 'b', "Navegadores são usados para acessar a internet."),
-        ]
-        self.ask_quiz(questions)
+        self.mostrar_licao("uso_basico_software")
 
     def dicas_inclusao(self):
-        info = (
-            "Dicas para Inclusão Digital:\n"
-            "1. Pratique regularmente para ganhar confiança.\n"
-            "2. Participe de cursos e oficinas de informática.\n"
-            "3. Peça ajuda a amigos ou familiares quando necessário.\n"
-            "4. Use recursos acessíveis, como leitores de tela, se precisar.\n"
-            "5. Mantenha-se atualizado com as novas tecnologias."
-        )
-        messagebox.showinfo("Dicas para Inclusao Digital", info)
-        questions = [
-            ("O que pode ajudar na inclusão digital?", {'a': 'Praticar regularmente', 'b': 'Ignorar a tecnologia', 'c': 'Evitar cursos'}, 'a', "Praticar regularmente ajuda a ganhar confiança."),
-            ("Por que participar de cursos de informática?", {'a': 'Para aprender mais', 'b': 'Para perder tempo', 'c': 'Para evitar tecnologia'}, 'a', "Cursos ajudam a aprender e se atualizar."),
-        ]
-        self.ask_quiz(questions)
+        self.mostrar_licao("dicas_inclusao")
 
     def revisar_todas(self):
-        messagebox.showinfo("Revisão", "Iniciando revisão de todas as lições. Prepare-se para os quizzes!")
-        self.introducao_computador()
-        self.seguranca_internet()
-        self.uso_basico_software()
-        self.dicas_inclusao()
-        messagebox.showinfo("Revisão Concluída", "Você revisou todas as lições!")
+        # Revisão espaçada: primeiro o que o usuário está para esquecer, depois questões novas
+        # (das mais fáceis para as mais difíceis)
+        ids = self.user_data_manager.review_questions(self.current_user, QUESTOES_REVISAO, self.ordem_revisao)
+        questions = [self.question_bank.get(question_id) for question_id in ids]
+        self.ask_quiz(questions, intro=("Revisão", "Iniciando revisão de todas as lições. Prepare-se para os quizzes!"),
+                      mensagem_final="Você revisou todas as lições!")
 
     def mostrar_resumo(self):
-        if self.total_questoes > 0:
-            percentual = (self.total_acertos / self.total_questoes) * 100
-            minutos = int(self.total_tempo_gasto // 60)
-            segundos = int(self.total_tempo_gasto % 60)
-            resumo = (
-                f"Resumo do seu desempenho, {self.current_user}:\n\n"
-                f"Total de questões respondidas: {self.total_questoes}\n"
-                f"Total de acertos: {self.total_acertos}\n"
-                f"Total de erros: {self.total_erros}\n"
-                f"Percentual de acertos: {percentual:.2f}%\n"
-                f"Tempo total gasto nos quizzes: {minutos} minutos e {segundos} segundos"
-            )
-        else:
-            resumo = "Nenhuma questão respondida ainda. Comece uma lição para ver seu desempenho!"
+        resumo = resumo_desempenho(self.current_user, self.total_acertos, self.total_erros, self.total_tempo_gasto)
         messagebox.showinfo("Resumo do seu desempenho", resumo)
 
     def add_graph_button(self, sidebar):
         btn_graficos = tk.Button(sidebar, text="7. Ver Gráficos Estatísticos", width=28, command=self.exibir_graficos, bg="#27ae60", fg="white", font=("Arial", 12, "bold"), bd=0, relief="flat", activebackground="#229954")
         btn_graficos.pack(pady=10, padx=10)
 
+    @medido
     def exibir_graficos(self):
-        # Coleta os dados de todos os usuários
-        acertos_all = [u.get("acertos", 0) for u in self.users.values() if u.get("acertos") is not None]
-        erros_all = [u.get("erros", 0) for u in self.users.values() if u.get("erros") is not None]
-        idades_all = [u.get("age", 0) for u in self.users.values() if u.get("age") is not None]
-
-        # Cria uma nova janela para os gráficos
-        window = tk.Toplevel(self.root)
-        window.title("Gráficos Estatísticos")
+        # Cria uma nova janela para os gráficos; o desenho é feito numa thread separada
+        window = self.nova_janela("Gráficos Estatísticos")
         window.geometry("900x700") # Aumenta a altura para 4 subplots
 
-        fig, axs = plt.subplots(2, 2, figsize=(12, 10)) # Organiza em 2 linhas, 2 colunas
-        fig.suptitle("Estatísticas dos Usuários Cadastrados", fontsize=16)
-
-        # Gráfico 1: Histograma de Acertos
-        if acertos_all:
-            axs[0, 0].hist(acertos_all, bins=max(acertos_all) + 1 if acertos_all else 1, color='skyblue', edgecolor='black')
-        else:
-            axs[0, 0].text(0.5, 0.5, 'Sem dados', horizontalalignment='center', verticalalignment='center', transform=axs[0, 0].transAxes)
-        axs[0, 0].set_title("Distribuição de Acertos")
-        axs[0, 0].set_xlabel("Quantidade de Acertos")
-        axs[0, 0].set_ylabel("Número de Usuários")
-        axs[0, 0].set_xticks(range(max(acertos_all) + 1)) # Garante ticks inteiros no eixo X
-
-        # Gráfico 2: Histograma de Erros
-        if erros_all:
-            axs[0, 1].hist(erros_all, bins=max(erros_all) + 1 if erros_all else 1, color='salmon', edgecolor='black')
-        else:
-            axs[0, 1].text(0.5, 0.5, 'Sem dados', horizontalalignment='center', verticalalignment='center', transform=axs[0, 1].transAxes)
-        axs[0, 1].set_title("Distribuição de Erros")
-        axs[0, 1].set_xlabel("Quantidade de Erros")
-        axs[0, 1].set_ylabel("Número de Usuários")
-        axs[0, 1].set_xticks(range(max(erros_all) + 1)) # Garante ticks inteiros no eixo X
-
-
-        # Gráfico 3: Histograma de Idades
-        if idades_all:
-            axs[1, 0].hist(idades_all, bins=max(idades_all) // 5 if idades_all else 1, color='lightgreen', edgecolor='black') # Bins por faixa de 5 anos
-        else:
-            axs[1, 0].text(0.5, 0.5, 'Sem dados', horizontalalignment='center', verticalalignment='center', transform=axs[1, 0].transAxes)
-        axs[1, 0].set_title("Distribuição de Idades")
-        axs[1, 0].set_xlabel("Idade")
-        axs[1, 0].set_ylabel("Número de Usuários")
-
-        # Gráfico 4: Distribuição de Idades (Barras)
-        if idades_all:
-            age_counts = Counter(idades_all)
-            ages = sorted(age_counts.keys())
-            counts = [age_counts[age] for age in ages]
-            axs[1, 1].bar(ages, counts, color='orange', edgecolor='black')
-        else:
-            axs[1, 1].text(0.5, 0.5, 'Sem dados', horizontalalignment='center', verticalalignment='center', transform=axs[1, 1].transAxes)
-        axs[1, 1].set_title("Contagem de Usuários por Idade")
-        axs[1, 1].set_xlabel("Idade")
-        axs[1, 1].set_ylabel("Número de Usuários")
-        axs[1, 1].set_xticks(ages) # Garante ticks para cada idade presente
-
-        plt.tight_layout(rect=[0, 0.03, 1, 0.95]) # Ajusta layout para evitar sobreposição
-
-        canvas = FigureCanvasTkAgg(fig, master=window)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        status = tk.Label(window, text="Gerando gráficos...", font=("Arial", 14))
+        status.pack(expand=True)
+
+        charts, user_columns = carregar_graficos()
+        if self.chart_executor is None:
+            # Uma única thread: a mesma figura é reaproveitada e nunca desenhada em paralelo
+            self.chart_executor = ThreadPoolExecutor(max_workers=1)
+            self.chart_figure = charts.create_figure()
+        snapshot = self.user_data_manager.stats.snapshot()
+        acertos = self.user_data_manager.columns().acertos.copy() # Cópia do array para a outra thread
+        future = self.chart_executor.submit(self.preparar_graficos, snapshot, acertos)
+        self.agendamentos[window] = self.root.after(50, self.mostrar_graficos_prontos, window, status, future, snapshot)
+
+    @medido
+    def preparar_graficos(self, snapshot, acertos):
+        # Roda na thread dos gráficos: não toca em nenhum widget Tk
+        charts, user_columns = carregar_graficos()
+        return charts.render_png(self.chart_figure, snapshot), user_columns.describe(acertos)
+
+    def mostrar_graficos_prontos(self, window, status, future, snapshot):
+        self.agendamentos.pop(window, None)
+        if not window.winfo_exists():
+            return
+        if not future.done():
+            self.agendamentos[window] = self.root.after(50, self.mostrar_graficos_prontos, window, status, future, snapshot)
+            return
+        status.destroy()
+        png, resumo = future.result()
+
+        image = tk.PhotoImage(master=window, data=base64.b64encode(png).decode("ascii"))
+        label = tk.Label(window, image=image)
+        label.image = image # Mantém a referência para a imagem não ser descartada
+        label.pack(fill="both", expand=True)
+
+        # Estatísticas adicionais
+        percentis = " | ".join(f"P{p}: {valor:.1f}" for p, valor in resumo["percentiles"].items())
+        stats_text = (
+            f"Acertos — Média: {resumo['mean']:.2f} | Mediana: {resumo['median']:.1f} | "
+            f"Moda: {resumo['mode']} | {percentis}"
+        )
+        tk.Label(window, text=stats_text, font=("Arial", 12)).pack(pady=2)
 
-        # Botão para salvar o gráfico dentro da janela de gráficos
-        btn_salvar = tk.Button(window, text="Salvar Gráfico", command=lambda: self.salvar_grafico(fig))
+        # Botão para salvar o gráfico dentro da janela de gráficos (com os dados desta janela)
+        btn_salvar = tk.Button(window, text="Salvar Gráfico", command=lambda: self.salvar_grafico(snapshot))
         btn_salvar.pack(pady=10)
 
-    def salvar_grafico(self, fig):
+    @medido
+    def exibir_grupos(self):
+        # Acertos por faixa de idade, lição e mês de cadastro; os totais por grupo já estão
+        # prontos no UserDataManager, nada aqui percorre os usuários
+        window = self.nova_janela("Estatísticas por grupo")
+        text = tk.Text(window, width=50, height=30, font=("Courier", 11))
+        text.pack(fill="both", expand=True, padx=10, pady=10)
+        for titulo, kind in GRUPOS:
+            text.insert("end", format_table(titulo, self.user_data_manager.segment_summary(kind)) + "\n\n")
+        text.config(state="disabled")
+
+    def salvar_grafico(self, snapshot):
         file_path = filedialog.asksaveasfilename(defaultextension=".png",
                                                  filetypes=[("PNG files", "*.png"), ("All files", "*.*")],
                                                  title="Salvar gráfico como")
         if file_path:
-            fig.savefig(file_path)
-            messagebox.showinfo("Salvar gráfico", f"Gráfico salvo em:\n{file_path}")
+            # A figura é compartilhada entre as janelas: é redesenhada e gravada na thread dos gráficos
+            future = self.chart_executor.submit(self.gravar_grafico, snapshot, file_path)
+            self.agendamentos[future] = self.root.after(50, self.grafico_salvo, future, file_path)
+
+    def gravar_grafico(self, snapshot, file_path):
+        # Roda na thread dos gráficos, com a resolução da figura (não a da tela)
+        charts = carregar_graficos()[0]
+        charts.draw_charts(self.chart_figure, charts.chart_data(snapshot))
+        self.chart_figure.savefig(file_path)
+
+    def grafico_salvo(self, future, file_path):
+        self.agendamentos.pop(future, None)
+        if not future.done():
+            self.agendamentos[future] = self.root.after(50, self.grafico_salvo, future, file_path)
+            return
+        try:
+            future.result()
+        except (IOError, ValueError) as e:
+            messagebox.showerror("Salvar gráfico", f"Não foi possível salvar o gráfico: {e}")
+            return
+        messagebox.showinfo("Salvar gráfico", f"Gráfico salvo em:\n{file_path}")
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    login_app = LoginWindow(root)
+    parser = argparse.ArgumentParser(description="Programa de Inclusão Digital e Tecnológica")
+    parser.add_argument("--users", default="users.json", help="Arquivo de usuários")
+    parser.add_argument("--storage", choices=["json", "log", "write-behind", "shared", "sqlite"], default="json", help="Tipo de armazenamento dos usuários")
+    parser.add_argument("--servidor", metavar="HOST:PORTA", help="Usa um quiz_server.py em vez do arquivo local")
+    parser.add_argument("--sem-snapshot", action="store_true", help="Não grava nem lê a cópia binária do arquivo de usuários")
+    parser.add_argument("--log-inicializacao", metavar="ARQUIVO", help="Acrescenta o tempo de inicialização (JSON por linha) a este arquivo")
+    parser.add_argument("--trace", metavar="ARQUIVO", help="Grava os tempos do login, painel, quizzes, cards, gráficos e arquivo de usuários (instrumentation.py)")
+    parser.add_argument("--perfil", metavar="ARQUIVO", help="Com --trace, grava também o perfil do cProfile (.prof)")
+    args = parser.parse_args()
+
+    if args.trace:
+        instrumentation.ativar(args.trace, perfil=args.perfil)
+
+    if args.servidor:
+        from quiz_server import QuizClient
+        host, _, porta = args.servidor.rpartition(":")
+        user_data_manager = QuizClient(host or "127.0.0.1", int(porta))
+    else:
+        # Carga em segundo plano: a janela de login abre sem esperar o arquivo inteiro
+        # O snapshot binário (user_snapshot.py) evita reler o JSON na abertura; não se aplica ao SQLite
+        opcoes = {} if args.storage == "sqlite" else {"snapshot": not args.sem_snapshot}
+        user_data_manager = UserDataManager(args.users, storage=args.storage, background_load=True, **opcoes)
+
+    root = tk.Tk() # Única raiz: login e painel se revezam nela
+    login_app = LoginWindow(root, user_data_manager)
+    # Medido quando a janela de login já está pronta para uso (primeiro ciclo ocioso do Tk)
+    root.after_idle(lambda: registrar_inicializacao(time.perf_counter() - INICIO, args.log_inicializacao))
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,113 @@
+import hashlib
+import hmac
+import secrets
+from collections import OrderedDict
+
+# Senhas guardadas como hash com sal. Formatos:
+#   pbkdf2_sha256$<iterações>$<sal hex>$<hash hex>
+#   scrypt$<n>$<r>$<p>$<sal hex>$<hash hex>
+
+SALT_BYTES = 16
+PARAM_COUNT = {"pbkdf2_sha256": 1, "scrypt": 3}
+
+
+def is_hashed(stored):
+    return isinstance(stored, str) and stored.split("$", 1)[0] in PARAM_COUNT
+
+
+def parse_hash(stored):
+    # (algoritmo, parâmetros, sal, hash) de um valor com hash, ou None se estiver corrompido
+    algorithm, *fields = stored.split("$")
+    if len(fields) != PARAM_COUNT.get(algorithm, -1) + 2:
+        return None
+    try:
+        params = tuple(int(value) for value in fields[:-2])
+        salt, expected = bytes.fromhex(fields[-2]), bytes.fromhex(fields[-1])
+    except ValueError:
+        return None
+    if any(value <= 0 for value in params) or not expected:
+        return None
+    return algorithm, params, salt, expected
+
+
+class PasswordHasher:
+    # O custo (iterations / scrypt_n, scrypt_r, scrypt_p) é ajustável; hashes antigos
+    # continuam válidos e são refeitos com o custo atual no próximo login
+    def __init__(self, algorithm="pbkdf2_sha256", iterations=200_000, scrypt_n=2 ** 14, scrypt_r=8, scrypt_p=1):
+        if algorithm not in ("pbkdf2_sha256", "scrypt"):
+            raise ValueError(f"Algoritmo de senha desconhecido: {algorithm}")
+        self.algorithm = algorithm
+        self.iterations = iterations
+        self.scrypt_params = (scrypt_n, scrypt_r, scrypt_p)
+
+    def _params(self):
+        if self.algorithm == "pbkdf2_sha256":
+            return (self.iterations,)
+        return self.scrypt_params
+
+    @staticmethod
+    def _digest(algorithm, params, password, salt):
+        if algorithm == "pbkdf2_sha256":
+            return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, params[0])
+        n, r, p = params
+        return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p)
+
+    def hash(self, password):
+        salt = secrets.token_bytes(SALT_BYTES)
+        params = self._params()
+        digest = self._digest(self.algorithm, params, password, salt)
+        return "$".join([self.algorithm, *map(str, params), salt.hex(), digest.hex()])
+
+    def verify(self, password, stored):
+        if not is_hashed(stored):
+            return hmac.compare_digest(str(stored).encode("utf-8"), password.encode("utf-8"))
+        parsed = parse_hash(stored)
+        if parsed is None:
+            return False  # Hash corrompido no arquivo: conta como senha errada
+        algorithm, params, salt, expected = parsed
+        try:
+            digest = self._digest(algorithm, params, password, salt)
+        except ValueError:
+            return False  # Parâmetros que o hashlib recusa (n do scrypt que não é potência de 2...)
+        return hmac.compare_digest(digest, expected)
+
+    def needs_rehash(self, stored):
+        if not is_hashed(stored):
+            return True
+        parsed = parse_hash(stored)
+        return parsed is None or parsed[0] != self.algorithm or parsed[1] != self._params()
+
+
+class VerificationCache:
+    # Logins recentes bem-sucedidos (LRU limitado). Não guarda a senha: só um HMAC dela com
+    # uma chave aleatória do processo, junto com o hash armazenado no momento da verificação
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._key = secrets.token_bytes(32)
+        self._entries = OrderedDict()
+
+    def _fingerprint(self, password):
+        return hmac.new(self._key, password.encode("utf-8"), hashlib.sha256).digest()
+
+    def check(self, username, stored, password):
+        entry = self._entries.get(username)
+        if entry is None or entry[0] != stored:
+            return False
+        if not hmac.compare_digest(entry[1], self._fingerprint(password)):
+            return False
+        self._entries.move_to_end(username)
+        return True
+
+    def add(self, username, stored, password):
+        if self.maxsize <= 0:
+            return
+        self._entries[username] = (stored, self._fingerprint(password))
+        self._entries.move_to_end(username)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, username):
+        self._entries.pop(username, None)
+
+    def __len__(self):
+        return len(self._entries)
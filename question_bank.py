@@ -0,0 +1,69 @@
+import json
+import os
+import random
+from collections import namedtuple
+from functools import lru_cache
+
+# Banco de questões carregado uma única vez de lessons.json e indexado por lição, tema e
+# dificuldade. Cada combinação de filtros tem sua lista pronta, então sortear k questões
+# custa O(k), independentemente do tamanho do banco.
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lessons.json")
+
+Question = namedtuple("Question", "id lesson topic difficulty question options correct explanation")
+Lesson = namedtuple("Lesson", "id title info questions")
+
+
+class QuestionBank:
+    def __init__(self, lessons):
+        self.lessons = {}
+        self.questions = {}
+        self._index = {}
+        for lesson_data in lessons:
+            questions = []
+            for data in lesson_data["questions"]:
+                question = Question(
+                    data["id"], lesson_data["id"], data.get("topic"), data.get("difficulty", 1),
+                    data["question"], data["options"], data["correct"], data.get("explanation", ""),
+                )
+                if question.id in self.questions:
+                    raise ValueError(f"Questão repetida no banco: {question.id}")
+                if question.correct not in question.options:
+                    raise ValueError(f"Resposta correta inválida na questão {question.id}")
+                self.questions[question.id] = question
+                questions.append(question)
+                self._add_to_index(question)
+            self.lessons[lesson_data["id"]] = Lesson(lesson_data["id"], lesson_data["title"], lesson_data["info"], questions)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)["lessons"])
+
+    def _add_to_index(self, question):
+        # Uma entrada para cada combinação de (lição, tema, dificuldade), com None = qualquer
+        for lesson in (None, question.lesson):
+            for topic in (None, question.topic):
+                for difficulty in (None, question.difficulty):
+                    self._index.setdefault((lesson, topic, difficulty), []).append(question)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def lesson(self, lesson_id):
+        return self.lessons[lesson_id]
+
+    def get(self, question_id):
+        return self.questions[question_id]
+
+    def select(self, lesson=None, topic=None, difficulty=None):
+        return self._index.get((lesson, topic, difficulty), [])
+
+    def draw(self, k, lesson=None, topic=None, difficulty=None, rng=random):
+        pool = self.select(lesson, topic, difficulty)
+        return rng.sample(pool, min(k, len(pool)))
+
+
+@lru_cache(maxsize=None)
+def default_bank():
+    return QuestionBank.load()
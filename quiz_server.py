@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import json
+import socket
+import threading
+from collections import Counter
+from user_data import UserDataManager, check_quiz_result
+from user_stats import UserStats
+
+# Servidor local para a sala toda: um único processo mantém o UserDataManager em memória e
+# os terminais conversam com ele por socket (uma linha JSON por mensagem), em vez de cada
+# um carregar e regravar o users.json.
+#
+#   python quiz_server.py --users users.json --storage write-behind --porta 5050
+#   python main.py --servidor 127.0.0.1:5050
+#
+# Pedido:   {"id": 1, "op": "login", "username": "...", "password": "..."}
+# Resposta: {"id": 1, "ok": true, "result": ...}  ou  {"id": 1, "ok": false, "error": "..."}
+
+DEFAULT_PORT = 5050
+MAX_REVISAO = 100  # Questões pedidas numa revisão
+MAX_QUESTOES = 10000  # Ids de questões enviados numa revisão
+
+
+def _public(user):
+    # Dados de um usuário sem o hash da senha
+    if user is None:
+        return None
+    return {key: value for key, value in user.items() if key != "password"}
+
+
+def _check_number(value, name):
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or not 0 <= value < float("inf"):
+        raise ValueError(f"{name} deve ser um número não negativo.")
+
+
+def check_request(request):
+    # Tipos e limites conferidos antes de o pedido chegar ao UserDataManager (e ao lock dele)
+    if not isinstance(request, dict):
+        raise ValueError("Pedido inválido: esperado um objeto JSON.")
+    op = request.get("op")
+    if op == "record":
+        check_quiz_result(request.get("acertos"), request.get("erros"), request.get("tempo"))
+    elif op == "answer":
+        if not isinstance(request.get("lesson"), str) or not isinstance(request.get("question_id"), str):
+            raise ValueError("Lição e questão devem ser textos.")
+        if not isinstance(request.get("correct"), bool):
+            raise ValueError("O campo correct deve ser true ou false.")
+        _check_number(request.get("latency"), "Tempo de resposta")
+    elif op == "review":
+        k, question_ids = request.get("k"), request.get("question_ids")
+        if not isinstance(k, int) or isinstance(k, bool) or not 0 <= k <= MAX_REVISAO:
+            raise ValueError(f"k deve ser um número inteiro entre 0 e {MAX_REVISAO}.")
+        if (not isinstance(question_ids, list) or len(question_ids) > MAX_QUESTOES
+                or not all(isinstance(question_id, str) for question_id in question_ids)):
+            raise ValueError(f"question_ids deve ser uma lista de até {MAX_QUESTOES} textos.")
+
+
+def _encode_snapshot(snapshot):
+    return {field: {str(value): count for value, count in histogram.items()} for field, histogram in snapshot.items()}
+
+
+def _decode_snapshot(data):
+    return {field: Counter({int(value): count for value, count in histogram.items()}) for field, histogram in data.items()}
+
+
+class QuizServer:
+    def __init__(self, manager):
+        self.manager = manager
+        self.server = None
+        # dispatch roda fora do loop (hash de senha e gravação não travam as outras conexões),
+        # uma chamada de cada vez: o UserDataManager não é thread-safe
+        self._manager_lock = threading.Lock()
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def handle_client(self, reader, writer):
+        session = {"username": None}  # Usuário autenticado nesta conexão
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    check_request(request)
+                    result = await asyncio.to_thread(self._dispatch_locked, session, request)
+                    response = {"id": request.get("id"), "ok": True, "result": result}
+                except Exception as e:
+                    # Pedido inválido ou falha do armazenamento (OSError...): o terminal recebe o
+                    # erro e continua conectado
+                    request_id = request.get("id") if isinstance(request, dict) else None
+                    response = {"id": request_id, "ok": False, "error": str(e)}
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _dispatch_locked(self, session, request):
+        with self._manager_lock:
+            return self.dispatch(session, request)
+
+    def dispatch(self, session, request):
+        op = request["op"]
+        if op == "login":
+            if self.manager.validate_user(request["username"], request["password"]):
+                session["username"] = request["username"]
+                return True
+            return False
+        if op == "register":
+            self.manager.add_user(request["username"], request["password"], request["age"])
+            return _public(self.manager.get_user_data(request["username"]))
+        if op == "record":
+            # Só registra resultados do usuário que fez login nesta conexão
+            if session["username"] is None:
+                raise ValueError("Faça login antes de registrar resultados.")
+            self.manager.record_quiz_result(session["username"], request["acertos"], request["erros"], request["tempo"])
+            return _public(self.manager.get_user_data(session["username"]))
+        if op == "answer":
+            if session["username"] is None:
+                raise ValueError("Faça login antes de registrar resultados.")
+            self.manager.record_answer(session["username"], request["lesson"], request["question_id"], request["correct"], request["latency"])
+            return None
+        if op == "review":
+            if session["username"] is None:
+                raise ValueError("Faça login antes de revisar.")
+            return self.manager.review_questions(session["username"], request["k"], request["question_ids"])
+        if op == "user":
+            # Cada conexão só consulta os dados do próprio usuário
+            if session["username"] is None:
+                raise ValueError("Faça login antes de consultar os dados.")
+            if request["username"] != session["username"]:
+                raise ValueError("Só é possível consultar os dados do usuário conectado.")
+            return _public(self.manager.get_user_data(request["username"]))
+        if op == "rank":
+            return self.manager.rank(request["username"])
+        if op == "top":
+            return self.manager.top(request["n"])
+        if op == "stats":
+            return _encode_snapshot(self.manager.stats.snapshot())
+        if op == "segments":
+            return self.manager.segment_summary(request["kind"])
+        raise ValueError(f"Operação desconhecida: {op}")
+
+
+def run_in_thread(manager, host="127.0.0.1", port=0):
+    # Sobe o servidor numa thread (testes e uso embutido); devolve (porta, função para parar)
+    started = threading.Event()
+    state = {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        state["loop"] = loop
+        quiz_server = QuizServer(manager)
+        loop.run_until_complete(quiz_server.start(host, port))
+        state["port"] = quiz_server.port
+        started.set()
+        loop.run_forever()
+        quiz_server.server.close()
+        loop.run_until_complete(quiz_server.server.wait_closed())
+        loop.close()
+
+    thread = threading.Thread(target=run, name="quiz-server", daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop():
+        state["loop"].call_soon_threadsafe(state["loop"].stop)
+        thread.join()
+
+    return state["port"], stop
+
+
+class _RemoteColumns:
+    # Coluna de acertos reconstruída do histograma (mesmos resultados de describe())
+    def __init__(self, histogram):
+        import numpy as np
+        values = sorted(histogram)
+        self.acertos = np.repeat(np.array(values, dtype=np.int64), [histogram[value] for value in values])
+
+
+class QuizClient:
+    # Cliente fino com a mesma interface do UserDataManager usada por LoginWindow e MainApp
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, timeout=10):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._file = self._sock.makefile("rwb")
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def _call(self, op, **params):
+        with self._lock:
+            self._next_id += 1
+            request = dict(params, op=op, id=self._next_id)
+            self._file.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        if not line:
+            raise ConnectionError("Conexão com o servidor encerrada.")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    def validate_user(self, username, password):
+        return self._call("login", username=username, password=password)
+
+    def add_user(self, username, password, age, callback=None):
+        user = self._call("register", username=username, password=password, age=age)
+        if callback:
+            callback(username, user)
+
+    def record_quiz_result(self, username, acertos, erros, tempo):
+        self._call("record", acertos=acertos, erros=erros, tempo=tempo)
+
+    def record_answer(self, username, lesson, question_id, correct, latency):
+        self._call("answer", lesson=lesson, question_id=question_id, correct=correct, latency=latency)
+
+    def review_questions(self, username, k, question_ids):
+        return self._call("review", k=k, question_ids=list(question_ids))
+
+    def get_user_data(self, username):
+        return self._call("user", username=username)
+
+    def rank(self, username):
+        rank, total = self._call("rank", username=username)
+        return rank, total
+
+    def top(self, n=5):
+        return [tuple(entry) for entry in self._call("top", n=n)]
+
+    def segment_summary(self, kind):
+        return [tuple(row) for row in self._call("segments", kind=kind)]
+
+    @property
+    def stats(self):
+        # Uma ida ao servidor; o resultado é uma cópia local das estatísticas
+        return UserStats.from_snapshot(_decode_snapshot(self._call("stats")))
+
+    def columns(self):
+        return _RemoteColumns(_decode_snapshot(self._call("stats"))["acertos"])
+
+    dirty = False  # O servidor cuida da gravação
+    writes_in_background = True
+
+    def wait_loaded(self):
+        pass  # O servidor já carregou os usuários
+
+    def save_users(self):
+        pass  # Quem grava é o servidor
+
+    def flush(self):
+        pass
+
+    def checkpoint(self):
+        pass
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local do Programa de Inclusão Digital.")
+    parser.add_argument("--users", default="users.json", help="Arquivo de usuários")
+    parser.add_argument("--storage", choices=["json", "log", "write-behind", "sqlite"], default="write-behind")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    manager = UserDataManager(args.users, storage=args.storage)
+
+    async def serve():
+        quiz_server = QuizServer(manager)
+        server = await quiz_server.start(args.host, args.porta)
+        print(f"Servidor ouvindo em {args.host}:{quiz_server.port}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
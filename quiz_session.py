@@ -0,0 +1,93 @@
+import time
+
+# Andamento de um quiz, sem nada de interface: o painel do MainApp só mostra o estado atual
+# e chama start/answer/next/cancel. Estados:
+#
+#   "introducao" --start--> "pergunta" --answer--> "resposta" --next--> "pergunta" ... "concluido"
+#                                  \____________________cancel_____________________/--> "cancelado"
+
+INTRODUCAO = "introducao"
+PERGUNTA = "pergunta"
+RESPOSTA = "resposta"
+CONCLUIDO = "concluido"
+CANCELADO = "cancelado"
+
+
+class QuizSession:
+    # intro: (título, texto) mostrado antes da primeira questão, como o texto da lição
+    def __init__(self, questions, intro=None, clock=time.perf_counter):
+        self.questions = list(questions)
+        self.intro = intro
+        self.index = 0
+        self.score = 0
+        self.erros = 0
+        self.latencies = []  # Segundos até a resposta, uma entrada por questão respondida
+        self.last_correct = None
+        self._clock = clock
+        self._started = None
+        self._finished = None
+        self._question_started = None
+        self.state = INTRODUCAO
+        if intro is None:
+            self.start()
+
+    @property
+    def current(self):
+        return self.questions[self.index] if self.index < len(self.questions) else None
+
+    @property
+    def finished(self):
+        return self.state in (CONCLUIDO, CANCELADO)
+
+    @property
+    def elapsed(self):
+        if self._started is None:
+            return 0.0
+        return (self._finished if self._finished is not None else self._clock()) - self._started
+
+    def _expect(self, *states):
+        if self.state not in states:
+            raise ValueError(f"Operação inválida no estado {self.state}")
+
+    def _finish(self, state):
+        self.state = state
+        self._finished = self._clock()
+
+    def start(self):
+        self._expect(INTRODUCAO)
+        self._started = self._clock()
+        if not self.questions:
+            self._finish(CONCLUIDO)
+            return
+        self.state = PERGUNTA
+        self._question_started = self._started
+
+    def answer(self, option):
+        # Devolve (acertou, segundos gastos nesta questão)
+        self._expect(PERGUNTA)
+        question = self.current
+        if option not in question.options:
+            raise ValueError("Resposta inválida. Por favor, escolha uma das opções listadas (a, b, c...).")
+        latency = self._clock() - self._question_started
+        correct = option == question.correct
+        if correct:
+            self.score += 1
+        else:
+            self.erros += 1
+        self.latencies.append(latency)
+        self.last_correct = correct
+        self.state = RESPOSTA
+        return correct, latency
+
+    def next(self):
+        self._expect(RESPOSTA)
+        self.index += 1
+        if self.index >= len(self.questions):
+            self._finish(CONCLUIDO)
+        else:
+            self.state = PERGUNTA
+            self._question_started = self._clock()
+
+    def cancel(self):
+        self._expect(INTRODUCAO, PERGUNTA, RESPOSTA)
+        self._finish(CANCELADO)
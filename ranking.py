@@ -0,0 +1,122 @@
+import heapq
+
+# Ranking dos usuários por acertos. Os acertos são inteiros pequenos, então o índice é uma
+# árvore de Fenwick sobre os valores possíveis (quantos usuários têm cada total) mais um
+# conjunto de nomes por valor: a posição de um usuário sai em O(log V) e os N primeiros são
+# lidos saltando de um valor ocupado para o próximo, sem ordenar todos os usuários a cada
+# atualização do painel.
+
+
+class FenwickTree:
+    # Somas de prefixo de contagens em 0..size-1; cresce (dobrando) quando preciso
+    def __init__(self, size=64):
+        self.counts = [0] * size
+        self.tree = [0] * (size + 1)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _grow(self, index):
+        size = len(self.counts)
+        while size <= index:
+            size *= 2
+        self.counts.extend([0] * (size - len(self.counts)))
+        # Reconstrução em O(size)
+        self.tree = [0] + self.counts[:]
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                self.tree[parent] += self.tree[i]
+
+    def add(self, index, delta):
+        if index < 0:
+            raise ValueError(f"Índice negativo: {index}")
+        if index >= len(self.counts):
+            self._grow(index)
+        self.counts[index] += delta
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index):
+        # Soma das contagens em 0..index
+        index = min(index, len(self.counts) - 1)
+        total = 0
+        i = index + 1
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def total(self):
+        return self.prefix_sum(len(self.counts) - 1)
+
+    def find(self, k):
+        # Menor índice cuja soma de prefixo chega a k (k >= 1), em O(log size)
+        position = 0
+        step = 1 << (len(self.counts).bit_length() - 1)
+        while step:
+            i = position + step
+            if i < len(self.tree) and self.tree[i] < k:
+                position = i
+                k -= self.tree[i]
+            step >>= 1
+        return position
+
+
+class Leaderboard:
+    # Ouvinte do UserDataManager (reset/user_added/quiz_recorded), como o UserStats
+    def __init__(self):
+        self.tree = FenwickTree()
+        self.names = {}  # acertos -> nomes com esse total
+        self.scores = {}  # nome -> acertos
+
+    def _insert(self, username, score):
+        self.scores[username] = score
+        self.names.setdefault(score, set()).add(username)
+        self.tree.add(score, 1)
+
+    def _remove(self, username):
+        score = self.scores.pop(username)
+        bucket = self.names[score]
+        bucket.discard(username)
+        if not bucket:
+            del self.names[score]
+        self.tree.add(score, -1)
+
+    def reset(self, users):
+        self.tree = FenwickTree()
+        self.names = {}
+        self.scores = {}
+        for username, user in users.items():
+            self._insert(username, user.get("acertos", 0))
+
+    def user_added(self, username, user):
+        self._insert(username, user.get("acertos", 0))
+
+    def quiz_recorded(self, username, user, acertos, erros, tempo):
+        if acertos:
+            self._remove(username)
+            self._insert(username, user["acertos"])
+
+    def __len__(self):
+        return len(self.scores)
+
+    def rank(self, username):
+        # Posição no ranking (1 = mais acertos); empatados dividem a mesma posição
+        score = self.scores.get(username)
+        if score is None:
+            return None
+        return len(self.scores) - self.tree.prefix_sum(score) + 1
+
+    def top(self, n=5):
+        # Os n usuários com mais acertos, como (nome, acertos); empates em ordem alfabética
+        result = []
+        remaining = len(self.scores)  # Usuários com acertos até o valor atual
+        while len(result) < n and remaining > 0:
+            score = self.tree.find(remaining)  # Maior valor ocupado que ainda não foi lido
+            bucket = self.names[score]
+            result.extend((username, score) for username in heapq.nsmallest(n - len(result), bucket))
+            remaining -= len(bucket)
+        return result
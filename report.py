@@ -0,0 +1,111 @@
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+import charts
+from user_columns import describe
+from user_data import UserDataManager
+from user_stats import resumo_desempenho
+
+# Relatórios em lote, sem interface gráfica: para cada arquivo de usuários (uma turma)
+# gera os mesmos quatro gráficos de "Ver Gráficos Estatísticos" e o resumo de desempenho.
+#
+#   python report.py turma1.json turma2.json -o relatorios --formato png svg --por-usuario
+
+
+def _nome_arquivo(nome):
+    return re.sub(r"[^\w.-]+", "_", nome) or "_"
+
+
+def _storage_para(path):
+    return "sqlite" if os.path.splitext(path)[1] in (".db", ".sqlite", ".sqlite3") else "json"
+
+
+def resumo_turma(nome, manager):
+    users = list(manager.users.values())
+    acertos = sum(user.get("acertos", 0) for user in users)
+    erros = sum(user.get("erros", 0) for user in users)
+    tempo = sum(user.get("tempo", 0) for user in users)
+    resumo = describe(manager.columns().acertos)
+    linhas = [
+        f"Turma: {nome}",
+        f"Usuários cadastrados: {len(users)}",
+        f"Média de acertos: {resumo['mean']:.2f}",
+        f"Mediana de acertos: {resumo['median']:.2f}",
+        f"Moda de acertos: {resumo['mode']}",
+        "",
+        resumo_desempenho(nome, acertos, erros, tempo),
+    ]
+    return "\n".join(linhas)
+
+
+def gerar_relatorio(path, nome, saida, formatos, por_usuario):
+    # Executa num processo separado: carrega a turma, desenha e grava os arquivos
+    manager = UserDataManager(path, storage=_storage_para(path), migrate_passwords=False)
+    try:
+        fig = charts.create_figure()
+        charts.draw_charts(fig, charts.chart_data(manager.stats.snapshot()))
+        arquivos = []
+        for formato in formatos:
+            destino = os.path.join(saida, f"{_nome_arquivo(nome)}.{formato}")
+            fig.savefig(destino, format=formato)
+            arquivos.append(destino)
+
+        destino = os.path.join(saida, f"{_nome_arquivo(nome)}_resumo.txt")
+        with open(destino, 'w', encoding='utf-8') as f:
+            f.write(resumo_turma(nome, manager) + "\n")
+        arquivos.append(destino)
+
+        if por_usuario:
+            pasta = os.path.join(saida, _nome_arquivo(nome))
+            os.makedirs(pasta, exist_ok=True)
+            usados = set()
+            for username, user in manager.users.items():
+                # Nomes diferentes podem virar o mesmo arquivo ("ana silva" e "ana/silva")
+                base = arquivo = _nome_arquivo(username)
+                numero = 1
+                while arquivo.lower() in usados:
+                    numero += 1
+                    arquivo = f"{base}_{numero}"
+                usados.add(arquivo.lower())
+                destino = os.path.join(pasta, f"{arquivo}.txt")
+                with open(destino, 'w', encoding='utf-8') as f:
+                    f.write(resumo_desempenho(username, user.get("acertos", 0), user.get("erros", 0), user.get("tempo", 0)) + "\n")
+                arquivos.append(destino)
+        return arquivos
+    finally:
+        manager.close()
+
+
+def nomes_das_turmas(paths):
+    nomes = []
+    for path in paths:
+        nome = os.path.splitext(os.path.basename(path))[0]
+        if nome in nomes:
+            nome = f"{os.path.basename(os.path.dirname(os.path.abspath(path)))}_{nome}"
+        nomes.append(nome)
+    return nomes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera gráficos e resumos de desempenho por turma, sem interface gráfica.")
+    parser.add_argument("arquivos", nargs="+", help="Arquivos de usuários (.json ou .db), um por turma")
+    parser.add_argument("-o", "--saida", default="relatorios", help="Pasta de saída")
+    parser.add_argument("--formato", nargs="+", choices=["png", "svg"], default=["png"], help="Formatos dos gráficos")
+    parser.add_argument("--por-usuario", action="store_true", help="Também grava o resumo de cada usuário")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Número de processos (padrão: um por CPU)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.saida, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [
+            executor.submit(gerar_relatorio, path, nome, args.saida, args.formato, args.por_usuario)
+            for path, nome in zip(args.arquivos, nomes_das_turmas(args.arquivos))
+        ]
+        for future in futures:
+            for arquivo in future.result():
+                print(arquivo)
+
+
+if __name__ == "__main__":
+    main()
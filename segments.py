@@ -0,0 +1,99 @@
+from collections import Counter
+from user_stats import RunningStats
+
+# Estatísticas de acertos por grupo de usuários: faixa de idade e período (mês) de cadastro.
+# Cada grupo tem o seu RunningStats, atualizado pelo UserDataManager a cada cadastro ou quiz,
+# então o painel por grupo não percorre todos os usuários. Os grupos por lição vêm do
+# histórico de respostas (attempt_history.AttemptHistory.lesson_scores).
+
+AGE_BAND_WIDTH = 5  # Faixas de 5 anos: 20-24, 25-29...
+SEM_DATA = "sem data"  # Usuários cadastrados antes de a data de cadastro ser gravada
+KINDS = ("idade", "cadastro", "licao")
+
+
+def age_band(age):
+    # Início da faixa de idade: 23 -> 20
+    return age // AGE_BAND_WIDTH * AGE_BAND_WIDTH
+
+
+def age_band_label(start):
+    return f"{start}-{start + AGE_BAND_WIDTH - 1}"
+
+
+def registration_period(registered):
+    # "AAAA-MM-DD" -> "AAAA-MM"
+    return registered[:7] if registered else SEM_DATA
+
+
+def summarize(groups, label=str):
+    # [(grupo, usuários, média, mediana, moda)] em ordem de grupo
+    return [(label(key), stats.count, stats.mean(), stats.median(), stats.mode())
+            for key, stats in sorted(groups.items()) if stats.count]
+
+
+class SegmentStats:
+    # Ouvinte do UserDataManager (reset/user_added/quiz_recorded), como o UserStats
+    def __init__(self):
+        self.by_age_band = {}
+        self.by_period = {}
+
+    def _keys(self, user):
+        age = user.get("age")
+        if age is not None:
+            yield self.by_age_band, age_band(age)
+        yield self.by_period, registration_period(user.get("registered"))
+
+    def _groups(self, user):
+        for groups, key in self._keys(user):
+            stats = groups.get(key)
+            if stats is None:
+                stats = groups[key] = RunningStats()
+            yield stats
+
+    def reset(self, users):
+        # Histogramas montados de uma vez, sem um RunningStats.add por usuário e grupo
+        ages, periods = {}, {}
+        for user in users.values():
+            acertos = user.get("acertos", 0)
+            age = user.get("age")
+            if age is not None:
+                band = age_band(age)
+                histogram = ages.get(band)
+                if histogram is None:
+                    histogram = ages[band] = Counter()
+                histogram[acertos] += 1
+            period = registration_period(user.get("registered"))
+            histogram = periods.get(period)
+            if histogram is None:
+                histogram = periods[period] = Counter()
+            histogram[acertos] += 1
+        self.by_age_band = {key: RunningStats.from_histogram(histogram) for key, histogram in ages.items()}
+        self.by_period = {key: RunningStats.from_histogram(histogram) for key, histogram in periods.items()}
+
+    def user_added(self, username, user):
+        acertos = user.get("acertos", 0)
+        for stats in self._groups(user):
+            stats.add(acertos)
+
+    def quiz_recorded(self, username, user, acertos, erros, tempo):
+        if acertos:
+            for stats in self._groups(user):
+                stats.replace(user["acertos"] - acertos, user["acertos"])
+
+    def summary(self, kind):
+        if kind == "idade":
+            return summarize(self.by_age_band, age_band_label)
+        if kind == "cadastro":
+            # "sem data" depois dos meses
+            return summarize({(key == SEM_DATA, key): stats for key, stats in self.by_period.items()}, lambda key: key[1])
+        raise ValueError(f"Tipo de grupo desconhecido: {kind}")
+
+
+def format_table(title, rows):
+    # Tabela em texto (fonte monoespaçada) para o painel "Estatísticas por grupo"
+    lines = [title, f"{'Grupo':<12}{'Usuários':>10}{'Média':>9}{'Mediana':>9}{'Moda':>6}"]
+    for group, count, mean, median, mode in rows:
+        lines.append(f"{group:<12}{count:>10}{mean:>9.2f}{median:>9.1f}{mode:>6}")
+    if not rows:
+        lines.append("Nenhum dado ainda.")
+    return "\n".join(lines)
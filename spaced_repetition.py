@@ -0,0 +1,187 @@
+import heapq
+import json
+import os
+import time
+
+# Revisão espaçada no estilo SM-2: para cada usuário e questão guarda a facilidade, o
+# intervalo até a próxima revisão e quando ela vence. Cada usuário tem uma fila de prioridade
+# (heap) ordenada pelo vencimento, então escolher as próximas questões custa O(k log n): as
+# vencidas primeiro (as mais atrasadas e difíceis na frente), depois as nunca vistas e, se
+# ainda faltar, as que vencem mais cedo.
+#
+# O estado é derivado do histórico de respostas (attempt_history): o checkpoint em
+# "<histórico>/revisao.json" guarda os estados até a linha "rows", e só as respostas
+# posteriores são reaplicadas ao abrir.
+
+DAY = 24 * 60 * 60
+MIN_EASINESS = 1.3
+FAST_ANSWER = 8.0  # Segundos: acerto rápido = lembrou com facilidade
+SLOW_ANSWER = 20.0
+
+
+def quality(correct, latency):
+    # Nota SM-2 (0 a 5) a partir do acerto e do tempo de resposta
+    if not correct:
+        return 1
+    if latency <= FAST_ANSWER:
+        return 5
+    return 4 if latency <= SLOW_ANSWER else 3
+
+
+class ItemState:
+    __slots__ = ("easiness", "interval", "repetitions", "due")
+
+    def __init__(self, easiness=2.5, interval=0.0, repetitions=0, due=0.0):
+        self.easiness = easiness
+        self.interval = interval  # Dias
+        self.repetitions = repetitions
+        self.due = due  # time.time() em que a questão volta para a revisão
+
+    def review(self, grade, when):
+        if grade < 3:
+            # Esqueceu: recomeça com intervalo de um dia
+            self.repetitions = 0
+            self.interval = 1.0
+        else:
+            self.repetitions += 1
+            if self.repetitions == 1:
+                self.interval = 1.0
+            elif self.repetitions == 2:
+                self.interval = 6.0
+            else:
+                self.interval *= self.easiness
+        self.easiness = max(MIN_EASINESS, self.easiness + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+        self.due = when + self.interval * DAY
+
+    def to_list(self):
+        return [self.easiness, self.interval, self.repetitions, self.due]
+
+    def __repr__(self):
+        return f"ItemState(easiness={self.easiness:.2f}, interval={self.interval:.1f}, due={self.due:.0f})"
+
+
+class ReviewScheduler:
+    def __init__(self, path=None):
+        self.path = path  # Checkpoint (JSON); None = só em memória
+        self.rows = 0  # Respostas do histórico já aplicadas
+        self.saved_rows = None  # "rows" do último checkpoint gravado ou lido
+        self.states = {}  # usuário -> {questão: ItemState}
+        self._queues = {}  # usuário -> heap de (vencimento, facilidade, questão); entradas velhas são puladas
+        self._unseen_start = {}  # usuário -> (lista de candidatas, posição antes da qual todas já foram vistas)
+
+    @classmethod
+    def open(cls, path, history):
+        # Estados do checkpoint + respostas do histórico (AttemptHistory) posteriores a ele
+        scheduler = cls(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (IOError, ValueError):
+            checkpoint = None
+        history.flush()
+        if checkpoint is not None and checkpoint["rows"] <= history.rows:
+            scheduler.rows = scheduler.saved_rows = checkpoint["rows"]
+            for username, items in checkpoint["states"].items():
+                scheduler.states[username] = {question_id: ItemState(*values) for question_id, values in items.items()}
+        columns = [history.column(name, scheduler.rows) for name in ("time", "user", "question", "correct", "latency")]
+        for when, user, question, correct, latency in zip(*columns):
+            scheduler.review(history.users[user], history.questions[question][0], correct, latency, when)
+        scheduler.rows = history.rows
+        return scheduler
+
+    def _queue(self, username):
+        queue = self._queues.get(username)
+        if queue is None:
+            # Montada na primeira consulta do usuário: O(n) uma vez
+            queue = [(state.due, state.easiness, question_id) for question_id, state in self.states.get(username, {}).items()]
+            heapq.heapify(queue)
+            self._queues[username] = queue
+        return queue
+
+    def review(self, username, question_id, correct, latency, when=None):
+        when = time.time() if when is None else when
+        items = self.states.setdefault(username, {})
+        state = items.get(question_id)
+        if state is None:
+            state = items[question_id] = ItemState()
+        state.review(quality(correct, latency), when)
+        self.rows += 1
+        queue = self._queues.get(username)
+        if queue is not None:
+            heapq.heappush(queue, (state.due, state.easiness, question_id))
+
+    def state(self, username, question_id):
+        return self.states.get(username, {}).get(question_id)
+
+    def _pop(self, username, queue):
+        # Próxima entrada ainda válida (a questão pode ter sido revisada depois de entrar na fila)
+        items = self.states.get(username, {})
+        while queue:
+            due, easiness, question_id = heapq.heappop(queue)
+            state = items.get(question_id)
+            if state is not None and state.due == due and state.easiness == easiness:
+                return due, easiness, question_id
+        return None
+
+    def next_questions(self, username, k, candidates, now=None):
+        # Até k questões para revisar; candidates: ids de todas as questões, na ordem em que
+        # as nunca vistas devem aparecer
+        now = time.time() if now is None else now
+        queue = self._queue(username)
+        seen = self.states.get(username, {})
+        allowed = set(candidates)
+        chosen, popped = [], []
+        upcoming = None  # Primeira questão da fila que ainda não venceu
+        while len(chosen) < k:
+            entry = self._pop(username, queue)
+            if entry is None:
+                break
+            if entry[2] not in allowed:
+                continue  # Questão que saiu do banco: deixa a fila (o estado fica no checkpoint)
+            popped.append(entry)
+            if entry[0] > now:
+                upcoming = entry
+                break
+            chosen.append(entry[2])
+        previous = self._unseen_start.get(username)
+        start = previous[1] if previous is not None and previous[0] is candidates else 0
+        while start < len(candidates) and candidates[start] in seen:
+            start += 1
+        self._unseen_start[username] = (candidates, start)
+        for question_id in candidates[start:]:
+            if len(chosen) >= k:
+                break
+            if question_id not in seen:
+                chosen.append(question_id)
+        if upcoming is not None and len(chosen) < k:
+            # Tudo em dia: adianta as que vencem primeiro
+            chosen.append(upcoming[2])
+            while len(chosen) < k:
+                entry = self._pop(username, queue)
+                if entry is None:
+                    break
+                if entry[2] not in allowed:
+                    continue
+                popped.append(entry)
+                chosen.append(entry[2])
+        for entry in popped:
+            heapq.heappush(queue, entry)  # Continuam na fila até serem respondidas
+        return chosen
+
+    def due_count(self, username, now=None):
+        now = time.time() if now is None else now
+        return sum(1 for state in self.states.get(username, {}).values() if state.due <= now)
+
+    def checkpoint(self):
+        if self.path is None or self.rows == self.saved_rows:
+            return
+        data = {
+            "rows": self.rows,
+            "states": {username: {question_id: state.to_list() for question_id, state in items.items()}
+                       for username, items in self.states.items()},
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.saved_rows = self.rows
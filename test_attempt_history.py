@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from attempt_history import AttemptHistory
+from passwords import PasswordHasher
+from user_data import UserDataManager
+
+class TestAttemptHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "users.history")
+
+    def fill(self, history):
+        history.record("ana", "seguranca_internet", "seg-1", True, 4.0, timestamp=1.0)
+        history.record("ana", "seguranca_internet", "seg-2", False, 9.0, timestamp=2.0)
+        history.record("bruno", "seguranca_internet", "seg-1", False, 6.0, timestamp=3.0)
+        history.record("bruno", "introducao_computador", "intro-1", True, 2.0, timestamp=4.0)
+
+    def test_aggregates_are_incremental(self):
+        history = AttemptHistory(self.path)
+        self.fill(history)
+        stats = history.stats("seg-1")
+        self.assertEqual((stats.attempts, stats.correct, stats.errors), (2, 1, 1))
+        self.assertAlmostEqual(stats.mean_latency, 5.0)
+        self.assertEqual(history.lesson_stats["seguranca_internet"].attempts, 3)
+        self.assertEqual([question_id for question_id, stats in history.hardest(2)], ["seg-2", "seg-1"])
+        self.assertEqual(history.slowest(1)[0][0], "seg-2")
+        self.assertIsNone(history.stats("dicas-1"))
+        self.assertEqual(len(history), 4)
+        self.assertEqual(history.rows, 0)  # Ainda no buffer
+
+    def test_columns_and_full_scan(self):
+        history = AttemptHistory(self.path)
+        self.fill(history)
+        self.assertEqual(list(history.column("correct")), [1, 0, 0, 1])
+        self.assertEqual(history.rows, 4)
+        self.assertEqual(list(history.attempts())[2], (3.0, "bruno", "seg-1", "seguranca_internet", False, 6.0))
+
+    def test_reopen_from_checkpoint_and_tail(self):
+        history = AttemptHistory(self.path)
+        self.fill(history)
+        history.close()
+        history = AttemptHistory(self.path, flush_every=1)
+        history.record("carla", "seguranca_internet", "seg-2", True, 3.0)
+        # Sem checkpoint novo: a resposta acima é relida do fim das colunas
+        reopened = AttemptHistory(self.path)
+        self.assertEqual(reopened.stats("seg-2").attempts, 2)
+        self.assertEqual(reopened.stats("seg-1").attempts, 2)
+        self.assertEqual(reopened.users, ["ana", "bruno", "carla"])
+
+    def test_torn_columns_are_truncated(self):
+        history = AttemptHistory(self.path)
+        self.fill(history)
+        history.flush()
+        with open(os.path.join(self.path, "latency.bin"), "ab") as f:
+            f.write(b"\x00\x00")  # Queda no meio de uma gravação
+        with open(os.path.join(self.path, "time.bin"), "ab") as f:
+            f.write(b"\x00" * 8)
+        reopened = AttemptHistory(self.path)
+        self.assertEqual(len(reopened), 4)
+        self.assertEqual(os.path.getsize(os.path.join(self.path, "time.bin")), 4 * 8)
+        self.assertEqual(reopened.stats("seg-1").attempts, 2)
+
+    def test_torn_name_table_is_truncated(self):
+        history = AttemptHistory(self.path)
+        self.fill(history)
+        history.close()
+        with open(os.path.join(self.path, "users.txt"), "a", encoding="utf-8") as f:
+            f.write('"car')  # Queda no meio do nome de um usuário novo
+        history = AttemptHistory(self.path, flush_every=1)
+        history.record("davi", "seguranca_internet", "seg-2", True, 3.0)
+        history.close()
+        reopened = AttemptHistory(self.path)
+        self.assertEqual(reopened.users, ["ana", "bruno", "davi"])
+        self.assertEqual(list(reopened.attempts())[-1][1], "davi")
+
+    def test_manager_records_answers(self):
+        filepath = os.path.join(self.tmpdir.name, "users.json")
+        manager = UserDataManager(filepath, hasher=PasswordHasher(iterations=1000))
+        manager.add_user("ana", "senha", 30)
+        manager.record_answer("ana", "dicas_inclusao", "dicas-1", True, 1.5)
+        with self.assertRaises(ValueError):
+            manager.record_answer("bruno", "dicas_inclusao", "dicas-1", True, 1.5)
+        manager.close()
+        self.assertEqual(AttemptHistory(self.path).stats("dicas-1").correct, 1)
+
+if __name__ == "__main__":
+    unittest.main()
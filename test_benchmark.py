@@ -0,0 +1,40 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+import benchmark
+
+class TestBenchmark(unittest.TestCase):
+    def test_runs_headless_and_writes_json(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            destino = os.path.join(tmpdir, "resultados.json")
+            with redirect_stdout(io.StringIO()):
+                benchmark.main(["--tamanhos", "50", "--storage", "json", "sqlite", "--repeticoes", "5",
+                                "--repeticoes-io", "2", "--hash-iterations", "1", "--json", destino])
+            with open(destino, encoding="utf-8") as f:
+                relatorio = json.load(f)
+
+        operacoes = {(r["storage"], r["operation"]) for r in relatorio["results"]}
+        for storage in ("json", "sqlite"):
+            for operacao in benchmark.OPERACOES:
+                self.assertIn((storage, operacao), operacoes)
+        for resultado in relatorio["results"]:
+            self.assertEqual(resultado["users"], 50)
+            self.assertGreater(resultado["throughput_ops_s"], 0)
+            self.assertLessEqual(resultado["latency_ms"]["p50"], resultado["latency_ms"]["max"])
+
+    def test_memory_report(self):
+        with redirect_stdout(io.StringIO()):
+            resultado, = benchmark.main(["--memoria", "2000", "--hash-iterations", "1"])
+        self.assertEqual(resultado["users"], 2000)
+        self.assertLess(resultado["UserRecord_bytes"], resultado["dict_bytes"])
+        self.assertGreater(resultado["reducao"], 0)
+
+    def test_percentil(self):
+        self.assertEqual(benchmark.percentil([1, 2, 3, 4, 5], 50), 3)
+        self.assertEqual(benchmark.percentil([1, 2], 50), 1.5)
+
+if __name__ == "__main__":
+    unittest.main()
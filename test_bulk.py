@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+import bulk
+from passwords import PasswordHasher
+from user_data import UserDataManager
+
+FAST = PasswordHasher(iterations=1000)
+
+class TestBulk(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filepath = os.path.join(self.tmpdir.name, "users.json")
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def write_csv(self, rows, name="alunos.csv"):
+        with open(self.path(name), "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["usuario", "senha", "idade"])
+            writer.writerows(rows)
+        return self.path(name)
+
+    def open_manager(self, storage="json"):
+        manager = UserDataManager(self.filepath, storage=storage, hasher=FAST)
+        self.addCleanup(manager.close)
+        return manager
+
+    def test_import_csv_reports_invalid_rows(self):
+        manager = self.open_manager()
+        manager.add_user("ana", "senha", 20)
+        saves = []
+        original_save = manager.storage.save
+        manager.storage.save = lambda users: (saves.append(len(users)), original_save(users))
+
+        roster = self.write_csv([
+            ["bruno", "s1", "31"], ["ana", "s2", "22"], ["carla", "s3", "idade"],
+            ["davi", "s4", "-3"], ["bruno", "s5", "40"], ["", "s6", "20"], ["eva", "", "20"],
+        ] + [[f"aluno{i}", "senha", str(10 + i % 60)] for i in range(50)])
+        importados, erros = bulk.importar(manager, bulk.ler_lista(roster), jobs=1, chunk_size=8)
+
+        self.assertEqual(importados, 51)
+        self.assertEqual([linha for linha, erro in erros], [3, 4, 5, 6, 7, 8])
+        self.assertIn("Usuário já existe", dict(erros)[3])
+        self.assertEqual(saves, [52])  # Uma única gravação no fim
+        self.assertTrue(manager.validate_user("bruno", "s1"))
+        self.assertEqual(manager.get_user_data("bruno")["age"], 31)
+        self.assertEqual(manager.stats.idades.count, 52)
+        self.assertEqual(manager.rank("aluno3"), (1, 52))
+
+    def test_import_jsonl_in_parallel_into_sqlite(self):
+        roster = self.path("alunos.jsonl")
+        with open(roster, "w", encoding="utf-8") as f:
+            for i in range(20):
+                f.write(json.dumps({"username": f"u{i}", "password": "p", "age": 18}) + "\n")
+            f.write("não é json\n")
+        manager = self.open_manager("sqlite")
+        importados, erros = bulk.importar(manager, bulk.ler_lista(roster), jobs=2, chunk_size=6)
+        self.assertEqual(importados, 20)
+        self.assertEqual(erros, [(21, "Linha inválida.")])
+        self.assertEqual(len(manager.users), 20)
+        self.assertTrue(manager.validate_user("u7", "p"))
+
+    def test_jsonl_values_that_are_not_objects_are_rejected(self):
+        roster = self.path("alunos.jsonl")
+        with open(roster, "w", encoding="utf-8") as f:
+            f.write('5\n["ana", "senha", 20]\n{"usuario": "ana", "senha": "s", "idade": 20}\nnull\n')
+        manager = self.open_manager()
+        importados, erros = bulk.importar(manager, bulk.ler_lista(roster), jobs=1)
+        self.assertEqual(importados, 1)
+        self.assertEqual(erros, [(1, "Linha inválida."), (2, "Linha inválida."), (4, "Linha inválida.")])
+
+    def test_add_users_is_all_or_nothing(self):
+        manager = self.open_manager()
+        with self.assertRaises(ValueError):
+            manager.add_users([("a", "s", 20), ("b", "s", 0)])
+        self.assertEqual(len(manager.users), 0)
+        self.assertEqual(manager.add_users([("a", "s", 20), ("b", "s", 21)]), 2)
+
+    def test_export_csv_and_jsonl(self):
+        manager = self.open_manager()
+        manager.add_users([("ana", "s", 20), ("bruno", "s", 30)])
+        manager.record_quiz_result("ana", 3, 1, 12.5)
+
+        self.assertEqual(bulk.exportar(manager, self.path("saida.csv")), 2)
+        with open(self.path("saida.csv"), encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0], {"usuario": "ana", "idade": "20", "acertos": "3", "erros": "1", "tempo": "12.5", "percentual": "75.0"})
+        self.assertNotIn("senha", rows[0])
+
+        bulk.exportar(manager, self.path("saida.jsonl"))
+        with open(self.path("saida.jsonl"), encoding="utf-8") as f:
+            self.assertEqual(json.loads(f.readlines()[1])["usuario"], "bruno")
+
+    def test_cli(self):
+        roster = self.write_csv([["ana", "s1", "20"], ["bruno", "s2", "x"]])
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()) as stderr:
+            importados, erros = bulk.main(["--users", self.filepath, "importar", roster, "-j", "1"])
+            self.assertEqual(bulk.main(["--users", self.filepath, "exportar", self.path("saida.csv")]), 1)
+        self.assertEqual(importados, 1)
+        self.assertIn("Linha 3", stderr.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
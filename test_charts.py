@@ -0,0 +1,26 @@
+import unittest
+from collections import Counter
+import charts
+
+class TestCharts(unittest.TestCase):
+    def test_chart_data_sorts_histograms(self):
+        data = charts.chart_data({"acertos": Counter({3: 1, 0: 2}), "erros": Counter(), "idades": Counter({30: 1, 18: 2})})
+        self.assertEqual(data["acertos"], ([0, 3], [2, 1]))
+        self.assertEqual(data["erros"], ([], []))
+        self.assertEqual(data["idades"], ([18, 30], [2, 1]))
+
+    def test_render_png_reuses_figure(self):
+        fig = charts.create_figure()
+        snapshot = {"acertos": Counter({0: 2, 3: 1}), "erros": Counter({1: 3}), "idades": Counter({18: 1, 25: 2})}
+        png = charts.render_png(fig, snapshot)
+        self.assertTrue(png.startswith(b"\x89PNG"))
+        charts.render_png(fig, snapshot)
+        self.assertEqual(len(fig.axes), 4)
+
+    def test_render_png_without_users(self):
+        fig = charts.create_figure()
+        png = charts.render_png(fig, {"acertos": Counter(), "erros": Counter(), "idades": Counter()})
+        self.assertTrue(png.startswith(b"\x89PNG"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from benchmark import criar_app_sem_tela
+from passwords import PasswordHasher
+from user_data import UserDataManager
+
+class RootFalso:
+    def __init__(self):
+        self.agendados = []
+
+    def after(self, ms, callback, *args):
+        self.agendados.append((ms, callback, args))
+
+
+class TestInfoCards(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.manager = UserDataManager(os.path.join(self.tmpdir.name, "users.json"), hasher=PasswordHasher(iterations=1000))
+        self.addCleanup(self.manager.close)
+        self.manager.add_user("ana", "senha", 20)
+        self.manager.add_user("bruno", "senha", 30)
+        self.app = criar_app_sem_tela(self.manager, "ana")
+        self.configs = []
+        original = self.app.set_card
+
+        def contar(label, text):
+            if self.app.card_values.get(label) != text:
+                self.configs.append(label)
+            original(label, text)
+        self.app.set_card = contar
+
+    def test_only_changed_cards_are_reconfigured(self):
+        self.app.update_info_cards()
+        self.assertEqual(len(self.configs), 8)
+        self.configs.clear()
+        self.app.update_info_cards()
+        self.assertEqual(self.configs, [])
+
+        self.manager.record_quiz_result("ana", 2, 0, 5)
+        self.app.update_info_cards()
+        self.assertIn(self.app.card_acertos, self.configs)
+        self.assertNotIn(self.app.card_moda, self.configs)  # Empate 0 x 2: continua 0
+        self.assertEqual(self.app.card_ranking.options["text"], "1º de 2")
+
+    def test_global_stats_are_throttled(self):
+        self.app.root = RootFalso()
+        self.app.intervalo_estatisticas_ms = 60_000
+        self.app.update_info_cards()
+        self.assertEqual(self.app.card_media.options["text"], "0.00")
+
+        self.manager.record_quiz_result("ana", 4, 0, 5)
+        self.app.update_info_cards()
+        self.app.update_info_cards()
+        self.assertEqual(self.app.card_acertos.options["text"], "4")
+        self.assertEqual(self.app.card_media.options["text"], "0.00")  # Ainda não
+        self.assertEqual(len(self.app.root.agendados), 1)
+
+        ms, callback, args = self.app.root.agendados[0]
+        callback(*args)
+        self.assertEqual(self.app.card_media.options["text"], "2.00")
+
+    def test_headless_app_reads_user_totals(self):
+        self.manager.record_quiz_result("ana", 3, 1, 5)
+        app = criar_app_sem_tela(self.manager, "ana")
+        self.assertIsNone(app.root)
+        self.assertEqual((app.total_acertos, app.total_erros, app.total_questoes), (3, 1, 4))
+        self.assertEqual(app.agendamentos, {})
+
+    def test_refresh_does_not_save(self):
+        salvou = []
+        self.manager.storage.save = lambda users: salvou.append(True)
+        self.app.update_info_cards()
+        self.assertEqual(salvou, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+import instrumentation
+from instrumentation import medido
+from passwords import PasswordHasher
+from user_data import UserDataManager
+
+class Contador:
+    @medido
+    def somar(self, a, b):
+        return a + b
+
+    @medido
+    def falhar(self):
+        raise ValueError("erro")
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.addCleanup(instrumentation.desativar)
+        self.trace = os.path.join(self.tmpdir.name, "trace.jsonl")
+
+    def test_disabled_leaves_functions_untouched(self):
+        original = Contador.__dict__["somar"]
+        instrumentation.contar("nada")  # Sem medição ativa: não faz nada
+        instrumentation.ativar(self.trace)
+        self.assertIsNot(Contador.__dict__["somar"], original)
+        instrumentation.desativar()
+        self.assertIs(Contador.__dict__["somar"], original)
+        self.assertFalse(instrumentation.ativo())
+
+    def test_trace_and_summary(self):
+        instrumentation.ativar(self.trace)
+        contador = Contador()
+        for i in range(4):
+            self.assertEqual(contador.somar(i, 1), i + 1)
+        with self.assertRaises(ValueError):
+            contador.falhar()
+        instrumentation.contar("cache", 3)
+        instrumentation.evento("inicializacao", ms=12.5)
+        instrumentation.desativar()
+        resumo = instrumentation.resumir(self.trace)
+        self.assertEqual(resumo["tempos"]["Contador.somar"]["chamadas"], 4)
+        self.assertEqual(resumo["tempos"]["Contador.falhar"]["chamadas"], 1)  # Exceções também são medidas
+        self.assertEqual(resumo["contadores"], {"cache": 3})
+        self.assertEqual(resumo["eventos"][0]["ms"], 12.5)
+        self.assertIn("Contador.somar", instrumentation.formatar_resumo(resumo))
+
+    def test_manager_io_and_profile(self):
+        perfil = os.path.join(self.tmpdir.name, "perfil.prof")
+        instrumentation.ativar(self.trace, perfil=perfil)
+        manager = UserDataManager(os.path.join(self.tmpdir.name, "users.json"), hasher=PasswordHasher(iterations=1000))
+        manager.add_user("ana", "senha", 30)
+        manager.validate_user("ana", "senha")
+        manager.validate_user("ana", "senha")
+        manager.close()
+        instrumentation.desativar()
+        resumo = instrumentation.resumir(self.trace)
+        for nome in ("UserDataManager.load_users", "UserDataManager.add_user", "JsonStorage._read", "JsonStorage._write"):
+            self.assertIn(nome, resumo["tempos"])
+        self.assertEqual(resumo["contadores"], {"login_hash": 1, "login_cache": 1})
+        self.assertTrue(os.path.getsize(perfil) > 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+from passwords import PasswordHasher, VerificationCache, is_hashed
+from user_data import UserDataManager
+
+FAST = {"iterations": 1000}
+
+class TestPasswordHasher(unittest.TestCase):
+    def test_pbkdf2_round_trip(self):
+        hasher = PasswordHasher(**FAST)
+        stored = hasher.hash("segredo")
+        self.assertTrue(stored.startswith("pbkdf2_sha256$1000$"))
+        self.assertTrue(hasher.verify("segredo", stored))
+        self.assertFalse(hasher.verify("outra", stored))
+        self.assertNotEqual(stored, hasher.hash("segredo"))  # Sal diferente a cada hash
+
+    def test_scrypt_round_trip(self):
+        hasher = PasswordHasher("scrypt", scrypt_n=2 ** 8)
+        stored = hasher.hash("segredo")
+        self.assertTrue(is_hashed(stored))
+        self.assertTrue(hasher.verify("segredo", stored))
+        self.assertFalse(hasher.verify("outra", stored))
+
+    def test_needs_rehash_when_cost_changes(self):
+        stored = PasswordHasher(iterations=1000).hash("segredo")
+        self.assertFalse(PasswordHasher(iterations=1000).needs_rehash(stored))
+        self.assertTrue(PasswordHasher(iterations=2000).needs_rehash(stored))
+        self.assertTrue(PasswordHasher(**FAST).needs_rehash("texto puro"))
+
+    def test_corrupt_hash_is_a_failed_login(self):
+        hasher = PasswordHasher(**FAST)
+        good = hasher.hash("segredo")
+        for stored in ("pbkdf2_sha256$x", "pbkdf2_sha256$abc$00$11", "pbkdf2_sha256$1000$zz$11",
+                       "pbkdf2_sha256$0$00$11", good + "$extra", "scrypt$3$8$1$00$11"):
+            self.assertFalse(hasher.verify("segredo", stored))
+            self.assertTrue(hasher.needs_rehash(stored))
+
+class TestVerificationCache(unittest.TestCase):
+    def test_bounded_lru(self):
+        cache = VerificationCache(maxsize=2)
+        cache.add("a", "h1", "pa")
+        cache.add("b", "h2", "pb")
+        self.assertTrue(cache.check("a", "h1", "pa"))
+        cache.add("c", "h3", "pc")
+        self.assertEqual(len(cache), 2)
+        self.assertFalse(cache.check("b", "h2", "pb"))
+        self.assertTrue(cache.check("a", "h1", "pa"))
+
+    def test_rejects_wrong_password_or_changed_hash(self):
+        cache = VerificationCache()
+        cache.add("a", "h1", "pa")
+        self.assertFalse(cache.check("a", "h1", "errada"))
+        self.assertFalse(cache.check("a", "h2", "pa"))
+
+class CountingHasher(PasswordHasher):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.verifications = 0
+
+    def verify(self, password, stored):
+        self.verifications += 1
+        return super().verify(password, stored)
+
+class TestManagerPasswords(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filepath = os.path.join(self.tmpdir.name, "users.json")
+
+    def test_plaintext_passwords_are_migrated_on_load(self):
+        with open(self.filepath, "w", encoding="utf-8") as f:
+            json.dump({"user1": {"password": "1212", "age": 18, "acertos": 0, "erros": 0, "tempo": 0}}, f)
+        manager = UserDataManager(self.filepath, hasher=PasswordHasher(**FAST))
+        with open(self.filepath, encoding="utf-8") as f:
+            self.assertTrue(is_hashed(json.load(f)["user1"]["password"]))
+        self.assertTrue(manager.validate_user("user1", "1212"))
+        self.assertFalse(manager.validate_user("user1", "errada"))
+
+    def test_read_only_manager_does_not_migrate(self):
+        with open(self.filepath, "w", encoding="utf-8") as f:
+            json.dump({"user1": {"password": "1212", "age": 18, "acertos": 0, "erros": 0, "tempo": 0}}, f)
+        UserDataManager(self.filepath, hasher=PasswordHasher(**FAST), migrate_passwords=False)
+        with open(self.filepath, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["user1"]["password"], "1212")
+
+    def test_repeated_logins_hit_the_cache(self):
+        hasher = CountingHasher(**FAST)
+        manager = UserDataManager(self.filepath, hasher=hasher)
+        manager.add_user("user1", "pass1", 25)
+        for _ in range(5):
+            self.assertTrue(manager.validate_user("user1", "pass1"))
+        self.assertEqual(hasher.verifications, 1)
+        self.assertFalse(manager.validate_user("user1", "errada"))
+
+    def test_login_rehashes_with_new_cost(self):
+        UserDataManager(self.filepath, hasher=PasswordHasher(iterations=1000)).add_user("user1", "pass1", 25)
+        manager = UserDataManager(self.filepath, hasher=PasswordHasher(iterations=2000))
+        self.assertTrue(manager.validate_user("user1", "pass1"))
+        self.assertTrue(manager.get_user_data("user1")["password"].startswith("pbkdf2_sha256$2000$"))
+
+    def test_login_with_corrupt_hash_fails(self):
+        with open(self.filepath, "w", encoding="utf-8") as f:
+            json.dump({"user1": {"password": "pbkdf2_sha256$x", "age": 18, "acertos": 0, "erros": 0, "tempo": 0}}, f)
+        manager = UserDataManager(self.filepath, hasher=PasswordHasher(**FAST))
+        self.assertFalse(manager.validate_user("user1", "x"))
+
+if __name__ == "__main__":
+    unittest.main()
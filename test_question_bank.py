@@ -0,0 +1,45 @@
+import random
+import unittest
+from question_bank import QuestionBank, default_bank
+
+def make_bank():
+    lessons = []
+    for lesson in ("a", "b"):
+        questions = [
+            {"id": f"{lesson}-{i}", "topic": "t1" if i % 2 else "t2", "difficulty": 1 + i % 3,
+             "question": f"Pergunta {lesson}{i}?", "options": {"a": "x", "b": "y"}, "correct": "a"}
+            for i in range(30)
+        ]
+        lessons.append({"id": lesson, "title": lesson.upper(), "info": "", "questions": questions})
+    return QuestionBank(lessons)
+
+class TestQuestionBank(unittest.TestCase):
+    def test_default_bank_has_all_lessons(self):
+        bank = default_bank()
+        self.assertEqual(set(bank.lessons), {"introducao_computador", "seguranca_internet", "uso_basico_software", "dicas_inclusao"})
+        question = bank.get("intro-1")
+        self.assertEqual(question.question, "O que é hardware?")
+        self.assertEqual(question.correct, "b")
+        self.assertIs(default_bank(), bank)
+
+    def test_index_filters(self):
+        bank = make_bank()
+        self.assertEqual(len(bank.select()), 60)
+        self.assertEqual(len(bank.select(lesson="a")), 30)
+        self.assertTrue(all(q.topic == "t1" and q.difficulty == 2 for q in bank.select(topic="t1", difficulty=2)))
+        self.assertEqual(bank.select(lesson="inexistente"), [])
+
+    def test_draw_returns_distinct_questions(self):
+        bank = make_bank()
+        drawn = bank.draw(10, lesson="b", rng=random.Random(1))
+        self.assertEqual(len({q.id for q in drawn}), 10)
+        self.assertTrue(all(q.lesson == "b" for q in drawn))
+        self.assertEqual(len(bank.draw(100, lesson="b")), 30)
+
+    def test_rejects_duplicate_ids(self):
+        question = {"id": "q", "question": "?", "options": {"a": "x"}, "correct": "a"}
+        with self.assertRaises(ValueError):
+            QuestionBank([{"id": "l", "title": "", "info": "", "questions": [question, question]}])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+import unittest
+from passwords import PasswordHasher
+from quiz_server import QuizClient, run_in_thread
+from user_data import UserDataManager
+
+
+class TestQuizServer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        filepath = os.path.join(self.tmpdir.name, "users.json")
+        self.manager = UserDataManager(filepath, hasher=PasswordHasher(iterations=1000))
+        self.port, self.stop = run_in_thread(self.manager)
+        self.client = QuizClient("127.0.0.1", self.port)
+
+    def tearDown(self):
+        self.client.close()
+        self.stop()
+        self.manager.close()
+        self.tmpdir.cleanup()
+
+    def test_register_login_and_record(self):
+        added = []
+        self.client.add_user("ana", "senha", 30, callback=lambda username, user: added.append(username))
+        self.assertEqual(added, ["ana"])
+        self.assertFalse(self.client.validate_user("ana", "errada"))
+        self.assertTrue(self.client.validate_user("ana", "senha"))
+        self.client.record_quiz_result("ana", 3, 1, 12.5)
+        self.client.record_answer("ana", "seguranca_internet", "seg-1", True, 2.5)
+        self.assertEqual(self.manager.history().stats("seg-1").attempts, 1)
+        self.assertEqual(self.client.review_questions("ana", 2, ["seg-1", "seg-2"]), ["seg-2", "seg-1"])
+
+        user = self.client.get_user_data("ana")
+        self.assertEqual((user["acertos"], user["erros"], user["tempo"]), (3, 1, 12.5))
+        self.assertNotIn("password", user)
+        self.assertEqual(self.manager.get_user_data("ana")["acertos"], 3)
+
+    def test_record_requires_login(self):
+        self.client.add_user("ana", "senha", 30)
+        with self.assertRaises(ValueError):
+            self.client.record_quiz_result("ana", 1, 0, 1)
+        self.assertEqual(self.manager.get_user_data("ana")["acertos"], 0)
+
+    def test_duplicate_user(self):
+        self.client.add_user("ana", "senha", 30)
+        with self.assertRaises(ValueError):
+            self.client.add_user("ana", "outra", 40)
+
+    def test_user_data_requires_login(self):
+        self.client.add_user("ana", "senha", 30)
+        self.client.add_user("bruno", "senha", 40)
+        with self.assertRaises(ValueError):
+            self.client.get_user_data("ana")
+        self.client.validate_user("ana", "senha")
+        self.assertEqual(self.client.get_user_data("ana")["age"], 30)
+        with self.assertRaises(ValueError):
+            self.client.get_user_data("bruno")
+
+    def test_rejects_requests_that_are_not_objects(self):
+        for line in (b"[]\n", b"1\n", b"{\n"):
+            self.client._file.write(line)
+            self.client._file.flush()
+            response = json.loads(self.client._file.readline())
+            self.assertFalse(response["ok"])
+            self.assertIsNone(response["id"])
+        self.client.add_user("ana", "senha", 30)  # A conexão continua aberta
+        self.assertTrue(self.client.validate_user("ana", "senha"))
+
+    def test_invalid_payloads_are_rejected_and_connection_survives(self):
+        self.client.add_user("ana", "senha", 30)
+        self.client.validate_user("ana", "senha")
+        for acertos, erros in ((-1, 0), (1, "2"), (10 ** 12, 0)):
+            with self.assertRaises(ValueError):
+                self.client.record_quiz_result("ana", acertos, erros, 1.0)
+        with self.assertRaises(ValueError):
+            self.client._call("review", k=-3, question_ids=["seg-1"])
+        with self.assertRaises(ValueError):
+            self.client._call("review", k=2, question_ids="seg-1")
+        self.client.record_quiz_result("ana", 2, 1, 3.0)
+        user = self.client.get_user_data("ana")
+        self.assertEqual((user["acertos"], user["erros"]), (2, 1))
+        self.assertEqual(self.client.rank("ana"), (1, 1))
+
+    def test_storage_errors_do_not_drop_the_connection(self):
+        def falhar(username):
+            raise OSError("disco cheio")
+        self.manager.rank = falhar
+        with self.assertRaises(ValueError):
+            self.client.rank("ana")
+        self.client.add_user("ana", "senha", 30)
+        self.assertTrue(self.client.validate_user("ana", "senha"))
+
+    def test_stats_and_columns(self):
+        for username, acertos in (("ana", 2), ("bruno", 4), ("carla", 4)):
+            self.client.add_user(username, "senha", 20)
+            self.client.validate_user(username, "senha")
+            self.client.record_quiz_result(username, acertos, 0, 1)
+        stats = self.client.stats
+        self.assertAlmostEqual(stats.acertos.mean(), 10 / 3)
+        self.assertEqual(stats.acertos.mode(), 4)
+        self.assertEqual(sorted(self.client.columns().acertos.tolist()), [2, 4, 4])
+        self.assertEqual(self.client.rank("ana"), (3, 3))
+        self.assertEqual(self.client.top(2), [("bruno", 4), ("carla", 4)])
+
+
+if __name__ == '__main__':
+    unittest.main()
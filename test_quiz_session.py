@@ -0,0 +1,72 @@
+import unittest
+from question_bank import default_bank
+from quiz_session import CANCELADO, CONCLUIDO, INTRODUCAO, PERGUNTA, RESPOSTA, QuizSession
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQuizSession(unittest.TestCase):
+    def setUp(self):
+        self.questions = default_bank().lesson("seguranca_internet").questions
+        self.clock = FakeClock()
+
+    def wrong_option(self, question):
+        return next(key for key in question.options if key != question.correct)
+
+    def test_full_quiz_with_timing(self):
+        session = QuizSession(self.questions, intro=("Título", "Texto"), clock=self.clock)
+        self.assertEqual(session.state, INTRODUCAO)
+        self.clock.now = 5.0
+        session.start()
+        self.assertEqual(session.state, PERGUNTA)
+
+        self.clock.now = 8.0
+        self.assertEqual(session.answer(session.current.correct), (True, 3.0))
+        self.assertEqual(session.state, RESPOSTA)
+        self.clock.now = 10.0
+        session.next()
+        self.clock.now = 14.5
+        correct, latency = session.answer(self.wrong_option(session.current))
+        self.assertFalse(correct)
+        self.assertEqual(latency, 4.5)
+        session.next()
+
+        self.assertEqual(session.state, CONCLUIDO)
+        self.assertTrue(session.finished)
+        self.assertEqual((session.score, session.erros), (1, 1))
+        self.assertEqual(session.latencies, [3.0, 4.5])
+        self.clock.now = 100.0
+        self.assertEqual(session.elapsed, 9.5)  # Do início até a última resposta
+
+    def test_invalid_answer_and_order(self):
+        session = QuizSession(self.questions, clock=self.clock)
+        self.assertEqual(session.state, PERGUNTA)
+        with self.assertRaises(ValueError):
+            session.answer("z")
+        with self.assertRaises(ValueError):
+            session.next()
+        session.answer(session.current.correct)
+        with self.assertRaises(ValueError):
+            session.answer(session.current.correct)
+
+    def test_cancel_keeps_partial_result(self):
+        session = QuizSession(self.questions, clock=self.clock)
+        session.answer(self.wrong_option(session.current))
+        session.cancel()
+        self.assertEqual(session.state, CANCELADO)
+        self.assertEqual((session.score, session.erros), (0, 1))
+        with self.assertRaises(ValueError):
+            session.cancel()
+
+    def test_empty_quiz_finishes_on_start(self):
+        session = QuizSession([], clock=self.clock)
+        self.assertEqual(session.state, CONCLUIDO)
+        self.assertIsNone(session.current)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import random
+import tempfile
+import unittest
+from passwords import PasswordHasher
+from ranking import FenwickTree, Leaderboard
+from user_data import UserDataManager
+
+class TestFenwickTree(unittest.TestCase):
+    def test_prefix_sums_and_growth(self):
+        tree = FenwickTree(size=4)
+        counts = [0] * 100
+        rng = random.Random(3)
+        for _ in range(300):
+            index = rng.randrange(100)
+            tree.add(index, 1)
+            counts[index] += 1
+        for index in (0, 3, 4, 50, 99, 500):
+            self.assertEqual(tree.prefix_sum(index), sum(counts[:index + 1]))
+        self.assertEqual(tree.total(), 300)
+
+    def test_find(self):
+        tree = FenwickTree(size=10)
+        for index, count in ((2, 3), (7, 1), (9, 2)):
+            tree.add(index, count)
+        self.assertEqual([tree.find(k) for k in range(1, 7)], [2, 2, 2, 7, 9, 9])
+
+    def test_negative_index_is_rejected(self):
+        tree = FenwickTree(size=4)
+        with self.assertRaises(ValueError):
+            tree.add(-1, 1)
+        self.assertEqual(tree.total(), 0)
+
+
+class TestLeaderboard(unittest.TestCase):
+    def setUp(self):
+        self.board = Leaderboard()
+        self.board.reset({
+            "ana": {"acertos": 5}, "bruno": {"acertos": 9}, "carla": {"acertos": 5}, "davi": {"acertos": 0},
+        })
+
+    def test_rank_and_top(self):
+        self.assertEqual(self.board.rank("bruno"), 1)
+        self.assertEqual(self.board.rank("ana"), 2)
+        self.assertEqual(self.board.rank("carla"), 2)  # Empate divide a posição
+        self.assertEqual(self.board.rank("davi"), 4)
+        self.assertIsNone(self.board.rank("ninguem"))
+        self.assertEqual(self.board.top(3), [("bruno", 9), ("ana", 5), ("carla", 5)])
+        self.assertEqual(len(self.board.top(10)), 4)
+
+    def test_updates(self):
+        self.board.quiz_recorded("davi", {"acertos": 12}, 12, 0, 1)
+        self.board.user_added("eva", {"acertos": 0})
+        self.assertEqual(self.board.rank("davi"), 1)
+        self.assertEqual(self.board.rank("bruno"), 2)
+        self.assertEqual(self.board.rank("eva"), 5)
+        self.assertEqual(self.board.top(1), [("davi", 12)])
+
+    def test_matches_sorting(self):
+        rng = random.Random(7)
+        users = {f"u{i}": {"acertos": rng.randrange(40)} for i in range(500)}
+        board = Leaderboard()
+        board.reset(users)
+        for _ in range(200):
+            username = rng.choice(list(users))
+            users[username]["acertos"] += 3
+            board.quiz_recorded(username, users[username], 3, 0, 1)
+        ordered = sorted(users.items(), key=lambda item: (-item[1]["acertos"], item[0]))
+        self.assertEqual(board.top(20), [(name, user["acertos"]) for name, user in ordered[:20]])
+        for name, user in ordered[::37]:
+            expected = 1 + sum(1 for other in users.values() if other["acertos"] > user["acertos"])
+            self.assertEqual(board.rank(name), expected)
+
+
+class TestManagerRanking(unittest.TestCase):
+    def test_record_quiz_result_updates_rank(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = UserDataManager(os.path.join(tmpdir, "users.json"), hasher=PasswordHasher(iterations=1000))
+            manager.add_user("ana", "senha", 20)
+            manager.add_user("bruno", "senha", 30)
+            manager.record_quiz_result("bruno", 2, 0, 1)
+            self.assertEqual(manager.rank("ana"), (2, 2))
+            manager.record_quiz_result("ana", 3, 1, 1)
+            self.assertEqual(manager.rank("ana"), (1, 2))
+            self.assertEqual(manager.top(1), [("ana", 3)])
+            self.assertEqual(manager.rank("ninguem"), (None, 2))
+
+if __name__ == "__main__":
+    unittest.main()
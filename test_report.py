@@ -0,0 +1,59 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+import report
+
+class TestReport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write_store(self, name, users):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(users, f)
+        return path
+
+    def test_generates_charts_and_summaries_per_cohort(self):
+        turma_a = self.write_store("turma_a.json", {
+            "ana": {"password": "1", "age": 18, "acertos": 3, "erros": 1, "tempo": 90.0},
+            "bia": {"password": "2", "age": 27, "acertos": 1, "erros": 1, "tempo": 30.0},
+        })
+        turma_b = self.write_store("turma_b.json", {})
+        saida = os.path.join(self.tmpdir.name, "saida")
+
+        with redirect_stdout(io.StringIO()):
+            report.main([turma_a, turma_b, "-o", saida, "--formato", "png", "svg", "--por-usuario", "-j", "2"])
+
+        for arquivo in ("turma_a.png", "turma_a.svg", "turma_a_resumo.txt", "turma_b.png", "turma_a/ana.txt"):
+            self.assertTrue(os.path.exists(os.path.join(saida, arquivo)), arquivo)
+        with open(os.path.join(saida, "turma_a_resumo.txt"), encoding="utf-8") as f:
+            resumo = f.read()
+        self.assertIn("Usuários cadastrados: 2", resumo)
+        self.assertIn("Total de acertos: 4", resumo)
+        with open(os.path.join(saida, "turma_a", "ana.txt"), encoding="utf-8") as f:
+            self.assertIn("Tempo total gasto nos quizzes: 1 minutos e 30 segundos", f.read())
+
+    def test_user_files_with_the_same_sanitized_name_do_not_collide(self):
+        turma = self.write_store("turma.json", {
+            "ana silva": {"password": "1", "age": 18, "acertos": 3, "erros": 0, "tempo": 10.0},
+            "ana/silva": {"password": "2", "age": 19, "acertos": 1, "erros": 0, "tempo": 10.0},
+            "ana_silva": {"password": "3", "age": 20, "acertos": 2, "erros": 0, "tempo": 10.0},
+        })
+        arquivos = report.gerar_relatorio(turma, "turma", self.tmpdir.name, [], por_usuario=True)
+        por_usuario = sorted(os.path.basename(a) for a in arquivos if os.path.dirname(a).endswith("turma"))
+        self.assertEqual(por_usuario, ["ana_silva.txt", "ana_silva_2.txt", "ana_silva_3.txt"])
+        conteudos = set()
+        for nome in por_usuario:
+            with open(os.path.join(self.tmpdir.name, "turma", nome), encoding="utf-8") as f:
+                conteudos.add(f.read())
+        self.assertEqual(len(conteudos), 3)
+
+    def test_duplicate_names_are_disambiguated(self):
+        self.assertEqual(report.nomes_das_turmas(["a/users.json", "b/users.json"]), ["users", "b_users"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from attempt_history import AttemptHistory
+from passwords import PasswordHasher
+from segments import SegmentStats, format_table
+from user_data import UserDataManager
+
+class TestSegmentStats(unittest.TestCase):
+    def setUp(self):
+        self.segments = SegmentStats()
+        self.segments.reset({
+            "ana": {"age": 21, "acertos": 4, "registered": "2024-03-02"},
+            "bruno": {"age": 23, "acertos": 8, "registered": "2024-03-30"},
+            "carla": {"age": 67, "acertos": 5, "registered": "2024-04-10"},
+            "davi": {"age": 65, "acertos": 0},  # Cadastrado antes da data existir
+        })
+
+    def test_groups(self):
+        self.assertEqual(self.segments.summary("idade"), [("20-24", 2, 6.0, 6.0, 4), ("65-69", 2, 2.5, 2.5, 0)])
+        self.assertEqual([row[:2] for row in self.segments.summary("cadastro")],
+                         [("2024-03", 2), ("2024-04", 1), ("sem data", 1)])
+        with self.assertRaises(ValueError):
+            self.segments.summary("cidade")
+
+    def test_incremental_updates_match_reset(self):
+        davi = {"age": 65, "acertos": 3}
+        self.segments.quiz_recorded("davi", davi, 3, 2, 10)
+        self.segments.user_added("eva", {"age": 22, "acertos": 0, "registered": "2024-04-01"})
+        self.assertEqual(self.segments.summary("idade")[1], ("65-69", 2, 4.0, 4.0, 3))
+        self.assertEqual(self.segments.summary("idade")[0][:2], ("20-24", 3))
+        self.assertEqual(self.segments.summary("cadastro")[1][:2], ("2024-04", 2))
+
+    def test_format_table(self):
+        text = format_table("Acertos por faixa de idade", self.segments.summary("idade"))
+        self.assertIn("20-24", text)
+        self.assertIn("Nenhum dado ainda.", format_table("Vazio", []))
+
+
+class TestLessonScores(unittest.TestCase):
+    def test_scores_per_user_survive_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "users.history")
+            history = AttemptHistory(path)
+            history.record("ana", "seguranca_internet", "seg-1", True, 1.0)
+            history.record("ana", "seguranca_internet", "seg-2", True, 1.0)
+            history.record("bruno", "seguranca_internet", "seg-1", False, 1.0)
+            history.close()
+            history = AttemptHistory(path, flush_every=1)
+            history.record("bruno", "seguranca_internet", "seg-2", True, 1.0)  # Só no fim das colunas
+            for reopened in (history, AttemptHistory(path)):
+                scores = reopened.lesson_scores["seguranca_internet"]
+                self.assertEqual((scores.count, scores.mean(), scores.mode()), (2, 1.5, 1))
+
+
+class TestManagerSegments(unittest.TestCase):
+    def test_new_users_get_registration_date(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "users.json")
+            manager = UserDataManager(filepath, hasher=PasswordHasher(iterations=1000))
+            manager.add_user("ana", "senha", 30)
+            manager.add_users([("bruno", "senha", 34)])
+            manager.record_quiz_result("ana", 3, 1, 20)
+            manager.record_answer("ana", "dicas_inclusao", "dicas-1", True, 1.0)
+            month = date.today().isoformat()[:7]
+            self.assertEqual(manager.segment_summary("cadastro"), [(month, 2, 1.5, 1.5, 0)])
+            self.assertEqual(manager.segment_summary("idade"), [("30-34", 2, 1.5, 1.5, 0)])
+            self.assertEqual(manager.segment_summary("licao"), [("dicas_inclusao", 1, 1.0, 1, 1)])
+            manager.close()
+            reloaded = UserDataManager(filepath, hasher=PasswordHasher(iterations=1000))
+            self.assertEqual(reloaded.get_user_data("bruno")["registered"], date.today().isoformat())
+            self.assertEqual(reloaded.segment_summary("cadastro"), [(month, 2, 1.5, 1.5, 0)])
+            reloaded.close()
+
+    def test_sqlite_keeps_registration_date(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "users.json")
+            manager = UserDataManager(filepath, storage="sqlite", hasher=PasswordHasher(iterations=1000))
+            manager.add_user("ana", "senha", 30)
+            manager.close()
+            reloaded = UserDataManager(filepath, storage="sqlite", hasher=PasswordHasher(iterations=1000))
+            self.assertEqual(reloaded.get_user_data("ana")["registered"], date.today().isoformat())
+            self.assertEqual(reloaded.segment_summary("cadastro")[0][:2], (date.today().isoformat()[:7], 1))
+            reloaded.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import unittest
+from passwords import PasswordHasher
+from question_bank import default_bank
+from spaced_repetition import DAY, ItemState, ReviewScheduler, quality
+from user_data import UserDataManager
+
+class TestItemState(unittest.TestCase):
+    def test_sm2_intervals(self):
+        self.assertEqual([quality(False, 1), quality(True, 2), quality(True, 12), quality(True, 60)], [1, 5, 4, 3])
+        state = ItemState()
+        state.review(5, 0)
+        self.assertEqual((state.interval, state.due), (1.0, DAY))
+        state.review(5, DAY)
+        self.assertEqual(state.interval, 6.0)
+        state.review(4, 7 * DAY)
+        self.assertAlmostEqual(state.interval, 6.0 * state.easiness)
+        easiness = state.easiness
+        state.review(1, 30 * DAY)  # Esqueceu: volta para um dia e fica mais "difícil"
+        self.assertEqual((state.repetitions, state.interval), (0, 1.0))
+        self.assertLess(state.easiness, easiness)
+        for _ in range(10):
+            state.review(1, 30 * DAY)
+        self.assertEqual(state.easiness, 1.3)
+
+
+class TestReviewScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = ReviewScheduler()
+        self.candidates = ["q1", "q2", "q3", "q4", "q5"]
+
+    def test_due_then_unseen_then_upcoming(self):
+        self.scheduler.review("ana", "q1", True, 2, when=0)  # Vence em 1 dia
+        self.scheduler.review("ana", "q2", False, 2, when=0)  # Vence em 1 dia, mais difícil
+        self.scheduler.review("ana", "q3", True, 2, when=5 * DAY)  # Vence no dia 6
+        now = 2 * DAY
+        self.assertEqual(self.scheduler.next_questions("ana", 2, self.candidates, now), ["q2", "q1"])
+        self.assertEqual(self.scheduler.next_questions("ana", 4, self.candidates, now), ["q2", "q1", "q4", "q5"])
+        self.assertEqual(self.scheduler.next_questions("ana", 6, self.candidates, now), ["q2", "q1", "q4", "q5", "q3"])
+        # Quem nunca respondeu recebe as questões na ordem das candidatas
+        self.assertEqual(self.scheduler.next_questions("bruno", 3, self.candidates, now), ["q1", "q2", "q3"])
+
+    def test_answered_items_leave_the_due_queue(self):
+        self.scheduler.review("ana", "q1", False, 2, when=0)
+        self.assertEqual(self.scheduler.next_questions("ana", 1, self.candidates, 2 * DAY), ["q1"])
+        self.scheduler.review("ana", "q1", True, 2, when=2 * DAY)
+        self.assertEqual(self.scheduler.next_questions("ana", 1, self.candidates, 2 * DAY), ["q2"])
+        self.assertEqual(self.scheduler.due_count("ana", 2 * DAY), 0)
+        self.assertEqual(self.scheduler.due_count("ana", 4 * DAY), 1)
+
+
+    def test_questions_dropped_from_the_bank_are_skipped(self):
+        self.scheduler.review("ana", "antiga", False, 2, when=0)  # Vence primeiro, mas saiu do banco
+        self.scheduler.review("ana", "q1", False, 2, when=DAY)
+        self.scheduler.review("ana", "velha", True, 2, when=DAY)  # Ainda não venceu
+        self.assertEqual(self.scheduler.next_questions("ana", 2, self.candidates, 3 * DAY), ["q1", "q2"])
+        self.assertEqual(self.scheduler.next_questions("ana", 6, self.candidates, 3 * DAY), ["q1", "q2", "q3", "q4", "q5"])
+
+
+class TestManagerReviews(unittest.TestCase):
+    def test_state_survives_reopen(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "users.json")
+            hasher = PasswordHasher(iterations=1000)
+            manager = UserDataManager(filepath, hasher=hasher)
+            manager.add_user("ana", "senha", 30)
+            manager.record_answer("ana", "dicas_inclusao", "dicas-1", False, 3.0)  # Antes de abrir o agendador
+            self.assertEqual(manager.review_questions("ana", 2, ["dicas-1", "dicas-2"]), ["dicas-2", "dicas-1"])
+            manager.record_answer("ana", "dicas_inclusao", "dicas-2", True, 3.0)
+            with self.assertRaises(ValueError):
+                manager.review_questions("bruno", 2, ["dicas-1"])
+            manager.close()
+
+            reopened = UserDataManager(filepath, hasher=hasher)
+            scheduler = reopened.scheduler()
+            self.assertEqual(scheduler.state("ana", "dicas-2").repetitions, 1)
+            self.assertEqual(scheduler.state("ana", "dicas-1").repetitions, 0)
+            reopened.record_answer("ana", "dicas_inclusao", "dicas-1", True, 3.0)
+            checkpoint = os.path.join(tmpdir, "users.history", "revisao.json")
+            reopened.flush()
+            with open(checkpoint, 'r', encoding='utf-8') as f:
+                self.assertEqual(json.load(f)["rows"], 2)  # flush() só acrescenta ao histórico
+            reopened.checkpoint()  # Fim da sessão (MainApp.encerrar_sessao)
+            with open(checkpoint, 'r', encoding='utf-8') as f:
+                self.assertEqual(json.load(f)["rows"], 3)
+            reopened.close()
+            os.remove(checkpoint)  # Sem checkpoint: tudo é reaplicado a partir do histórico
+            again = UserDataManager(filepath, hasher=hasher)
+            self.assertEqual(again.scheduler().state("ana", "dicas-1").repetitions, 1)
+            again.close()
+
+    def test_review_ignores_questions_removed_from_the_bank(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = UserDataManager(os.path.join(tmpdir, "users.json"), hasher=PasswordHasher(iterations=1000))
+            manager.add_user("ana", "senha", 30)
+            manager.record_answer("ana", "dicas_inclusao", "removida-1", False, 3.0)
+            bank = default_bank()
+            ids = manager.review_questions("ana", 8, sorted(bank.questions))
+            self.assertNotIn("removida-1", ids)
+            self.assertEqual(len(ids), 8)
+            for question_id in ids:
+                bank.get(question_id)  # Todas existem no banco atual
+            manager.close()
+
+if __name__ == "__main__":
+    unittest.main()
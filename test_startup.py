@@ -0,0 +1,31 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+class TestStartup(unittest.TestCase):
+    def test_main_does_not_import_plotting_stack(self):
+        code = "import sys, main; print('matplotlib' in sys.modules, 'numpy' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "False False")
+
+    def test_startup_time_is_appended_as_json_lines(self):
+        import main
+        with tempfile.TemporaryDirectory() as tmpdir:
+            caminho = os.path.join(tmpdir, "inicializacao.jsonl")
+            with redirect_stdout(io.StringIO()) as saida:
+                main.registrar_inicializacao(0.25, caminho)
+                main.registrar_inicializacao(0.5, caminho)
+            self.assertIn("250.0 ms", saida.getvalue())
+            with open(caminho, encoding="utf-8") as f:
+                registros = [json.loads(line) for line in f]
+        self.assertEqual([r["inicializacao_ms"] for r in registros], [250.0, 500.0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import random
+import statistics
+import tempfile
+import unittest
+from user_columns import UserColumns, describe
+from user_data import UserDataManager
+
+class TestUserColumns(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.manager = UserDataManager(os.path.join(self.tmpdir.name, "users.json"))
+
+    def test_columns_follow_manager_mutations(self):
+        self.manager.add_user("user1", "pass1", 25)
+        columns = self.manager.columns()
+        self.manager.add_user("user2", "pass2", 30)
+        self.manager.record_quiz_result("user2", 3, 1, 12.5)
+        self.assertEqual(columns.ages.tolist(), [25, 30])
+        self.assertEqual(columns.acertos.tolist(), [0, 3])
+        self.assertEqual(columns.erros.tolist(), [0, 1])
+        self.assertEqual(columns.tempo.tolist(), [0, 12.5])
+
+    def test_grows_past_initial_capacity(self):
+        columns = UserColumns(capacity=2)
+        for i in range(5):
+            columns.user_added(f"user{i}", {"age": 20 + i, "acertos": i, "erros": 0, "tempo": 0})
+        self.assertEqual(len(columns), 5)
+        self.assertEqual(columns.acertos.tolist(), [0, 1, 2, 3, 4])
+
+class TestDescribe(unittest.TestCase):
+    def test_matches_statistics_module(self):
+        rng = random.Random(7)
+        values = [rng.randint(0, 15) for _ in range(501)]
+        summary = describe(values)
+        self.assertAlmostEqual(summary["mean"], statistics.mean(values))
+        self.assertEqual(summary["median"], statistics.median(values))
+        self.assertIn(summary["mode"], statistics.multimode(values))
+        self.assertEqual(summary["percentiles"][50], summary["median"])
+
+    def test_empty(self):
+        self.assertEqual(describe([])["count"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
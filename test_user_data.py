@@ -1,9 +1,14 @@
+import os
+import tempfile
 import unittest
 from user_data import UserDataManager
 
 class TestUserDataManager(unittest.TestCase):
     def setUp(self):
-        self.manager = UserDataManager()
+        # Usa um arquivo temporário para não alterar o users.json real entre os testes
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.manager = UserDataManager(os.path.join(self.tmpdir.name, "users.json"))
 
     def test_add_user_success(self):
         self.manager.add_user("user1", "pass1", 25)
@@ -41,5 +46,33 @@ class TestUserDataManager(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.manager.record_quiz_result("nonexistent", 1, 0, 30)
 
+    def test_record_quiz_result_rejects_invalid_counts(self):
+        self.manager.add_user("user1", "pass1", 25)
+        for acertos, erros, tempo in ((-1, 0, 1.0), (1, "2", 1.0), (10 ** 9, 0, 1.0), (True, 0, 1.0), (1, 0, -3.0), (1, 0, float("nan"))):
+            with self.assertRaises(ValueError):
+                self.manager.record_quiz_result("user1", acertos, erros, tempo)
+        user_data = self.manager.get_user_data("user1")
+        self.assertEqual((user_data["acertos"], user_data["erros"], user_data["tempo"]), (0, 0, 0))
+        self.assertEqual(self.manager.stats.acertos.total, 0)
+        self.assertEqual(self.manager.rank("user1"), (1, 1))
+
+    def test_close_only_saves_pending_changes(self):
+        self.manager.add_user("user1", "pass1", 25)
+        gravacoes = []
+        original = self.manager.storage._write
+        self.manager.storage._write = lambda users: (gravacoes.append(len(users)), original(users))
+        self.assertFalse(self.manager.dirty)
+        self.manager.close()
+        self.assertEqual(gravacoes, [])  # Cada alteração já estava no disco
+
+    def test_close_flushes_write_behind(self):
+        filepath = os.path.join(self.tmpdir.name, "wb.json")
+        manager = UserDataManager(filepath, storage="write-behind", interval_ms=60_000)
+        manager.add_user("user1", "pass1", 25)
+        self.assertTrue(manager.dirty)
+        manager.close()
+        self.assertFalse(manager.dirty)
+        self.assertIn("user1", UserDataManager(filepath).users)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from user_record import UserRecord, record_from_pairs
+from user_storage import JsonStorage, write_json_atomic
+
+class TestUserRecord(unittest.TestCase):
+    def test_behaves_like_the_old_dict(self):
+        user = UserRecord("hash", 25)
+        original = {"password": "hash", "age": 25, "acertos": 0, "erros": 0, "tempo": 0}
+        self.assertEqual(user, original)
+        self.assertEqual(dict(user), original)
+        self.assertEqual(list(user), list(original))
+        user["acertos"] += 3
+        user["tempo"] += 1.5
+        self.assertEqual(user.acertos, 3)
+        self.assertEqual(user.get("tempo"), 1.5)
+        self.assertEqual(user.get("nota", 7), 7)
+        self.assertIn("erros", user)
+        self.assertNotIn("nota", user)
+        with self.assertRaises(KeyError):
+            user["nota"]
+        with self.assertRaises(TypeError):
+            del user["age"]
+
+    def test_extra_fields_are_kept(self):
+        user = UserRecord.from_mapping({"password": "hash", "age": 30, "acertos": 1, "erros": 2, "tempo": 3, "turma": "A"})
+        self.assertEqual(user["turma"], "A")
+        self.assertEqual(len(user), 6)
+        self.assertEqual(user.to_dict()["turma"], "A")
+        del user["turma"]
+        self.assertEqual(len(user), 5)
+
+    def test_registration_date_only_when_present(self):
+        user = UserRecord("hash", 25, registered="2024-03-02")
+        self.assertEqual(user["registered"], "2024-03-02")
+        self.assertEqual(len(user), 6)
+        self.assertEqual(record_from_pairs(list(user.items())), user)
+        self.assertIs(type(record_from_pairs(list(user.items()))), UserRecord)
+        del user["registered"]
+        self.assertNotIn("registered", user)
+        self.assertNotIn("registered", user.to_dict())
+        self.assertIsNone(user.get("registered"))
+
+    def test_smaller_than_a_dict(self):
+        user = UserRecord("hash", 25)
+        self.assertLess(sys.getsizeof(user), sys.getsizeof(user.to_dict()))
+
+    def test_json_round_trip(self):
+        users = {"ana": UserRecord("hash", 25, 2, 1, 3.5), "bruno": UserRecord("hash2", 40)}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "users.json")
+            write_json_atomic(filepath, users)
+            with open(filepath, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["ana"], {"password": "hash", "age": 25, "acertos": 2, "erros": 1, "tempo": 3.5})
+            for streaming in (False, True):
+                loaded = JsonStorage(filepath).load_into({}, streaming)
+                self.assertIsInstance(loaded["ana"], UserRecord)
+                self.assertEqual(loaded, users)
+
+    def test_record_from_pairs_keeps_other_objects_as_dicts(self):
+        self.assertIsInstance(record_from_pairs([("password", "x"), ("age", 1)]), UserRecord)
+        self.assertEqual(record_from_pairs([("a", 1)]), {"a": 1})
+        self.assertIs(type(record_from_pairs([("password", 1), ("age", 1)])), dict)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+from user_record import UserRecord
+from user_snapshot import main, read_snapshot, snapshot_path, write_snapshot
+from user_storage import JsonStorage, LogStorage, write_json_atomic
+
+def exemplo():
+    extra = UserRecord("hash3", 52, 1, 1, 0.5)
+    extra["turma"] = "B"
+    return {
+        "ana": UserRecord("hash1", 25, 3, 1, 12.5, registered="2024-03-02"),
+        "joão": UserRecord("hash2", 70),
+        "carla": extra,
+    }
+
+
+class TestUserSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.json_path = os.path.join(self.tmpdir.name, "users.json")
+        self.bin_path = snapshot_path(self.json_path)
+
+    def test_round_trip(self):
+        users = exemplo()
+        write_json_atomic(self.json_path, users)
+        self.assertTrue(write_snapshot(self.bin_path, users, self.json_path))
+        loaded = read_snapshot(self.bin_path, self.json_path)
+        self.assertEqual(loaded, users)
+        self.assertEqual(list(loaded), list(users))
+        self.assertEqual(loaded["carla"]["turma"], "B")
+        self.assertNotIn("registered", loaded["joão"])
+
+    def test_stale_or_broken_snapshot_is_ignored(self):
+        users = exemplo()
+        write_json_atomic(self.json_path, users)
+        write_snapshot(self.bin_path, users, self.json_path)
+        write_json_atomic(self.json_path, {"ana": users["ana"]})  # JSON alterado por fora
+        self.assertIsNone(read_snapshot(self.bin_path, self.json_path))
+        self.assertEqual(len(read_snapshot(self.bin_path)), 3)  # Sem conferir o carimbo
+        with open(self.bin_path, "r+b") as f:
+            f.truncate(60)
+        self.assertIsNone(read_snapshot(self.bin_path))
+        self.assertIsNone(read_snapshot(os.path.join(self.tmpdir.name, "nada.bin")))
+
+    def test_records_that_do_not_fit_fall_back_to_json(self):
+        write_snapshot(self.bin_path, exemplo())
+        self.assertFalse(write_snapshot(self.bin_path, {"ana": {"password": "hash", "age": "vinte"}}))
+        self.assertFalse(os.path.exists(self.bin_path))
+
+    def test_storage_prefers_fresh_snapshot(self):
+        storage = JsonStorage(self.json_path, snapshot=True)
+        users = exemplo()
+        storage.save(users)
+        self.assertTrue(os.path.exists(self.bin_path))
+        for streaming in (False, True):
+            self.assertEqual(JsonStorage(self.json_path, snapshot=True).load_into({}, streaming), users)
+        # Editado à mão: vale o JSON
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump({"davi": {"password": "hash", "age": 40, "acertos": 0, "erros": 0, "tempo": 0}}, f)
+        self.assertEqual(list(JsonStorage(self.json_path, snapshot=True).load()), ["davi"])
+
+    def test_log_is_applied_over_snapshot(self):
+        storage = LogStorage(self.json_path, snapshot=True)
+        users = storage.load()
+        storage.save(exemplo())
+        users = storage.load()
+        storage.increment(users, "ana", 2, 0, 1.0)
+        storage.close()
+        self.assertEqual(LogStorage(self.json_path, snapshot=True).load()["ana"]["acertos"], 5)
+
+    def test_conversion_tool(self):
+        write_json_atomic(self.json_path, exemplo())
+        self.assertEqual(main(["para-binario", self.json_path]), 3)
+        self.assertIsNotNone(read_snapshot(self.bin_path, self.json_path))
+        os.remove(self.json_path)
+        self.assertEqual(main(["para-json", self.bin_path, self.json_path]), 3)
+        self.assertEqual(JsonStorage(self.json_path).load(), exemplo())
+        self.assertIsNotNone(read_snapshot(self.bin_path, self.json_path))  # Continua atual
+
+if __name__ == "__main__":
+    unittest.main()
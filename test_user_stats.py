@@ -0,0 +1,59 @@
+import os
+import random
+import statistics
+import tempfile
+import unittest
+from user_data import UserDataManager
+from user_stats import RunningStats
+
+class TestRunningStats(unittest.TestCase):
+    def test_matches_statistics_module(self):
+        rng = random.Random(42)
+        for size in (1, 2, 5, 10, 101):
+            values = [rng.randint(0, 20) for _ in range(size)]
+            stats = RunningStats(values)
+            self.assertAlmostEqual(stats.mean(), statistics.mean(values))
+            self.assertEqual(stats.median(), statistics.median(values))
+            self.assertIn(stats.mode(), statistics.multimode(values))
+
+    def test_replace_moves_value_between_bins(self):
+        stats = RunningStats([0, 0, 3])
+        stats.replace(0, 5)
+        self.assertEqual(stats.histogram, {0: 1, 3: 1, 5: 1})
+        self.assertEqual(stats.median(), 3)
+        self.assertAlmostEqual(stats.mean(), 8 / 3)
+
+    def test_mode_tie_returns_smallest_value(self):
+        self.assertEqual(RunningStats([4, 4, 1, 1, 7]).mode(), 1)
+
+    def test_empty(self):
+        stats = RunningStats()
+        self.assertEqual((stats.mean(), stats.median(), stats.mode()), (0, 0, 0))
+
+class TestUserStatsTracking(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filepath = os.path.join(self.tmpdir.name, "users.json")
+
+    def test_manager_keeps_stats_in_sync(self):
+        manager = UserDataManager(self.filepath)
+        manager.add_user("user1", "pass1", 25)
+        manager.add_user("user2", "pass2", 30)
+        manager.add_user("user3", "pass3", 35)
+        manager.record_quiz_result("user1", 3, 1, 10.0)
+        manager.record_quiz_result("user2", 1, 0, 5.0)
+        manager.record_quiz_result("user1", 1, 0, 5.0)
+
+        acertos = [user["acertos"] for user in manager.users.values()]
+        self.assertAlmostEqual(manager.stats.acertos.mean(), statistics.mean(acertos))
+        self.assertEqual(manager.stats.acertos.median(), statistics.median(acertos))
+
+        self.assertEqual(manager.stats.erros.histogram, {1: 1, 0: 2})
+        self.assertEqual(manager.stats.idades.histogram, {25: 1, 30: 1, 35: 1})
+
+        reloaded = UserDataManager(self.filepath)
+        self.assertEqual(reloaded.stats.snapshot(), manager.stats.snapshot())
+
+if __name__ == "__main__":
+    unittest.main()
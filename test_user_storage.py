@@ -0,0 +1,360 @@
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from passwords import PasswordHasher
+from user_data import UserDataManager
+from user_storage import JsonStorage, iter_json_users
+
+class TestLogStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filepath = os.path.join(self.tmpdir.name, "users.json")
+
+    def open_manager(self, **options):
+        manager = UserDataManager(self.filepath, storage="log", **options)
+        self.addCleanup(manager.close)
+        return manager
+
+    def test_mutations_append_to_log_without_rewriting_snapshot(self):
+        manager = self.open_manager()
+        manager.add_user("user1", "pass1", 25)
+        manager.record_quiz_result("user1", 2, 1, 10.0)
+        self.assertFalse(os.path.exists(self.filepath))
+        with open(self.filepath + ".log", encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    def test_load_replays_log(self):
+        manager = self.open_manager()
+        manager.add_user("user1", "pass1", 25)
+        manager.record_quiz_result("user1", 2, 1, 10.0)
+        manager.close()
+
+        reloaded = self.open_manager()
+        self.assertEqual(reloaded.get_user_data("user1")["acertos"], 2)
+        self.assertEqual(reloaded.get_user_data("user1")["erros"], 1)
+
+    def test_load_ignores_torn_tail(self):
+        manager = self.open_manager()
+        manager.add_user("user1", "pass1", 25)
+        manager.close()
+        with open(self.filepath + ".log", "a", encoding="utf-8") as f:
+            f.write('{"user": "user1", "data": {"acer')
+
+        reloaded = self.open_manager()
+        self.assertEqual(reloaded.get_user_data("user1")["acertos"], 0)
+        reloaded.record_quiz_result("user1", 1, 0, 1.0)
+        reloaded.close()
+        self.assertEqual(self.open_manager().get_user_data("user1")["acertos"], 1)
+
+    def test_compaction_writes_snapshot_and_truncates_log(self):
+        manager = self.open_manager(compact_threshold=3)
+        manager.add_user("user1", "pass1", 25)
+        manager.record_quiz_result("user1", 1, 0, 1.0)
+        manager.record_quiz_result("user1", 1, 0, 1.0)
+        self.assertEqual(os.path.getsize(self.filepath + ".log"), 0)
+        with open(self.filepath, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["user1"]["acertos"], 2)
+
+    def test_replay_after_compaction_is_idempotent(self):
+        manager = self.open_manager()
+        manager.add_user("user1", "pass1", 25)
+        manager.record_quiz_result("user1", 1, 0, 1.0)
+        manager.save_users()
+        # Simula uma queda entre a troca do snapshot e a limpeza do log
+        with open(self.filepath + ".log", "w", encoding="utf-8") as f:
+            f.write(json.dumps({"user": "user1", "data": manager.get_user_data("user1")}) + "\n")
+        manager.close()
+        self.assertEqual(self.open_manager().get_user_data("user1")["acertos"], 1)
+
+class TestWriteBehindStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filepath = os.path.join(self.tmpdir.name, "users.json")
+
+    def open_manager(self, interval_ms=60000):
+        manager = UserDataManager(self.filepath, storage="write-behind", interval_ms=interval_ms)
+        self.addCleanup(manager.close)
+        return manager
+
+    def read_file(self):
+        with open(self.filepath, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_mutations_are_deferred_until_flush(self):
+        manager = self.open_manager()
+        manager.add_user("user1", "pass1", 25)
+        manager.record_quiz_result("user1", 2, 0, 5.0)
+        manager.save_users()
+        self.assertFalse(os.path.exists(self.filepath))
+        self.assertTrue(manager.storage.dirty)
+
+        manager.flush()
+        self.assertFalse(manager.storage.dirty)
+        self.assertEqual(self.read_file()["user1"]["acertos"], 2)
+
+    def test_background_thread_writes_without_flush(self):
+        manager = self.open_manager(interval_ms=20)
+        manager.add_user("user1", "pass1", 25)
+        for _ in range(10):
+            manager.record_quiz_result("user1", 1, 0, 1.0)
+        deadline = time.time() + 5
+        while not os.path.exists(self.filepath) and time.time() < deadline:
+            time.sleep(0.01)
+        # Sem flush explícito: a gravação veio da thread em segundo plano
+        self.assertIn("user1", self.read_file())
+        self.assertTrue(manager.writes_in_background)
+        self.assertFalse(UserDataManager(os.path.join(self.tmpdir.name, "outro.json")).writes_in_background)
+
+    def test_close_persists_pending_changes(self):
+        manager = self.open_manager()
+        manager.add_user("user1", "pass1", 25)
+        manager.close()
+        self.assertIn("user1", self.read_file())
+        self.assertFalse(os.path.exists(self.filepath + ".tmp"))
+
+def record_many(filepath, username, times):
+    manager = UserDataManager(filepath, storage="shared", hasher=PasswordHasher(iterations=1))
+    for _ in range(times):
+        manager.record_quiz_result(username, 1, 1, 0.5)
+    manager.close()
+
+class TestSharedJsonStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filepath = os.path.join(self.tmpdir.name, "users.json")
+
+    def open_manager(self, **options):
+        manager = UserDataManager(self.filepath, storage="shared", hasher=PasswordHasher(iterations=1), **options)
+        self.addCleanup(manager.close)
+        return manager
+
+    def read_file(self):
+        with open(self.filepath, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_concurrent_increments_are_merged(self):
+        first = self.open_manager()
+        first.add_user("user1", "pass1", 25)
+        second = self.open_manager()
+
+        first.record_quiz_result("user1", 2, 0, 10.0)
+        second.record_quiz_result("user1", 3, 1, 5.0)  # second ainda não viu os 2 acertos
+
+        user = self.read_file()["user1"]
+        self.assertEqual((user["acertos"], user["erros"], user["tempo"]), (5, 1, 15.0))
+        self.assertEqual(second.get_user_data("user1")["acertos"], 5)
+        self.assertEqual(second.stats.acertos.total, 5)
+
+    def test_users_registered_in_other_processes_are_kept(self):
+        first = self.open_manager()
+        second = self.open_manager()
+        first.add_user("user1", "pass1", 25)
+        second.add_user("user2", "pass2", 30)
+        self.assertEqual(set(self.read_file()), {"user1", "user2"})
+        self.assertIn("user1", second.users)
+
+    def test_batched_mutations_sync_on_flush(self):
+        manager = self.open_manager(batch_size=100)
+        manager.add_user("user1", "pass1", 25)  # Cadastros são gravados na hora
+        manager.record_quiz_result("user1", 1, 0, 1.0)
+        self.assertEqual(self.read_file()["user1"]["acertos"], 0)
+        manager.flush()
+        self.assertEqual(self.read_file()["user1"]["acertos"], 1)
+
+    def test_same_name_registered_in_other_process_is_rejected(self):
+        first = self.open_manager(batch_size=100)
+        second = self.open_manager(batch_size=100)
+        added = []
+        first.add_user("user1", "pass1", 25)
+        with self.assertRaises(ValueError):
+            second.add_user("user1", "pass2", 30, callback=lambda username, user: added.append(username))
+        self.assertEqual(added, [])
+        self.assertEqual(second.get_user_data("user1")["age"], 25)
+        self.assertEqual(second.stats.acertos.count, 1)
+        with self.assertRaises(ValueError):
+            second.add_users([("user2", "pass2", 30), ("user1", "pass3", 40)])
+        self.assertNotIn("user2", second.users)
+        self.assertEqual(set(self.read_file()), {"user1"})
+
+    def test_failed_write_stays_pending_until_flush(self):
+        first = self.open_manager()
+        first.add_user("user1", "pass1", 25)
+        second = self.open_manager()
+        second.record_quiz_result("user1", 3, 0, 1.0)
+
+        def disco_cheio(users):
+            raise IOError("disco cheio")
+        original, first.storage._write = first.storage._write, disco_cheio
+        with redirect_stdout(io.StringIO()):
+            first.record_quiz_result("user1", 2, 0, 1.0)  # Mescla os 3 acertos do outro terminal
+            first.add_user("user2", "pass2", 30)
+        first.storage._write = original
+        self.assertTrue(first.storage.dirty)
+        self.assertIn("user2", first.users)
+
+        second.record_quiz_result("user1", 1, 0, 1.0)
+        first.flush()
+        self.assertFalse(first.storage.dirty)
+        users = self.read_file()
+        self.assertEqual(users["user1"]["acertos"], 6)
+        self.assertIn("user2", users)
+
+    def test_answers_are_not_written_to_the_history(self):
+        manager = self.open_manager()
+        manager.add_user("user1", "pass1", 25)
+        manager.record_answer("user1", "dicas_inclusao", "dicas-1", False, 3.0)
+        self.assertEqual(manager.review_questions("user1", 2, ["dicas-1", "dicas-2"]), ["dicas-2", "dicas-1"])
+        self.assertEqual(manager.segment_summary("licao"), [])
+        manager.flush()
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, "users.history")))
+
+    def test_no_lost_updates_across_processes(self):
+        self.open_manager().add_user("user1", "pass1", 25)
+        processes = [multiprocessing.Process(target=record_many, args=(self.filepath, "user1", 25)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        user = self.read_file()["user1"]
+        self.assertEqual((user["acertos"], user["erros"]), (100, 100))
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filepath = os.path.join(self.tmpdir.name, "users.json")
+
+    def open_manager(self):
+        manager = UserDataManager(self.filepath, storage="sqlite")
+        self.addCleanup(manager.close)
+        return manager
+
+    def test_imports_existing_json_on_first_open(self):
+        with open(self.filepath, "w", encoding="utf-8") as f:
+            json.dump({"user1": {"password": "pass1", "age": 25, "acertos": 2, "erros": 1, "tempo": 3.5}}, f)
+        manager = self.open_manager()
+        self.assertTrue(manager.validate_user("user1", "pass1"))
+        self.assertEqual(manager.get_user_data("user1")["acertos"], 2)
+
+    def test_uses_wal_mode(self):
+        manager = self.open_manager()
+        self.assertEqual(manager.storage.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_record_quiz_result_persists(self):
+        manager = self.open_manager()
+        manager.add_user("user1", "pass1", 25)
+        manager.record_quiz_result("user1", 3, 1, 120.5)
+        manager.close()
+
+        user_data = self.open_manager().get_user_data("user1")
+        self.assertEqual(user_data["acertos"], 3)
+        self.assertEqual(user_data["erros"], 1)
+        self.assertAlmostEqual(user_data["tempo"], 120.5)
+
+    def test_users_mapping_supports_in_place_updates(self):
+        # O MainApp incrementa os contadores diretamente em self.users
+        manager = self.open_manager()
+        manager.add_user("user1", "pass1", 25)
+        manager.add_user("user2", "pass2", 30)
+        manager.users["user1"]["acertos"] += 1
+        self.assertEqual(manager.users["user1"]["acertos"], 1)
+        self.assertEqual(sorted(user["age"] for user in manager.users.values()), [25, 30])
+        self.assertEqual(len(manager.users), 2)
+        self.assertIsNone(manager.get_user_data("nonexistent"))
+        with self.assertRaises(ValueError):
+            manager.add_user("user1", "pass1", 25)
+
+class GatedStorage(JsonStorage):
+    # Lê o primeiro usuário e para até o teste liberar o resto
+    def __init__(self, filepath):
+        super().__init__(filepath)
+        self.gate = threading.Event()
+
+    def load_into(self, users, streaming=True):
+        for i, (username, user) in enumerate(iter_json_users(self.filepath)):
+            users[username] = user
+            if i == 0:
+                self.gate.wait()
+        return users
+
+
+class TestStreamingLoad(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filepath = os.path.join(self.tmpdir.name, "users.json")
+        self.hasher = PasswordHasher(iterations=1000)
+        password = self.hasher.hash("senha")
+        self.users = {f"user{i}": {"password": password, "age": 20 + i % 50, "acertos": i % 7, "erros": 1, "tempo": i / 4}
+                      for i in range(500)}
+        self.users['aspas "e" barra \\'] = {"password": password, "age": 30, "acertos": 0, "erros": 0, "tempo": 0}
+        self.users["ação"] = {"password": password, "age": 40, "acertos": 1, "erros": 0, "tempo": 0}
+
+    def write(self, users, **options):
+        with open(self.filepath, "w", encoding="utf-8") as f:
+            json.dump(users, f, ensure_ascii=False, **options)
+
+    def test_matches_json_load_for_any_chunk_size(self):
+        for options in ({"indent": 4}, {"separators": (",", ":")}):
+            self.write(self.users, **options)
+            for chunk_size in (1, 7, 100, 1 << 16):
+                loaded = dict(iter_json_users(self.filepath, chunk_size))
+                self.assertEqual(loaded, self.users)
+                self.assertEqual(list(loaded), list(self.users))
+
+    def test_field_names_are_shared_between_records(self):
+        self.write(self.users, indent=4)
+        loaded = dict(iter_json_users(self.filepath, 64))
+        first, second = (list(loaded[name]) for name in ("user0", "user499"))
+        self.assertTrue(all(a is b for a, b in zip(first, second)))
+
+    def test_empty_and_truncated_files(self):
+        self.write({})
+        self.assertEqual(list(iter_json_users(self.filepath)), [])
+        self.write(self.users)
+        with open(self.filepath, "r+", encoding="utf-8") as f:
+            f.truncate(os.path.getsize(self.filepath) // 2)
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_json_users(self.filepath, 256))
+        self.assertEqual(JsonStorage(self.filepath).load_into({}), {})
+
+    def test_login_before_background_load_finishes(self):
+        self.write(self.users, indent=4)
+        storage = GatedStorage(self.filepath)
+        manager = UserDataManager(self.filepath, storage=storage, hasher=self.hasher, background_load=True)
+        self.addCleanup(storage.gate.set)
+        self.assertTrue(manager.validate_user("user0", "senha"))
+        self.assertTrue(manager._loader.is_alive())
+        self.assertEqual(manager.stats.acertos.count, 0)  # Estatísticas só no fim da carga
+
+        storage.gate.set()
+        self.assertTrue(manager.validate_user("user499", "senha"))
+        manager.wait_loaded()
+        self.assertEqual(len(manager.users), len(self.users))
+        self.assertEqual(manager.stats.acertos.count, len(self.users))
+        with self.assertRaises(ValueError):
+            manager.add_user("user10", "senha", 30)
+
+    def test_background_load_replays_log(self):
+        self.write(self.users, indent=4)
+        manager = UserDataManager(self.filepath, storage="log", hasher=self.hasher)
+        manager.record_quiz_result("user3", 5, 0, 1)
+        manager.close()
+
+        manager = UserDataManager(self.filepath, storage="log", hasher=self.hasher, background_load=True)
+        self.addCleanup(manager.close)
+        self.assertEqual(manager.get_user_data("user3")["acertos"], 3 + 5)
+        self.assertEqual(manager.columns().size, len(self.users))
+
+if __name__ == "__main__":
+    unittest.main()
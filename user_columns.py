@@ -0,0 +1,91 @@
+import numpy as np
+
+# Visão em colunas dos usuários (arrays NumPy contíguos), mantida em sincronia pelo
+# UserDataManager. As estatísticas viram poucas operações vetoriais, sem percorrer dicts.
+
+FIELDS = {"age": np.int32, "acertos": np.int64, "erros": np.int64, "tempo": np.float64}
+
+
+class UserColumns:
+    def __init__(self, capacity=1024):
+        self.index = {}  # username -> linha
+        self.size = 0
+        self._data = {field: np.zeros(capacity, dtype=dtype) for field, dtype in FIELDS.items()}
+
+    def __len__(self):
+        return self.size
+
+    def column(self, field):
+        return self._data[field][:self.size]
+
+    @property
+    def ages(self):
+        return self.column("age")
+
+    @property
+    def acertos(self):
+        return self.column("acertos")
+
+    @property
+    def erros(self):
+        return self.column("erros")
+
+    @property
+    def tempo(self):
+        return self.column("tempo")
+
+    def _grow(self, needed):
+        capacity = len(self._data["age"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for field, values in self._data.items():
+            grown = np.zeros(capacity, dtype=values.dtype)
+            grown[:self.size] = values[:self.size]
+            self._data[field] = grown
+
+    def reset(self, users):
+        self.index = {}
+        self.size = 0
+        self._grow(len(users))
+        rows = {field: [] for field in FIELDS}
+        for username, user in users.items():
+            self.index[username] = len(self.index)
+            for field in FIELDS:
+                rows[field].append(user.get(field, 0) or 0)
+        self.size = len(self.index)
+        for field, values in rows.items():
+            self._data[field][:self.size] = values
+
+    def user_added(self, username, user):
+        self._grow(self.size + 1)
+        row = self.size
+        self.index[username] = row
+        for field in FIELDS:
+            self._data[field][row] = user.get(field, 0)
+        self.size += 1
+
+    def quiz_recorded(self, username, user, acertos, erros, tempo):
+        row = self.index[username]
+        self._data["acertos"][row] = user["acertos"]
+        self._data["erros"][row] = user["erros"]
+        self._data["tempo"][row] = user["tempo"]
+
+
+def describe(values, percentiles=(25, 50, 75, 90)):
+    # Resumo de uma coluna de inteiros não negativos (acertos, erros, idade)
+    values = np.asarray(values)
+    if values.size == 0:
+        return {"count": 0, "mean": 0, "median": 0, "mode": 0, "min": 0, "max": 0,
+                "percentiles": {p: 0 for p in percentiles}}
+    counts = np.bincount(values)
+    return {
+        "count": int(values.size),
+        "mean": float(values.mean()),
+        "median": float(np.median(values)),
+        "mode": int(counts.argmax()),  # argmax devolve o menor valor em caso de empate
+        "min": int(values.min()),
+        "max": int(values.max()),
+        "percentiles": dict(zip(percentiles, np.percentile(values, percentiles).tolist())),
+    }
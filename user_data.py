@@ -1,51 +1,318 @@
-import json
+import math
 import os
+import threading
+import time
+from datetime import date
+from instrumentation import contar, medido
+from passwords import PasswordHasher, VerificationCache, is_hashed
+from ranking import Leaderboard
+from segments import SegmentStats, summarize
+from user_record import UserRecord
+from user_stats import UserStats
+from user_storage import create_storage
+
+def check_new_user(username, age):
+    # Regras de cadastro usadas por add_user e pela importação em lote (bulk.py)
+    if not isinstance(username, str) or not username:
+        raise ValueError("Nome de usuário não pode ser vazio.")
+    if not isinstance(age, int) or isinstance(age, bool) or age <= 0:
+        raise ValueError("Idade deve ser um número inteiro positivo.")
+
+
+MAX_QUESTOES_POR_QUIZ = 1000  # Acertos/erros aceitos num único resultado
+MAX_TEMPO_QUIZ = 24 * 60 * 60  # Segundos
+
+
+def check_quiz_result(acertos, erros, tempo):
+    # Regras de um resultado de quiz (record_quiz_result e quiz_server.py): o ranking e as
+    # estatísticas indexam pelos acertos, então só inteiros pequenos não negativos
+    for nome, valor in (("Acertos", acertos), ("Erros", erros)):
+        if not isinstance(valor, int) or isinstance(valor, bool) or not 0 <= valor <= MAX_QUESTOES_POR_QUIZ:
+            raise ValueError(f"{nome} deve ser um número inteiro entre 0 e {MAX_QUESTOES_POR_QUIZ}.")
+    if not isinstance(tempo, (int, float)) or isinstance(tempo, bool) or not math.isfinite(tempo) or not 0 <= tempo <= MAX_TEMPO_QUIZ:
+        raise ValueError(f"Tempo deve ser um número entre 0 e {MAX_TEMPO_QUIZ} segundos.")
+
 
 class UserDataManager:
-    def __init__(self, filepath='users.json'):
+    # storage: "json" (regrava o arquivo inteiro), "log" (log de alterações + compactação),
+    # "write-behind" (gravação em segundo plano), "shared" (vários processos no mesmo arquivo),
+    # "sqlite" ou um objeto de armazenamento já construído
+    # hasher: PasswordHasher com o custo desejado; cache_size: logins lembrados em memória;
+    # migrate_passwords=False deixa o arquivo intocado (leitura apenas, ex.: relatórios)
+    # background_load=True lê o arquivo numa thread: o login de quem já foi lido funciona
+    # antes do fim da carga, e as operações que precisam de todos os usuários esperam por ela
+    def __init__(self, filepath='users.json', storage="json", hasher=None, cache_size=256, migrate_passwords=True,
+                 background_load=False, **storage_options):
         self.filepath = filepath
-        self.users = {}  # Armazena usuários como {username: {"password": senha, "age": idade, "acertos": 0, "erros": 0, "tempo": 0}}
-        self.load_users()
-
-    def load_users(self):
-        if os.path.exists(self.filepath):
-            try:
-                with open(self.filepath, 'r', encoding='utf-8') as f:
-                    self.users = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                self.users = {}
-        else:
+        if isinstance(storage, str):
+            storage = create_storage(storage, filepath, **storage_options)
+        self.storage = storage
+        self.hasher = hasher if hasher is not None else PasswordHasher()
+        self.verification_cache = VerificationCache(cache_size)
+        self.migrate_passwords = migrate_passwords
+        self.stats = UserStats()
+        self.ranking = Leaderboard()
+        self.segments = SegmentStats()
+        self.listeners = [self.stats, self.ranking, self.segments]  # Recebem reset/user_added/quiz_recorded a cada alteração
+        self._columns = None
+        # Vários processos no mesmo arquivo: o histórico de respostas não tem lock entre processos,
+        # então fica desligado (a revisão espaçada vale só para a sessão)
+        self.keep_history = not getattr(self.storage, "multi_process", False)
+        self._history = None
+        self._scheduler = None
+        self._loader = None
+        self.users = {}  # {username: UserRecord}; cada registro se comporta como {"password": senha, "age": idade, "acertos": 0, "erros": 0, "tempo": 0}
+        self.load_users(background=background_load)
+
+    @medido
+    def load_users(self, background=False):
+        self.wait_loaded()
+        self.verification_cache = VerificationCache(self.verification_cache.maxsize)
+        if background and hasattr(self.storage, "load_into"):
             self.users = {}
+            self._loader = threading.Thread(target=self._load_in_background, name="user-data-loader", daemon=True)
+            self._loader.start()
+        else:
+            self.users = self.storage.load()
+            self._finish_loading()
+
+    @medido
+    def _load_in_background(self):
+        self.storage.load_into(self.users)
+        self._finish_loading()
 
+    def _finish_loading(self):
+        if self.migrate_passwords:
+            self.migrate_plaintext_passwords()
+        self.storage.changed_externally()
+        self._reset_listeners()
+
+    def wait_loaded(self):
+        # Espera a carga em segundo plano terminar (não faz nada se ela já acabou)
+        loader = self._loader
+        if loader is not None and loader is not threading.current_thread():
+            loader.join()
+
+    def _wait_for(self, username):
+        # Durante a carga em segundo plano, espera só até este usuário ser lido
+        loader = self._loader
+        while loader is not None and username not in self.users and loader.is_alive():
+            loader.join(0.005)
+
+    def _reset_listeners(self):
+        for listener in self.listeners:
+            listener.reset(self.users)
+
+    def _check_external_changes(self):
+        # No modo compartilhado, uma gravação pode trazer alterações de outros processos
+        if self.storage.changed_externally():
+            self._reset_listeners()
+
+    def migrate_plaintext_passwords(self):
+        # Arquivos antigos guardam a senha em texto puro; troca pelo hash e salva uma vez
+        plaintext = [username for username, user in self.users.items() if not is_hashed(user["password"])]
+        for username in plaintext:
+            self.users[username]["password"] = self.hasher.hash(self.users[username]["password"])
+        if plaintext:
+            self.save_users()
+        return len(plaintext)
+
+    @medido
     def save_users(self):
-        try:
-            with open(self.filepath, 'w', encoding='utf-8') as f:
-                json.dump(self.users, f, indent=4, ensure_ascii=False)
-        except IOError as e:
-            print(f"Erro ao salvar usuários: {e}")
+        self.wait_loaded()
+        self.storage.save(self.users)
+        self._check_external_changes()
+
+    @medido
+    def flush(self):
+        # Força a gravação de alterações pendentes (modos write-behind e compartilhado)
+        self.wait_loaded()
+        self.storage.flush()
+        if self._history is not None:
+            self._history.flush() # Só acrescenta as respostas novas; os checkpoints ficam para checkpoint()
+        self._check_external_changes()
+
+    def checkpoint(self):
+        # Regrava os resumos do histórico e da revisão espaçada (O(usuários x questões)); chamado
+        # no fim de uma sessão e em close(), não a cada flush(). Sem ele, a próxima abertura só
+        # reaplica as respostas gravadas depois do último checkpoint
+        if self._history is not None:
+            self._history.checkpoint()
+            if self._scheduler is not None:
+                self._scheduler.checkpoint() # Só regrava se houve respostas novas
 
+    @property
+    def writes_in_background(self):
+        # O armazenamento grava sozinho (write-behind): a interface não precisa agendar flush()
+        return getattr(self.storage, "background_writer", False)
+
+    @property
+    def dirty(self):
+        # Há alterações ainda não gravadas? (write-behind, compartilhado em lote, gravação que falhou)
+        return self.storage.dirty
+
+    def close(self):
+        # Grava só se houver algo pendente: nos modos que gravam a cada alteração, fechar
+        # não regrava o arquivo inteiro
+        self.wait_loaded()
+        if self.storage.dirty:
+            self.save_users()
+        self.storage.close()
+        if self._history is not None:
+            self.checkpoint() # O mesmo que AttemptHistory.close()
+            self._scheduler = None
+            self._history = None
+
+    @medido
     def add_user(self, username, password, age, callback=None):
+        self.wait_loaded()
         if username in self.users:
             raise ValueError("Usuário já existe.")
-        if not isinstance(age, int) or age <= 0:
-            raise ValueError("Idade deve ser um número inteiro positivo.")
-        self.users[username] = {"password": password, "age": age, "acertos": 0, "erros": 0, "tempo": 0}
-        self.save_users()
+        check_new_user(username, age)
+        try:
+            self.storage.insert(self.users, username, UserRecord(self.hasher.hash(password), age, registered=date.today().isoformat()))
+        except ValueError:
+            # Modo compartilhado: o nome já foi registrado em outro terminal (e os dados foram relidos)
+            self._check_external_changes()
+            raise
+        user = self.users[username]
+        for listener in self.listeners:
+            listener.user_added(username, user)
+        self._check_external_changes()
         if callback:
             callback(username, self.users[username])
 
+    def add_users(self, entries, hashed=False):
+        # Cadastro em lote de (usuário, senha, idade): tudo é validado antes, e o armazenamento
+        # recebe uma única inserção (uma gravação do JSON, uma transação no SQLite).
+        # hashed=True quando as senhas já vêm com hash (bulk.py calcula em paralelo)
+        self.wait_loaded()
+        new_users = {}
+        today = date.today().isoformat()
+        for username, password, age in entries:
+            if username in self.users or username in new_users:
+                raise ValueError(f"Usuário já existe: {username}")
+            check_new_user(username, age)
+            new_users[username] = UserRecord(password if hashed else self.hasher.hash(password), age, registered=today)
+        if not new_users:
+            return 0
+        try:
+            self.storage.insert_many(self.users, new_users)
+        except ValueError:
+            self._check_external_changes()
+            raise
+        for username in new_users:
+            user = self.users[username]
+            for listener in self.listeners:
+                listener.user_added(username, user)
+        self._check_external_changes()
+        return len(new_users)
+
+    @medido
     def validate_user(self, username, password):
-        if username in self.users and self.users[username]["password"] == password:
+        self._wait_for(username)
+        user = self.users.get(username)
+        if user is None:
+            return False
+        stored = user["password"]
+        if self.verification_cache.check(username, stored, password):
+            contar("login_cache")
             return True
-        return False
+        contar("login_hash")
+        if not self.hasher.verify(password, stored):
+            return False
+        if self.hasher.needs_rehash(stored):
+            # Custo de hash mudou (ou senha ainda em texto puro): atualiza no login, depois
+            # que a carga (e a migração de senhas que ela faz) terminar
+            self.wait_loaded()
+            stored = self.hasher.hash(password)
+            self.users[username]["password"] = stored
+            self.save_users()
+        self.verification_cache.add(username, stored, password)
+        return True
 
+    @medido
     def record_quiz_result(self, username, acertos, erros, tempo):
+        self.wait_loaded()
+        if username not in self.users:
+            raise ValueError("Usuário não encontrado.")
+        check_quiz_result(acertos, erros, tempo)
+        self.storage.increment(self.users, username, acertos, erros, tempo)
+        user = self.users[username]
+        for listener in self.listeners:
+            listener.quiz_recorded(username, user, acertos, erros, tempo)
+        self._check_external_changes()
+
+    def columns(self):
+        # Visão em colunas NumPy (user_columns.UserColumns), criada só quando alguém pede
+        self.wait_loaded()
+        if self._columns is None:
+            from user_columns import UserColumns
+            self._columns = UserColumns()
+            self._columns.reset(self.users)
+            self.listeners.append(self._columns)
+        return self._columns
+
+    def rank(self, username):
+        # (posição, total de usuários) no ranking de acertos; posição None se o usuário não existe
+        self.wait_loaded()
+        return self.ranking.rank(username), len(self.ranking)
+
+    def top(self, n=5):
+        self.wait_loaded()
+        return self.ranking.top(n)
+
+    def segment_summary(self, kind):
+        # Acertos por grupo: [(grupo, usuários, média, mediana, moda)]; kind é "idade" (faixas
+        # de 5 anos), "cadastro" (mês do cadastro) ou "licao" (acertos de cada usuário na lição)
+        self.wait_loaded()
+        if kind == "licao":
+            return summarize(self.history().lesson_scores) if self.keep_history else []
+        return self.segments.summary(kind)
+
+    def history(self):
+        # Histórico de respostas por questão (attempt_history.AttemptHistory), ao lado do
+        # arquivo de usuários, aberto só quando alguém pede
+        if not self.keep_history:
+            raise RuntimeError("O histórico de respostas não é gravado no modo compartilhado; use o quiz_server.py.")
+        if self._history is None:
+            from attempt_history import AttemptHistory
+            self._history = AttemptHistory(os.path.splitext(self.filepath)[0] + ".history")
+        return self._history
+
+    def record_answer(self, username, lesson, question_id, correct, latency):
+        # Uma resposta do quiz; os totais do usuário continuam vindo de record_quiz_result
+        self._wait_for(username)
+        if username not in self.users:
+            raise ValueError("Usuário não encontrado.")
+        when = time.time()
+        if self.keep_history:
+            self.history().record(username, lesson, question_id, correct, latency, timestamp=when)
+        if self._scheduler is not None or not self.keep_history:
+            self.scheduler().review(username, question_id, correct, latency, when)
+
+    def scheduler(self):
+        # Revisão espaçada (spaced_repetition.ReviewScheduler) montada sobre o histórico de
+        # respostas, aberta só quando alguém pede
+        if self._scheduler is None:
+            from spaced_repetition import ReviewScheduler
+            if not self.keep_history:
+                self._scheduler = ReviewScheduler()  # Só em memória
+                return self._scheduler
+            history = self.history()
+            self._scheduler = ReviewScheduler.open(os.path.join(history.path, "revisao.json"), history)
+        return self._scheduler
+
+    def review_questions(self, username, k, question_ids):
+        # Próximas k questões para o usuário revisar: vencidas, nunca vistas, depois as que vencem
+        # primeiro; question_ids: todas as questões, na ordem em que as novas devem aparecer
+        self._wait_for(username)
         if username not in self.users:
             raise ValueError("Usuário não encontrado.")
-        self.users[username]["acertos"] += acertos
-        self.users[username]["erros"] += erros
-        self.users[username]["tempo"] += tempo
-        self.save_users()
+        return self.scheduler().next_questions(username, k, question_ids)
 
     def get_user_data(self, username):
-        return self.users.get(username, None)
+        # Cópia em dict comum (serializável em JSON); alterações passam pelos métodos acima
+        self._wait_for(username)
+        user = self.users.get(username, None)
+        return dict(user) if user is not None else None
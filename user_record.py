@@ -0,0 +1,126 @@
+from collections.abc import MutableMapping
+
+# Registro compacto de um usuário. Um dict com as cinco chaves ocupa algumas centenas de
+# bytes; aqui os campos ficam em __slots__ e o objeto continua se comportando como o dict
+# antigo (user["acertos"] += 1, user.get(...), dict(user), comparação com dicts).
+
+FIELDS = ("password", "age", "acertos", "erros", "tempo")
+OPTIONAL_FIELDS = ("registered",)  # Data de cadastro (AAAA-MM-DD); usuários antigos não têm
+_FIELD_SET = frozenset(FIELDS)
+_OPTIONAL_SET = frozenset(OPTIONAL_FIELDS)
+
+
+class UserRecord(MutableMapping):
+    __slots__ = FIELDS + OPTIONAL_FIELDS + ("_extra",)  # _extra: campos fora do padrão, raros (None quando não há)
+
+    def __init__(self, password, age, acertos=0, erros=0, tempo=0, registered=None):
+        self.password = password
+        self.age = age
+        self.acertos = acertos
+        self.erros = erros
+        self.tempo = tempo
+        self.registered = registered  # None = campo ausente
+        self._extra = None
+
+    @classmethod
+    def from_mapping(cls, data):
+        record = cls(data["password"], data["age"], data.get("acertos", 0), data.get("erros", 0), data.get("tempo", 0),
+                     data.get("registered"))
+        for key, value in data.items():
+            if key not in _FIELD_SET and key not in _OPTIONAL_SET:
+                record[key] = value
+        return record
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if key in _OPTIONAL_SET:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if key in _OPTIONAL_SET:
+            value = getattr(self, key)
+            return default if value is None else value
+        return default if self._extra is None else self._extra.get(key, default)
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET or key in _OPTIONAL_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET:
+            raise TypeError("Campos de usuário não podem ser removidos.")
+        if key in _OPTIONAL_SET:
+            if getattr(self, key) is None:
+                raise KeyError(key)
+            setattr(self, key, None)
+            return
+        if self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+        if not self._extra:
+            self._extra = None
+
+    def __contains__(self, key):
+        if key in _OPTIONAL_SET:
+            return getattr(self, key) is not None
+        return key in _FIELD_SET or (self._extra is not None and key in self._extra)
+
+    def __iter__(self):
+        yield from FIELDS
+        if self.registered is not None:
+            yield "registered"
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return len(FIELDS) + (self.registered is not None) + (len(self._extra) if self._extra is not None else 0)
+
+    def to_dict(self):
+        data = {"password": self.password, "age": self.age, "acertos": self.acertos, "erros": self.erros, "tempo": self.tempo}
+        if self.registered is not None:
+            data["registered"] = self.registered
+        if self._extra is not None:
+            data.update(self._extra)
+        return data
+
+    def copy(self):
+        return UserRecord.from_mapping(self)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+def record_from_pairs(pairs):
+    # object_pairs_hook do json: objetos com senha viram UserRecord; os demais, dicts
+    if 5 <= len(pairs) <= 6:
+        # Caso comum: os campos na ordem em que o programa grava
+        (k0, password), (k1, age), (k2, acertos), (k3, erros), (k4, tempo) = pairs[:5]
+        if (k0, k1, k2, k3, k4) == FIELDS and isinstance(password, str):
+            if len(pairs) == 5:
+                return UserRecord(password, age, acertos, erros, tempo)
+            if pairs[5][0] == "registered":
+                return UserRecord(password, age, acertos, erros, tempo, pairs[5][1])
+    data = dict(pairs)
+    if isinstance(data.get("password"), str) and "age" in data:
+        return UserRecord.from_mapping(data)
+    return data
+
+
+def to_json(obj):
+    # default= do json.dump para gravar registros no mesmo formato de antes
+    if isinstance(obj, UserRecord):
+        return obj.to_dict()
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
@@ -0,0 +1,174 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import date
+from user_record import FIELDS, OPTIONAL_FIELDS, UserRecord
+
+# Cópia binária do users.json para abrir o programa mais rápido. O JSON continua sendo o
+# arquivo principal: o snapshot é regravado junto com ele e só é usado enquanto o JSON não
+# mudou (tamanho, data de modificação e inode iguais aos anotados no cabeçalho).
+#
+#   users.bin
+#       cabeçalho   MAGIC, versão, ordem de bytes, quantidade de usuários, carimbo do JSON
+#       colunas     acertos (q), erros (q), tempo (d), idade (i), cadastro (i, dia ordinal; 0 = sem data)
+#       textos      UTF-8 terminados em \0: todos os nomes, todas as senhas, os campos extras (JSON ou vazio)
+#
+# A leitura usa mmap: as colunas viram listas direto do arquivo, sem parser de texto.
+#
+#   python user_snapshot.py para-binario users.json
+#   python user_snapshot.py para-json users.bin users.json
+
+MAGIC = b"USNP"
+VERSION = 1
+HEADER = struct.Struct("=4sHHQqqQ")  # magic, versão, little-endian?, usuários, tamanho, mtime_ns e inode do JSON
+NUMERIC_COLUMNS = (("acertos", "q"), ("erros", "q"), ("tempo", "d"), ("age", "i"), ("registered", "i"))
+_KNOWN = frozenset(FIELDS + OPTIONAL_FIELDS)
+
+
+def snapshot_path(filepath):
+    return os.path.splitext(filepath)[0] + ".bin"
+
+
+def _stamp(json_path):
+    try:
+        info = os.stat(json_path)
+    except OSError:
+        return None
+    return info.st_size, info.st_mtime_ns, info.st_ino
+
+
+def _extra(user):
+    if isinstance(user, UserRecord):
+        extra = user._extra
+    else:
+        extra = {key: value for key, value in user.items() if key not in _KNOWN}
+    return json.dumps(extra, ensure_ascii=False) if extra else ""
+
+
+def write_snapshot(path, users, json_path=None):
+    # Grava `users` em binário; json_path: o JSON que acabou de ser gravado com os mesmos dados.
+    # Devolve False (e apaga um snapshot antigo) se algum registro não cabe no formato
+    stamp = _stamp(json_path) if json_path else None
+    try:
+        columns = {name: array(code) for name, code in NUMERIC_COLUMNS}
+        names, passwords, extras = [], [], []
+        for username, user in users.items():
+            columns["acertos"].append(user.get("acertos", 0))
+            columns["erros"].append(user.get("erros", 0))
+            columns["tempo"].append(user.get("tempo", 0))
+            columns["age"].append(user["age"])
+            registered = user.get("registered")
+            columns["registered"].append(date.fromisoformat(registered).toordinal() if registered else 0)
+            names.append(username)
+            passwords.append(user["password"])
+            extras.append(_extra(user))
+        text = "\0".join(names + passwords + extras) + "\0"
+        if text.count("\0") != 3 * len(names):
+            raise ValueError("Texto com \\0")
+        blob = text.encode("utf-8")
+    except (KeyError, TypeError, ValueError, OverflowError):
+        # Idade fora do padrão, data inválida...: fica só o JSON
+        remove_snapshot(path)
+        return False
+    size, mtime_ns, inode = stamp or (-1, -1, 0)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, sys.byteorder == "little", len(names), size, mtime_ns, inode))
+        for name, code in NUMERIC_COLUMNS:
+            columns[name].tofile(f)
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return True
+
+
+def remove_snapshot(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def read_snapshot(path, json_path=None):
+    # {nome: UserRecord}, ou None se o snapshot não existe, está corrompido ou ficou para trás
+    # do JSON (com json_path=None o carimbo não é conferido)
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _parse(data, json_path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def _parse(data, json_path):
+    magic, version, little, count, size, mtime_ns, inode = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or bool(little) != (sys.byteorder == "little"):
+        return None
+    if json_path is not None and _stamp(json_path) != (size, mtime_ns, inode):
+        return None
+    columns = {}
+    offset = HEADER.size
+    with memoryview(data) as view:
+        for name, code in NUMERIC_COLUMNS:
+            end = offset + count * array(code).itemsize
+            if end > len(data):
+                return None
+            with view[offset:end] as raw, raw.cast(code) as values:
+                columns[name] = values.tolist()
+            offset = end
+    strings = data[offset:].decode("utf-8").split("\0")
+    if len(strings) != 3 * count + 1 or strings[-1]:
+        return None
+    names, passwords, extras = strings[:count], strings[count:2 * count], strings[2 * count:3 * count]
+    users = {}
+    for username, password, age, acertos, erros, tempo, registered, extra in zip(
+            names, passwords, columns["age"], columns["acertos"], columns["erros"], columns["tempo"],
+            columns["registered"], extras):
+        user = users[username] = UserRecord(password, age, acertos, erros, tempo,
+                                            date.fromordinal(registered).isoformat() if registered else None)
+        if extra:
+            for key, value in json.loads(extra).items():
+                user[key] = value
+    return users
+
+
+def main(argv=None):
+    from user_storage import JsonStorage, write_json_atomic
+
+    parser = argparse.ArgumentParser(description="Converte o arquivo de usuários entre JSON e o snapshot binário.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    parser_binario = subparsers.add_parser("para-binario", help="Gera o snapshot binário a partir do JSON")
+    parser_binario.add_argument("json", help="Arquivo de usuários (.json)")
+    parser_binario.add_argument("binario", nargs="?", help="Destino (padrão: ao lado do JSON, .bin)")
+    parser_json = subparsers.add_parser("para-json", help="Recria o JSON a partir do snapshot binário")
+    parser_json.add_argument("binario", help="Snapshot (.bin)")
+    parser_json.add_argument("json", help="Arquivo de usuários a gravar (.json)")
+    args = parser.parse_args(argv)
+
+    if args.comando == "para-binario":
+        destino = args.binario or snapshot_path(args.json)
+        users = JsonStorage(args.json).load()
+        # Só fica marcado como atual se estiver ao lado do JSON que o programa vai abrir
+        if not write_snapshot(destino, users, args.json if destino == snapshot_path(args.json) else None):
+            print("Há registros que não cabem no formato binário; use o JSON.", file=sys.stderr)
+            return None
+        print(f"{len(users)} usuários gravados em {destino}.")
+        return len(users)
+
+    users = read_snapshot(args.binario)
+    if users is None:
+        print(f"{args.binario} não é um snapshot válido.", file=sys.stderr)
+        return None
+    write_json_atomic(args.json, users)
+    if os.path.abspath(args.binario) == os.path.abspath(snapshot_path(args.json)):
+        write_snapshot(args.binario, users, args.json)  # Carimba de novo: o JSON acabou de mudar
+    print(f"{len(users)} usuários gravados em {args.json}.")
+    return len(users)
+
+
+if __name__ == "__main__":
+    main()
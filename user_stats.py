@@ -0,0 +1,123 @@
+from collections import Counter
+
+
+class RunningStats:
+    # Média, mediana e moda de um campo inteiro pequeno (acertos, erros, idade), mantidas
+    # por contagem/soma e um histograma: atualizar é O(1) e consultar é O(k), k = valores distintos
+    def __init__(self, values=()):
+        self.count = 0
+        self.total = 0
+        self.histogram = Counter()
+        for value in values:
+            self.add(value)
+
+    @classmethod
+    def from_histogram(cls, histogram):
+        stats = cls()
+        for value, count in histogram.items():
+            stats.count += count
+            stats.total += value * count
+            stats.histogram[value] = count
+        return stats
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.histogram[value] += 1
+
+    def remove(self, value):
+        self.count -= 1
+        self.total -= value
+        self.histogram[value] -= 1
+        if not self.histogram[value]:
+            del self.histogram[value]
+
+    def replace(self, old, new):
+        if old != new:
+            self.remove(old)
+            self.add(new)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def median(self):
+        if not self.count:
+            return 0
+        # Posições (base 0) dos elementos centrais; iguais quando a contagem é ímpar
+        low_pos, high_pos = (self.count - 1) // 2, self.count // 2
+        low = high = None
+        seen = 0
+        for value in sorted(self.histogram):
+            seen += self.histogram[value]
+            if low is None and seen > low_pos:
+                low = value
+            if seen > high_pos:
+                high = value
+                break
+        return (low + high) / 2 if low_pos != high_pos else low
+
+    def mode(self):
+        if not self.count:
+            return 0
+        # Em caso de empate, o menor valor
+        return min(self.histogram, key=lambda value: (-self.histogram[value], value))
+
+
+class UserStats:
+    # Estatísticas gerais dos usuários, atualizadas pelo UserDataManager a cada alteração
+    def __init__(self):
+        self.acertos = RunningStats()
+        self.erros = RunningStats()
+        self.idades = RunningStats()
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        stats = cls()
+        stats.acertos = RunningStats.from_histogram(snapshot["acertos"])
+        stats.erros = RunningStats.from_histogram(snapshot["erros"])
+        stats.idades = RunningStats.from_histogram(snapshot["idades"])
+        return stats
+
+    def reset(self, users):
+        acertos, erros, idades = RunningStats(), RunningStats(), RunningStats()
+        for user in users.values():
+            acertos.add(user.get("acertos", 0))
+            erros.add(user.get("erros", 0))
+            if user.get("age") is not None:
+                idades.add(user["age"])
+        self.acertos, self.erros, self.idades = acertos, erros, idades
+
+    def user_added(self, username, user):
+        self.acertos.add(user["acertos"])
+        self.erros.add(user["erros"])
+        self.idades.add(user["age"])
+
+    def quiz_recorded(self, username, user, acertos, erros, tempo):
+        self.acertos.replace(user["acertos"] - acertos, user["acertos"])
+        self.erros.replace(user["erros"] - erros, user["erros"])
+
+    def snapshot(self):
+        # Cópia dos histogramas (O(k)) para ser lida fora da thread da interface
+        return {
+            "acertos": Counter(self.acertos.histogram),
+            "erros": Counter(self.erros.histogram),
+            "idades": Counter(self.idades.histogram),
+        }
+
+
+def resumo_desempenho(nome, acertos, erros, tempo):
+    # Texto do "Resumo do seu desempenho" (MainApp.mostrar_resumo e relatórios em lote)
+    total_questoes = acertos + erros
+    if total_questoes <= 0:
+        return "Nenhuma questão respondida ainda. Comece uma lição para ver seu desempenho!"
+    percentual = (acertos / total_questoes) * 100
+    minutos = int(tempo // 60)
+    segundos = int(tempo % 60)
+    return (
+        f"Resumo do seu desempenho, {nome}:\n\n"
+        f"Total de questões respondidas: {total_questoes}\n"
+        f"Total de acertos: {acertos}\n"
+        f"Total de erros: {erros}\n"
+        f"Percentual de acertos: {percentual:.2f}%\n"
+        f"Tempo total gasto nos quizzes: {minutos} minutos e {segundos} segundos"
+    )
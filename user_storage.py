@@ -0,0 +1,648 @@
+import atexit
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections.abc import ItemsView, MutableMapping, ValuesView
+from instrumentation import medido
+from user_record import record_from_pairs, to_json
+from user_snapshot import read_snapshot, snapshot_path, write_snapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows: o modo compartilhado não está disponível
+    fcntl = None
+
+
+def write_json_atomic(filepath, users):
+    # Grava num arquivo temporário e troca de uma vez, para nunca deixar um JSON pela metade
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(users, f, indent=4, ensure_ascii=False, default=to_json)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+
+CHUNK_SIZE = 1 << 16
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_USER_KEY = re.compile(r'[ \t\n\r]*(,?)[ \t\n\r]*"((?:[^"\\]|\\.)*)"[ \t\n\r]*:[ \t\n\r]*', re.S)
+
+
+def iter_json_users(filepath, chunk_size=CHUNK_SIZE):
+    # Lê {"usuario": {...}, ...} aos poucos e devolve um par (nome, UserRecord) por vez, sem
+    # carregar o texto inteiro na memória
+    scan = json.JSONDecoder(object_pairs_hook=record_from_pairs).scan_once
+    with open(filepath, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size)
+        pos = _WHITESPACE.match(buffer).end()
+        if pos == len(buffer):
+            raise json.JSONDecodeError("Arquivo vazio", buffer, pos)
+        if buffer[pos] != "{":
+            raise json.JSONDecodeError("Esperado um objeto JSON", buffer, pos)
+        pos += 1
+        first = True
+        while True:
+            match = _USER_KEY.match(buffer, pos)
+            try:
+                if match is None or bool(match.group(1)) == first:
+                    end = _WHITESPACE.match(buffer, pos).end()
+                    if end < len(buffer) and buffer[end] == "}":
+                        return
+                    raise json.JSONDecodeError("Esperado o nome de um usuário", buffer, end)
+                user, end = scan(buffer, match.end())
+            except (json.JSONDecodeError, StopIteration):
+                # Registro cortado no fim do bloco: lê mais e tenta de novo a partir dele
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise json.JSONDecodeError("Arquivo de usuários incompleto", buffer, pos) from None
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            username = match.group(2)
+            if "\\" in username:
+                username = json.loads('"' + username + '"')
+            yield username, user
+            pos = end
+            first = False
+
+
+class JsonStorage:
+    # Armazenamento original: o arquivo inteiro é regravado a cada alteração
+    # snapshot=True grava também a cópia binária (user_snapshot), lida no lugar do JSON
+    # enquanto ele não mudar
+    def __init__(self, filepath, snapshot=False):
+        self.filepath = filepath
+        self.snapshot_path = snapshot_path(filepath) if snapshot else None
+        self._dirty = False  # Só fica True se uma gravação falhar
+
+    def load(self):
+        return self.load_into({}, streaming=False)
+
+    def load_into(self, users, streaming=True):
+        # Preenche `users` com o conteúdo do arquivo. Com streaming, os usuários entram um a um
+        # (iter_json_users) e quem já tem a referência do dict os enxerga durante a leitura
+        return self._read(users, streaming)
+
+    @medido
+    def _read(self, users, streaming=False, overrides=None):
+        # overrides: registros mais novos que os do arquivo, que entram no lugar deles
+        overrides = overrides or {}
+        try:
+            snapshot = read_snapshot(self.snapshot_path, self.filepath) if self.snapshot_path else None
+            if snapshot is not None:
+                users.update(snapshot)
+                for username, user in overrides.items():
+                    users[username] = user
+            elif not os.path.exists(self.filepath):
+                pass
+            elif streaming:
+                for username, user in iter_json_users(self.filepath):
+                    users[username] = overrides.get(username, user)
+            else:
+                with open(self.filepath, 'r', encoding='utf-8') as f:
+                    users.update(json.load(f, object_pairs_hook=record_from_pairs))
+        except (json.JSONDecodeError, IOError):
+            users.clear()
+        users.update(overrides)
+        return users
+
+    @medido
+    def _write(self, users):
+        write_json_atomic(self.filepath, users)
+        if self.snapshot_path:
+            write_snapshot(self.snapshot_path, users, self.filepath)
+
+    def save(self, users):
+        try:
+            self._write(users)
+        except IOError as e:
+            print(f"Erro ao salvar usuários: {e}")
+            self._dirty = True
+            return
+        self._dirty = False
+
+    @property
+    def dirty(self):
+        # True se há alterações só em memória (gravação atrasada, em lote ou que falhou)
+        return self._dirty
+
+    def insert(self, users, username, user):
+        users[username] = user
+        self.save(users)
+
+    def insert_many(self, users, new_users):
+        # Importação em lote: uma única gravação no fim (nos outros modos, o save de cada um)
+        users.update(new_users)
+        self.save(users)
+
+    def increment(self, users, username, acertos, erros, tempo):
+        user = users[username]
+        user["acertos"] += acertos
+        user["erros"] += erros
+        user["tempo"] += tempo
+        self.save(users)
+
+    def flush(self):
+        pass  # Cada alteração já foi gravada
+
+    def changed_externally(self):
+        # True (uma vez) se os dados em memória foram recarregados com alterações de outro processo
+        return False
+
+    def close(self):
+        pass
+
+
+class LogStorage(JsonStorage):
+    # Cada alteração vira uma linha pequena em "<arquivo>.log"; o snapshot JSON só é
+    # regravado na compactação. As linhas guardam o registro completo do usuário
+    # (e não o incremento), então reaplicar o log sobre um snapshot mais novo é seguro.
+    def __init__(self, filepath, compact_threshold=1000, snapshot=False):
+        super().__init__(filepath, snapshot)
+        self.log_path = filepath + ".log"
+        self.compact_threshold = compact_threshold
+        self.log_entries = 0
+        self._log_file = None
+
+    def load_into(self, users, streaming=True):
+        # O log é lido antes do snapshot: com streaming, cada usuário já aparece na versão final
+        changes = {}
+        self.log_entries = self._replay(changes)
+        return self._read(users, streaming, overrides=changes)
+
+    def _replay(self, users):
+        if not os.path.exists(self.log_path):
+            return 0
+        entries = 0
+        valid_size = 0
+        with open(self.log_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Escrita interrompida no meio da linha
+                try:
+                    record = json.loads(line, object_pairs_hook=record_from_pairs)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                users[record["user"]] = record["data"]
+                entries += 1
+                valid_size += len(line)
+        # Descarta a cauda corrompida para que novas linhas não fiquem depois dela
+        if valid_size < os.path.getsize(self.log_path):
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(valid_size)
+        return entries
+
+    def _append(self, username, user):
+        if self._log_file is None:
+            self._log_file = open(self.log_path, 'a', encoding='utf-8')
+        self._log_file.write(json.dumps({"user": username, "data": user}, ensure_ascii=False, default=to_json) + "\n")
+        self._log_file.flush()
+        self.log_entries += 1
+
+    def _maybe_compact(self, users):
+        if self.log_entries >= self.compact_threshold:
+            self.save(users)
+
+    def insert(self, users, username, user):
+        users[username] = user
+        self._append(username, user)
+        self._maybe_compact(users)
+
+    def increment(self, users, username, acertos, erros, tempo):
+        user = users[username]
+        user["acertos"] += acertos
+        user["erros"] += erros
+        user["tempo"] += tempo
+        self._append(username, user)
+        self._maybe_compact(users)
+
+    def save(self, users):
+        # Compactação: grava o snapshot completo e só então esvazia o log
+        try:
+            self._write(users)
+        except IOError as e:
+            print(f"Erro ao salvar usuários: {e}")
+            return
+        self.close()
+        open(self.log_path, 'w', encoding='utf-8').close()
+        self.log_entries = 0
+
+    def close(self):
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+
+class WriteBehindStorage(JsonStorage):
+    # Alterações só marcam os dados como "sujos"; uma thread em segundo plano junta tudo
+    # numa única gravação atômica a cada interval_ms, sem travar a interface
+    background_writer = True  # Ninguém precisa chamar flush() periodicamente
+
+    def __init__(self, filepath, interval_ms=500, snapshot=False):
+        super().__init__(filepath, snapshot)
+        self.interval = interval_ms / 1000
+        self.lock = threading.Lock()  # Protege os dados em memória e a marca de sujo
+        self._write_lock = threading.Lock()  # Garante que snapshots são gravados em ordem
+        self._users = None
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load_into(self, users, streaming=True):
+        super().load_into(users, streaming)
+        with self.lock:
+            self._users = users
+            self._dirty = False
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="user-data-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)  # Nada se perde mesmo se close() não for chamado
+        return users
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def save(self, users):
+        with self.lock:
+            self._users = users
+            self._dirty = True
+
+    def insert(self, users, username, user):
+        with self.lock:
+            users[username] = user
+            self._users = users
+            self._dirty = True
+
+    def insert_many(self, users, new_users):
+        with self.lock:
+            users.update(new_users)
+            self._users = users
+            self._dirty = True
+
+    def increment(self, users, username, acertos, erros, tempo):
+        with self.lock:
+            user = users[username]
+            user["acertos"] += acertos
+            user["erros"] += erros
+            user["tempo"] += tempo
+            self._users = users
+            self._dirty = True
+
+    def flush(self):
+        with self._write_lock:
+            with self.lock:
+                if not self._dirty:
+                    return
+                # Cópia rasa sob o lock; a serialização e o disco ficam fora dele
+                snapshot = {username: user.copy() for username, user in self._users.items()}
+                self._dirty = False
+            try:
+                self._write(snapshot)
+            except IOError as e:
+                print(f"Erro ao salvar usuários: {e}")
+                with self.lock:
+                    self._dirty = True
+
+    def close(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.close)
+        self.flush()
+
+
+COUNTER_FIELDS = ("acertos", "erros", "tempo")
+
+
+class SharedJsonStorage(JsonStorage):
+    # Vários processos (terminais do laboratório) usando o mesmo users.json. A gravação é feita
+    # sob um lock exclusivo (fcntl) em "<arquivo>.lock", que também guarda um número de versão.
+    # Se outro processo gravou desde a última sincronização, o arquivo é relido e as alterações
+    # locais são reaplicadas por cima: contadores somam a diferença, os demais campos só
+    # substituem o valor do disco se foram alterados aqui. Assim nenhum acerto se perde.
+    multi_process = True  # O UserDataManager não grava o histórico de respostas (ids locais a cada processo)
+
+    def __init__(self, filepath, batch_size=1, snapshot=False):
+        if fcntl is None:
+            raise RuntimeError("O armazenamento compartilhado precisa de fcntl (Linux/macOS).")
+        super().__init__(filepath, snapshot)
+        self.lock_path = filepath + ".lock"
+        self.batch_size = batch_size  # Sincroniza a cada N alterações (ou em save/flush/close); cadastros sincronizam na hora
+        self.version = 0
+        self._base = {}  # Estado do disco na última sincronização, para calcular as diferenças
+        self._pending = 0
+        self._reloaded = False
+        self._users = None
+
+    def _locked(self, mode):
+        lock_file = open(self.lock_path, 'a+', encoding='utf-8')
+        fcntl.flock(lock_file.fileno(), mode)
+        return lock_file
+
+    @staticmethod
+    def _read_version(lock_file):
+        lock_file.seek(0)
+        content = lock_file.read().strip()
+        return int(content) if content else 0
+
+    @staticmethod
+    def _write_version(lock_file, version):
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(version))
+        lock_file.flush()
+        os.fsync(lock_file.fileno())
+
+    @staticmethod
+    def _copy(users):
+        return {username: user.copy() for username, user in users.items()}
+
+    def load_into(self, users, streaming=True):
+        with self._locked(fcntl.LOCK_SH) as lock_file:
+            self.version = self._read_version(lock_file)
+            super().load_into(users, streaming)
+        self._base = self._copy(users)
+        self._pending = 0
+        self._users = users
+        return users
+
+    def _merge(self, users, disk):
+        merged = disk
+        for username, user in users.items():
+            base = self._base.get(username)
+            current = disk.get(username)
+            if current is None:
+                merged[username] = user.copy()
+            elif base is not None:
+                for field, value in user.items():
+                    if field in COUNTER_FIELDS:
+                        current[field] = current.get(field, 0) + value - base.get(field, 0)
+                    elif value != base.get(field):
+                        current[field] = value
+        return merged
+
+    def sync(self, users, new_users=None):
+        # new_users: cadastros novos, conferidos sob o lock contra o que os outros terminais
+        # já gravaram; devolve os nomes que já existiam (nesse caso nenhum é inserido)
+        taken = []
+        with self._locked(fcntl.LOCK_EX) as lock_file:
+            version = self._read_version(lock_file)
+            if version != self.version:
+                disk = self._read({})
+                base = self._copy(disk)
+                merged = self._merge(users, disk)
+                users.clear()
+                users.update(merged)  # Em vez de trocar o dict: o MainApp guarda a referência
+                # Base e versão passam a ser as do disco já na mesclagem: se a gravação abaixo
+                # falhar, a próxima tentativa mescla de novo sem contar duas vezes o que leu aqui
+                self._base = base
+                self.version = version
+                self._reloaded = True
+            if new_users:
+                taken = [username for username in new_users if username in users]
+                if not taken:
+                    users.update(new_users)
+                    self._pending += len(new_users)  # Se a gravação falhar, o flush tenta de novo
+            # A versão é gravada antes dos dados: se o processo cair no meio, os outros apenas
+            # releem o arquivo desnecessariamente, sem sobrescrever nada
+            self._write_version(lock_file, version + 1)
+            self._write(users)
+            self.version = version + 1
+        self._base = self._copy(users)
+        self._pending = 0
+        return taken
+
+    def _mutated(self, users):
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.save(users)  # Em caso de erro o registro continua pendente para o próximo flush
+
+    def save(self, users):
+        try:
+            self.sync(users)
+        except IOError as e:
+            print(f"Erro ao salvar usuários: {e}")
+
+    def _sync_new(self, users, new_users):
+        try:
+            return self.sync(users, new_users)
+        except IOError as e:
+            # O cadastro já conferido fica na memória, pendente para o próximo flush
+            print(f"Erro ao salvar usuários: {e}")
+            return []
+
+    def insert(self, users, username, user):
+        # Cadastros não esperam o lote: o nome pode ter sido registrado em outro terminal
+        if self._sync_new(users, {username: user}):
+            raise ValueError("Usuário já existe.")
+
+    def insert_many(self, users, new_users):
+        taken = self._sync_new(users, new_users)
+        if taken:
+            raise ValueError(f"Usuário já existe: {taken[0]}")
+
+    def increment(self, users, username, acertos, erros, tempo):
+        user = users[username]
+        user["acertos"] += acertos
+        user["erros"] += erros
+        user["tempo"] += tempo
+        self._mutated(users)
+
+    def changed_externally(self):
+        reloaded, self._reloaded = self._reloaded, False
+        return reloaded
+
+    @property
+    def dirty(self):
+        return self._pending > 0
+
+    def flush(self):
+        if self._pending and self._users is not None:
+            self.save(self._users)
+
+    def close(self):
+        self.flush()
+
+
+USER_COLUMNS = ("password", "age", "acertos", "erros", "tempo", "registered")
+_INSERT_COLUMNS = "(username, " + ", ".join(USER_COLUMNS) + ") VALUES (" + ", ".join("?" * (len(USER_COLUMNS) + 1)) + ")"
+
+
+def _user_row(username, user):
+    return (username,) + tuple(user.get(column) for column in USER_COLUMNS)
+
+
+class SQLiteUserRecord(MutableMapping):
+    # Linha de um usuário com a mesma interface do dict; cada atribuição vira um UPDATE
+    def __init__(self, conn, username, row):
+        self._conn = conn
+        self._username = username
+        self._row = dict(zip(USER_COLUMNS, row))
+        if self._row["registered"] is None:
+            del self._row["registered"]  # Como no JSON: usuários antigos não têm data de cadastro
+
+    def __getitem__(self, key):
+        return self._row[key]
+
+    def __setitem__(self, key, value):
+        if key not in USER_COLUMNS:
+            raise KeyError(key)
+        self._conn.execute(f"UPDATE users SET {key} = ? WHERE username = ?", (value, self._username))
+        self._row[key] = value
+
+    def __delitem__(self, key):
+        raise TypeError("Campos de usuário não podem ser removidos.")
+
+    def __iter__(self):
+        return iter(self._row)
+
+    def __len__(self):
+        return len(self._row)
+
+    def __repr__(self):
+        return repr(self._row)
+
+
+class _SQLiteValues(ValuesView):
+    def __iter__(self):
+        for username, record in self._mapping.scan():
+            yield record
+
+
+class _SQLiteItems(ItemsView):
+    def __iter__(self):
+        return self._mapping.scan()
+
+
+class SQLiteUsers(MutableMapping):
+    # Visão de dicionário sobre a tabela users; nada é carregado inteiro na memória
+    _SELECT = "SELECT username, " + ", ".join(USER_COLUMNS) + " FROM users"
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getitem__(self, username):
+        row = self._conn.execute(self._SELECT + " WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            raise KeyError(username)
+        return SQLiteUserRecord(self._conn, row[0], row[1:])
+
+    def __setitem__(self, username, user):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO users " + _INSERT_COLUMNS, _user_row(username, user),
+        )
+
+    def __delitem__(self, username):
+        if self._conn.execute("DELETE FROM users WHERE username = ?", (username,)).rowcount == 0:
+            raise KeyError(username)
+
+    def __contains__(self, username):
+        return self._conn.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone() is not None
+
+    def __iter__(self):
+        for (username,) in self._conn.execute("SELECT username FROM users"):
+            yield username
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def scan(self):
+        for row in self._conn.execute(self._SELECT):
+            yield row[0], SQLiteUserRecord(self._conn, row[0], row[1:])
+
+    def values(self):
+        return _SQLiteValues(self)
+
+    def items(self):
+        return _SQLiteItems(self)
+
+
+class SQLiteStorage:
+    # Banco SQLite em modo WAL; alterações são gravadas linha a linha, sem regravar o resto
+    def __init__(self, filepath):
+        root, ext = os.path.splitext(filepath)
+        self.json_path = filepath if ext == ".json" else None
+        self.db_path = filepath if ext in (".db", ".sqlite", ".sqlite3") else root + ".db"
+        self.conn = None
+
+    @medido
+    def load(self):
+        if self.conn is None:
+            new_db = not os.path.exists(self.db_path)
+            self.conn = sqlite3.connect(self.db_path, isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "username TEXT PRIMARY KEY, password TEXT NOT NULL, age INTEGER NOT NULL, "
+                "acertos INTEGER NOT NULL DEFAULT 0, erros INTEGER NOT NULL DEFAULT 0, "
+                "tempo REAL NOT NULL DEFAULT 0, registered TEXT)"
+            )
+            if "registered" not in [row[1] for row in self.conn.execute("PRAGMA table_info(users)")]:
+                # Bancos criados antes da data de cadastro existir
+                self.conn.execute("ALTER TABLE users ADD COLUMN registered TEXT")
+            if new_db and self.json_path:
+                self._import_json()
+        return SQLiteUsers(self.conn)
+
+    def _import_json(self):
+        # Na primeira execução, migra os usuários já existentes no users.json
+        users = JsonStorage(self.json_path).load()
+        with self.conn:
+            self.conn.execute("BEGIN")
+            table = SQLiteUsers(self.conn)
+            for username, user in users.items():
+                table[username] = user
+
+    def save(self, users):
+        pass  # Cada alteração já é confirmada no banco
+
+    def flush(self):
+        pass
+
+    def changed_externally(self):
+        return False
+
+    @property
+    def dirty(self):
+        return False
+
+    def insert(self, users, username, user):
+        users[username] = user
+
+    def insert_many(self, users, new_users):
+        # Uma transação só: ou entram todos, ou nenhum
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT INTO users " + _INSERT_COLUMNS,
+                (_user_row(username, user) for username, user in new_users.items()),
+            )
+
+    def increment(self, users, username, acertos, erros, tempo):
+        self.conn.execute(
+            "UPDATE users SET acertos = acertos + ?, erros = erros + ?, tempo = tempo + ? WHERE username = ?",
+            (acertos, erros, tempo, username),
+        )
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def create_storage(kind, filepath, **options):
+    if kind == "json":
+        return JsonStorage(filepath, **options)
+    if kind == "log":
+        return LogStorage(filepath, **options)
+    if kind == "write-behind":
+        return WriteBehindStorage(filepath, **options)
+    if kind == "shared":
+        return SharedJsonStorage(filepath, **options)
+    if kind == "sqlite":
+        return SQLiteStorage(filepath)
+    raise ValueError(f"Tipo de armazenamento desconhecido: {kind}")